@@ -1,27 +1,38 @@
 import logging
 import os
+from contextlib import nullcontext
 from functools import reduce
 from typing import ItemsView
 
-import boto3
-
 from keydra import loader
 from keydra import logging as km_logging
+from keydra.clients.aws import session as aws_session
 from keydra.clients.aws.cloudwatch import CloudwatchClient
+from keydra.async_keydra import AsyncKeydra, DEFAULT_EXECUTOR_WORKERS
 from keydra.config import KeydraConfig
+from keydra.deadline import DEFAULT_RESERVE, Deadline
+from keydra.executor import DEFAULT_CONCURRENCY
+from keydra.imports import ImportTimer
 from keydra.keydra import Keydra
+from keydra.ledger import RunLedger
+from keydra.profiling import DEFAULT_PROFILE_DIR, DEFAULT_TOP, SAMPLING, Profiler
+from keydra.retry import DEFAULT_BUDGET
 
 km_logging.setup_logging(logging.INFO)
 
 # Global variables are reused across execution contexts (if available)
-SESSION = boto3.Session()
+SESSION = aws_session.SESSION
 
 ENV_CONFIG_PREFIX = 'KEYDRA_CFG_'
 
 LOGGER = km_logging.get_logger()
 
+# "emf" publishes metrics as log records (Embedded Metric Format) rather
+# than calling PutMetricData
 CW = CloudwatchClient.getInstance(
-    session=SESSION, region_name=loader.DEFAULT_REGION_NAME
+    session=SESSION,
+    region_name=loader.DEFAULT_REGION_NAME,
+    backend=os.environ.get('KEYDRA_METRICS', 'cloudwatch')
 )
 
 
@@ -81,7 +92,64 @@ def _load_config(env_vars: ItemsView):
 def _load_keydra_config():
     return KeydraConfig(
         config=_load_env_config(),
-        sts_client=SESSION.client('sts')
+        sts_client=aws_session.client('sts')
+    )
+
+
+def _failed(outcome):
+    if isinstance(outcome, dict):
+        outcome = outcome.get('status')
+
+    return outcome == 'fail'
+
+
+def _log_unfinished(response):
+    '''
+    Logs the secrets this run ran out of time for, along with the event to
+    invoke Keydra with to pick up the ones never started.
+    '''
+    unfinished = {'not_started': [], 'in_progress': []}
+
+    for result in response:
+        status = result.get('rotate_secret', {})
+
+        if isinstance(status, dict) and status.get('status') in unfinished:
+            unfinished[status['status']].append(result.get('sid'))
+
+    if not any(unfinished.values()):
+        return
+
+    LOGGER.warning(
+        {
+            'message': 'Ran out of time, {} secret(s) not started and {} '
+            'still in progress'.format(
+                len(unfinished['not_started']),
+                len(unfinished['in_progress'])
+            ),
+            'data': {
+                'in_progress': unfinished['in_progress'],
+                'follow_up': {
+                    'trigger': 'adhoc',
+                    'secrets': unfinished['not_started']
+                }
+            }
+        }
+    )
+
+
+def _profiler(event):
+    '''
+    Profiler of the run, as asked by the event: "profile" is either true
+    (sampling profiler) or "cprofile", "profile_top" the number of entries
+    to report and "profile_stacks" whether to write collapsed stacks to
+    /tmp.
+    '''
+    mode = event['profile']
+
+    return Profiler(
+        mode=SAMPLING if mode is True else mode,
+        top=event.get('profile_top', DEFAULT_TOP),
+        stacks_dir=DEFAULT_PROFILE_DIR if event.get('profile_stacks') else None
     )
 
 
@@ -125,6 +193,18 @@ def lambda_handler(event, context):
     debug_mode = event.get('debug', False)
     batch_number = event.get('batch_number', None)
     number_of_batches = event.get('number_of_batches', None)
+    concurrency = event.get('concurrency', DEFAULT_CONCURRENCY)
+    provider_concurrency = event.get('provider_concurrency', None)
+    distribution_concurrency = event.get(
+        'distribution_concurrency', DEFAULT_CONCURRENCY
+    )
+    use_asyncio = event.get('asyncio', False)
+    deadline_reserve = event.get('deadline_reserve', DEFAULT_RESERVE)
+    call_timeouts = event.get('call_timeouts', None)
+    retry_budget = event.get('retry_budget', DEFAULT_BUDGET)
+    use_ledger = event.get('ledger', False)
+    import_report = event.get('import_report', False)
+    profile = event.get('profile', False)
 
     if debug_mode:
         LOGGER.setLevel(logging.DEBUG)
@@ -138,13 +218,57 @@ def lambda_handler(event, context):
         )
     )
 
-    keydra = Keydra(_load_keydra_config(), CW)
-    response = keydra.rotate_and_distribute(
-        run_for_secrets=run_for_secrets,
-        rotate=trigger,
-        batch_number=batch_number,
-        number_of_batches=number_of_batches
-    )
+    ledger = RunLedger.for_trigger(trigger) if use_ledger else None
+
+    runner = Keydra
+    options = {
+        'concurrency': concurrency,
+        'provider_concurrency': provider_concurrency,
+        'distribution_concurrency': distribution_concurrency,
+        'deadline': Deadline.from_context(
+            context, reserve=deadline_reserve, ceilings=call_timeouts
+        ),
+        'ledger': ledger,
+        'retry_budget': retry_budget
+    }
+
+    if use_asyncio:
+        runner = AsyncKeydra
+        options['executor_workers'] = event.get(
+            'executor_workers', DEFAULT_EXECUTOR_WORKERS
+        )
+
+    import_timer = ImportTimer() if import_report else None
+    profiler = _profiler(event) if profile else None
+
+    try:
+        # Only hooks into imports when asked to, and for this run only
+        with import_timer or nullcontext():
+            keydra = runner(_load_keydra_config(), CW, **options)
+
+            with profiler or nullcontext():
+                response = keydra.rotate_and_distribute(
+                    run_for_secrets=run_for_secrets,
+                    rotate=trigger,
+                    batch_number=batch_number,
+                    number_of_batches=number_of_batches
+                )
+    finally:
+        # Execution times are buffered during the run
+        CW.flush()
+
+        if import_timer is not None:
+            LOGGER.info(
+                {
+                    'message': 'Imports of the run',
+                    'data': import_timer.report()
+                }
+            )
+
+        if profiler is not None:
+            LOGGER.info(
+                {'message': 'Profile of the run', 'data': profiler.summary()}
+            )
 
     LOGGER.info(
         {
@@ -157,6 +281,35 @@ def lambda_handler(event, context):
         }
     )
 
+    _log_unfinished(response)
+
+    if any(_failed(r.get('rotate_secret')) or _failed(r.get('distribute_secret')) for r in response):
+        if ledger is None:
+            # Lambda retries would rotate every secret again, including the
+            # ones already rotated
+            LOGGER.error(
+                {
+                    'message': 'Secrets failed, not retrying the run without '
+                    'a ledger',
+                    'data': [
+                        r.get('secret_id') for r in response
+                        if _failed(r.get('rotate_secret'))
+                        or _failed(r.get('distribute_secret'))
+                    ]
+                }
+            )
+        else:
+            if not ledger.durable:
+                LOGGER.warning(
+                    'Lambda retries of this run rotate again the secrets '
+                    'already rotated, unless landing on this same execution '
+                    'environment (the run ledger is only kept on its disk)'
+                )
+
+            # Makes Lambda retry async invocations, skipping the secrets
+            # in the ledger
+            raise Exception(response)
+
     if any(r.get('rotate_secret') == 'fail' or r.get('distribute_secret') == 'fail' for r in response):
         raise Exception(response)
 
@@ -0,0 +1,356 @@
+import asyncio
+import contextvars
+import functools
+
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+
+from keydra import loader
+from keydra import logging as km_logging
+from keydra import retry
+from keydra import telemetry
+from keydra import timing
+from keydra.clients.aws.cloudwatch import CloudwatchClient, timed
+from keydra.config import KeydraConfig
+from keydra.deadline import Deadline, calling, scope as deadline_scope
+from keydra.dependencies import dependency_graph, secrets_written
+from keydra.exceptions import InvalidSecretProvider
+from keydra.executor import DEFAULT_CONCURRENCY
+from keydra.keydra import Keydra
+from keydra.ledger import RunLedger
+from keydra.limiter import AsyncAdaptiveLimit
+from keydra.retry import RetryLater
+
+LOGGER = km_logging.get_logger()
+
+DEFAULT_EXECUTOR_WORKERS = 16
+
+
+class AsyncKeydra(Keydra):
+    def __init__(self, cfg: KeydraConfig, cw: CloudwatchClient,
+                 concurrency: int = DEFAULT_CONCURRENCY,
+                 provider_concurrency=None,
+                 distribution_concurrency: int = DEFAULT_CONCURRENCY,
+                 executor_workers: int = DEFAULT_EXECUTOR_WORKERS,
+                 deadline: Deadline = None,
+                 ledger: RunLedger = None,
+                 retry_budget: int = retry.DEFAULT_BUDGET):
+        '''
+        Keydra runner driven by an asyncio event loop.
+
+        Secrets and distribution targets are coroutines rather than threads,
+        so waiting on dependencies, provider limits or retries doesn't hold
+        a thread. Provider calls are still blocking (the providers shipped
+        with Keydra don't override `rotate_async`/`distribute_async`), so
+        they, and any other blocking bit like loading config or fetching
+        credentials, run on a pool of `executor_workers` threads, which
+        bounds the calls in flight.
+
+        :param concurrency: Number of secrets processed at the same time
+        :type concurrency: :class:`int`
+        :param provider_concurrency: Optional cap of calls in flight per
+            provider, either one number for all or a dict by provider name
+        :type provider_concurrency: :class:`int` or :class:`dict`
+        :param distribution_concurrency: Number of distribution targets of a
+            single secret distributed at the same time
+        :type distribution_concurrency: :class:`int`
+        :param executor_workers: Number of threads available to blocking
+            calls
+        :type executor_workers: :class:`int`
+        :param deadline: Optional time budget of the run
+        :type deadline: :class:`Deadline`
+        :param ledger: Optional ledger of the secrets already processed in
+            the current window
+        :type ledger: :class:`RunLedger`
+        :param retry_budget: Retries of failed calls allowed in a run
+        :type retry_budget: :class:`int`
+        '''
+        super().__init__(
+            cfg, cw,
+            concurrency=concurrency,
+            provider_concurrency=provider_concurrency,
+            distribution_concurrency=distribution_concurrency,
+            deadline=deadline,
+            ledger=ledger,
+            retry_budget=retry_budget
+        )
+        self._executor_workers = max(
+            int(executor_workers or DEFAULT_EXECUTOR_WORKERS), 1
+        )
+
+    def rotate_and_distribute(self, run_for_secrets, rotate, batch_number=None, number_of_batches=None) -> list[dict]:
+        # Rather than asyncio.run, which waits for every blocking call to
+        # return on the way out, even those given up on for lack of time
+        loop = asyncio.new_event_loop()
+
+        try:
+            return loop.run_until_complete(
+                self.rotate_and_distribute_async(
+                    run_for_secrets=run_for_secrets,
+                    rotate=rotate,
+                    batch_number=batch_number,
+                    number_of_batches=number_of_batches
+                )
+            )
+        finally:
+            try:
+                loop.run_until_complete(self._cancel_pending())
+                loop.run_until_complete(loop.shutdown_asyncgens())
+            finally:
+                loop.close()
+
+    @staticmethod
+    async def _cancel_pending():
+        pending = asyncio.all_tasks() - {asyncio.current_task()}
+
+        for task in pending:
+            task.cancel()
+
+        await asyncio.gather(*pending, return_exceptions=True)
+
+    async def rotate_and_distribute_async(self, run_for_secrets, rotate, batch_number=None,
+                                          number_of_batches=None) -> list[dict]:
+        loop = asyncio.get_running_loop()
+        loop.set_default_executor(
+            ThreadPoolExecutor(
+                max_workers=self._executor_workers,
+                thread_name_prefix='keydra'
+            )
+        )
+
+        # Created here, as asyncio primitives are bound to the running loop
+        self._secret_slots = asyncio.Semaphore(self._executor.max_workers)
+        self._provider_slots = {}
+
+        with timing.collect() as run_spans, telemetry.record_calls() as calls:
+            with loader.run_scope(), deadline_scope(self._deadline), \
+                    retry.budget(self._retry_budget):
+                secrets, response = await self._run_blocking(
+                    self._shortlist, run_for_secrets, rotate, batch_number,
+                    number_of_batches
+                )
+
+                if response is not None:
+                    return response
+
+                await self._run_blocking(self._prefetch_credentials, secrets)
+
+                dependencies = dependency_graph(secrets)
+                finished = [asyncio.Event() for _ in secrets]
+                self._started = set()
+
+                async def process(idx, secret):
+                    try:
+                        for dependency in dependencies[idx]:
+                            await finished[dependency].wait()
+
+                        return await self._rotate_and_distribute_secret_async(secret)
+                    finally:
+                        finished[idx].set()
+
+                tasks = [
+                    asyncio.ensure_future(process(idx, s))
+                    for idx, s in enumerate(secrets)
+                ]
+
+                _, pending = await asyncio.wait(
+                    tasks,
+                    timeout=max(self._deadline.time_left(), 0) if self._deadline else None
+                )
+
+                for task in pending:
+                    task.cancel()
+
+                response: list[dict] = [
+                    task.result() if task not in pending
+                    else self._unfinished(
+                        secrets[idx], started=id(secrets[idx]) in self._started
+                    )
+                    for idx, task in enumerate(tasks)
+                ]
+
+            if rotate != 'adhoc':
+                await self._run_blocking(self._emit_result_metrics, response)
+
+        self._log_timings(run_spans, response)
+        self._log_calls(calls)
+        self._log_limits()
+
+        return response
+
+    @staticmethod
+    async def _run_blocking(fn, *args):
+        return await asyncio.get_running_loop().run_in_executor(
+            None, functools.partial(contextvars.copy_context().run, fn, *args)
+        )
+
+    @asynccontextmanager
+    async def _provider_limit(self, provider):
+        '''
+        Same as `ProviderLimits.limit`, awaiting a slot of the provider (so
+        its limit adapts to throttling just as with threads).
+        '''
+        provider = str(provider).lower()
+
+        if provider not in self._provider_slots:
+            limit = self._provider_limits.adaptive_limit(provider)
+
+            self._provider_slots[provider] = (
+                AsyncAdaptiveLimit(limit) if limit else None
+            )
+
+        slots = self._provider_slots[provider]
+
+        if slots is None:
+            yield
+            return
+
+        async with slots.slot(provider):
+            yield
+
+    async def _rotate_and_distribute_secret_async(self, secret) -> dict:
+        async with self._secret_slots:
+            if self._deadline is not None and not self._deadline.admits():
+                return self._unfinished(secret, started=False)
+
+            if self._ledger is not None and self._ledger.done(secret):
+                return self._skipped(secret)
+
+            self._started.add(id(secret))
+
+            with timing.collect() as spans:
+                r_result = await self._rotate_secret_async(secret)
+                result = self._rotation_result(secret, r_result)
+
+                if r_result['status'] == 'success' and 'distribute' in secret:
+                    d_result = await self._distribute_secret_async(
+                        secret, r_result['value']
+                    )
+                    action, outcome = self._outcome(d_result)
+                    result[action] = outcome
+
+            result['timings'] = spans.to_list()
+
+            loader.invalidate_credentials(secrets_written(secret))
+
+            if self._ledger is not None:
+                await self._run_blocking(self._ledger.record, secret, result)
+
+            return result
+
+    @staticmethod
+    async def _requeueing(retried, call, *args):
+        '''
+        Awaits `call`, taking over the retries of `retried` (the blocking
+        method it runs, if any), so waiting to retry doesn't hold one of the
+        threads of the executor.
+        '''
+        attempt = 0
+
+        while True:
+            try:
+                with retry.attempt(attempt), retry.requeueing(retried):
+                    return await call(*args)
+
+            except RetryLater as e:
+                attempt = e.attempt
+                await asyncio.sleep(e.delay)
+
+    @timed('rotation', specialise=True)
+    async def _rotate_secret_async(self, secret):
+        action = 'rotate_secret'
+
+        LOGGER.debug({'message': 'Rotating secret', 'data': secret})
+
+        try:
+            km, lease = await self._run_blocking(
+                loader.checkout_client, secret['provider'], secret['key']
+            )
+
+            valid, valid_message = km.validate_spec(secret)
+
+            if not valid:
+                return self._fail(valid_message, action=action)
+
+            async with self._provider_limit(secret['provider']):
+                with calling(secret['provider']), \
+                        timing.span('rotate', provider=secret['provider']):
+                    result = self._success(
+                        await self._requeueing(km.rotate, km.rotate_async, secret),
+                        action=action
+                    )
+
+            loader.release_client(km, lease)
+
+            return result
+
+        except Exception as e:
+            LOGGER.error(
+                "Failed to rotate key '{}' for provider '{}'!".format(
+                    secret['key'],
+                    secret['provider']
+                )
+            )
+            return self._fail(e, action=action)
+
+    @timed('bulk_distribution', specialise=False)
+    async def _distribute_secret_async(self, spec, secret):
+        LOGGER.debug({'message': 'Bulk distributing secrets', 'data': spec})
+
+        slots = asyncio.Semaphore(self._distribution_executor.max_workers)
+
+        async def distribute(target):
+            async with slots:
+                return await self._distribute_single_secret_async(
+                    target, secret
+                )
+
+        results = list(
+            await asyncio.gather(
+                *[distribute(target) for target in spec['distribute']]
+            )
+        )
+
+        return self._aggregate_distribution(results)
+
+    @timed('distribution', specialise=True)
+    async def _distribute_single_secret_async(self, target, secret):
+        LOGGER.debug(
+            {'message': 'Distributing secret to target', 'data': target})
+
+        try:
+            km_provider = loader.load_provider_client(target['provider'])
+        except InvalidSecretProvider as e:
+            return self._fail(e)
+
+        valid, valid_message = km_provider.validate_spec(target)
+
+        if not valid:
+            return self._fail(valid_message)
+
+        try:
+            km, lease = await self._run_blocking(
+                self._checkout_distribution_client, target
+            )
+
+            async with self._provider_limit(target['provider']):
+                with calling(target['provider']), \
+                        timing.span('distribute', provider=target['provider']):
+                    result = self._success(
+                        await self._requeueing(
+                            km.distribute, km.distribute_async, secret, target
+                        )
+                    )
+
+            loader.release_client(km, lease)
+
+            return result
+
+        except Exception as e:
+            LOGGER.error(
+                "Failed to distribute key '{}' for provider '{}'!".format(
+                    target['key'],
+                    target['provider']
+                )
+            )
+            return self._fail(e)
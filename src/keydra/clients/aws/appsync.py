@@ -1,8 +1,7 @@
-import boto3
-import boto3.session
-
 from botocore.exceptions import ClientError
 
+from keydra.clients.aws import session as aws_session
+
 
 class GetApiException(Exception):
     pass
@@ -21,13 +20,9 @@ class DeleteApiKeyException(Exception):
 
 
 class AppSyncClient:
-    def __init__(self, session=None, region_name=None, **kwargs):
-        if not session:
-            session = boto3.session.Session()
-
-        self._client = session.client(
-            service_name='appsync',
-            region_name=region_name
+    def __init__(self, session=None, region_name=None, role_arn=None, **kwargs):
+        self._client = aws_session.client(
+            'appsync', session=session, region_name=region_name, role_arn=role_arn
         )
 
     def list_api_keys(self, api_id, **kwargs):
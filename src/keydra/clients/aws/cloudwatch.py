@@ -1,60 +1,79 @@
-import boto3
+import asyncio
+import time
 
-from datetime import datetime
+from collections.abc import Mapping
+
+from keydra import metrics
+from keydra.clients.aws import session as aws_session
 
 
 class CloudwatchClient:
     instance = None
 
     class __CloudwatchClient:
-        def __init__(self, session, region_name=None):
-            if session is None:
-                session = boto3.session.Session()
-
-            self._client = session.client(
-                'cloudwatch', region_name=region_name
+        def __init__(self, session, region_name=None, backend='cloudwatch'):
+            self._client = aws_session.client(
+                'cloudwatch', session=session, region_name=region_name
             )
+            self._backend = metrics.BACKENDS[backend](self._client)
+            self.metrics = metrics.MetricsBuffer(self._backend)
 
-        def put_metric_data(self, *args, **kwargs):
-            self._client.put_metric_data(*args, **kwargs)
+        def put_metric_data(self, MetricData, Namespace):
+            self._backend.publish(Namespace, MetricData)
 
         def put_execution_time(self, name, execution_time):
-            self.put_metric_data(
-                MetricData=[
-                    {
-                        'MetricName': 'ExecutionTime',
-                        'Dimensions': [
-                            {
-                                'Name': 'Action',
-                                'Value': name
-                            }
-                        ],
-                        'Unit': 'Seconds',
-                        'Value': execution_time
-                    },
-                ],
-                Namespace='Keydra'
+            self.metrics.record(
+                'ExecutionTime',
+                execution_time,
+                dimensions={'Action': name},
+                unit='Seconds'
+            )
+
+        def put_concurrency_limit(self, scope, name, limit):
+            '''
+            :param scope: What the limit caps calls to, "provider" or "host"
+            :type scope: :class:`str`
+            :param name: Name of the provider or host
+            :type name: :class:`str`
+            :param limit: Calls currently allowed in flight
+            :type limit: :class:`int`
+            '''
+            self.metrics.record(
+                'ConcurrencyLimit',
+                limit,
+                dimensions={'Scope': scope, 'Name': name},
+                unit='Count'
             )
 
-    def __new__(cls, session, region_name=None):
+        def flush(self):
+            self.metrics.flush()
+
+    def __new__(cls, session, region_name=None, backend='cloudwatch'):
         if not CloudwatchClient.instance:
             CloudwatchClient.instance = CloudwatchClient.__CloudwatchClient(
                 session,
-                region_name=region_name
+                region_name=region_name,
+                backend=backend
             )
 
         return CloudwatchClient.instance
 
     @staticmethod
-    def getInstance(session, region_name=None):
-        return CloudwatchClient(session, region_name)
+    def getInstance(session, region_name=None, backend='cloudwatch'):
+        '''
+        :param backend: How metrics are published, "cloudwatch"
+            (PutMetricData) or "emf" (Embedded Metric Format log records)
+        :type backend: :class:`str`
+        '''
+        return CloudwatchClient(session, region_name, backend=backend)
 
 
 def timed(metric_name, specialise=True):
     '''
-    Publishes execution time metric to Cloudwatch.
+    Records execution time metric, published to Cloudwatch in batches.
 
-    Metrics are posted under the 'ExecutionTime' metric name, in seconds.
+    Metrics are posted under the 'ExecutionTime' metric name, in seconds
+    (with sub-second precision).
 
     Attemps to decorate the dimension if `provider` is part of the request.
 
@@ -65,38 +84,58 @@ def timed(metric_name, specialise=True):
     :type specialise: :class:`bool`
     :returns: original return of invoked function or method
     '''
-    start = datetime.now()
+    def dimensionality_for(args):
+        dimensionality = metric_name
+
+        # This is pure panic and paranoia! Don't want it to fail rotations
+        # or distributions... EVAH!
+        try:
+            if specialise:
+                for arg in args:
+                    if isinstance(arg, Mapping) and 'provider' in arg:
+                        dimensionality = '{}_{}'.format(
+                            metric_name,
+                            arg.get('provider', 'unknown').lower()
+                        )
+                        break
+        except Exception as e:
+            print(
+                'Struggle crafting metric dimensionality: {}'.format(e)
+            )
+
+        return dimensionality
+
+    def publish(dimensionality, start):
+        try:
+            execution_time = round(time.perf_counter() - start, 3)
+
+            CloudwatchClient.getInstance(None).put_execution_time(
+                dimensionality, execution_time
+            )
+        except Exception as e:
+            print(e)
 
     def decorator(f):
+        if asyncio.iscoroutinefunction(f):
+            async def timed_coroutine(*args, **kwargs):
+                dimensionality = dimensionality_for(args)
+                start = time.perf_counter()
+
+                resp = await f(*args, **kwargs)
+
+                publish(dimensionality, start)
+
+                return resp
+
+            return timed_coroutine
+
         def timed_execution(*args, **kwargs):
-            dimensionality = metric_name
-
-            # This is pure panic and paranoia! Don't want it to fail rotations
-            # or distributions... EVAH!
-            try:
-                if specialise:
-                    for arg in args:
-                        if isinstance(arg, dict) and 'provider' in arg:
-                            dimensionality = '{}_{}'.format(
-                                metric_name,
-                                arg.get('provider', 'unknown').lower()
-                            )
-                            break
-            except Exception as e:
-                print(
-                    'Struggle crafting metric dimensionality: {}'.format(e)
-                )
+            dimensionality = dimensionality_for(args)
+            start = time.perf_counter()
 
             resp = f(*args, **kwargs)
 
-            try:
-                execution_time = (datetime.now() - start).seconds
-
-                CloudwatchClient.getInstance(None).put_execution_time(
-                    dimensionality, execution_time
-                )
-            except Exception as e:
-                print(e)
+            publish(dimensionality, start)
 
             return resp
 
@@ -1,21 +1,16 @@
-import boto3
-import boto3.session
-
 from botocore.exceptions import ClientError
 
+from keydra.clients.aws import session as aws_session
+
 
 class UpdateSecretException(Exception):
     pass
 
 
 class FirehoseClient(object):
-    def __init__(self, session=None, region_name=None, **kwargs):
-        if not session:
-            session = boto3.session.Session()
-
-        self._client = session.client(
-            service_name='firehose',
-            region_name=region_name
+    def __init__(self, session=None, region_name=None, role_arn=None, **kwargs):
+        self._client = aws_session.client(
+            'firehose', session=session, region_name=region_name, role_arn=role_arn
         )
 
     def stream_exists(self, streamname):
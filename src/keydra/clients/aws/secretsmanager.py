@@ -1,8 +1,11 @@
-import boto3
-import boto3.session
-
 from botocore.exceptions import ClientError
 
+from keydra.clients.aws import session as aws_session
+
+
+# Maximum number of secrets BatchGetSecretValue accepts by ID
+BATCH_GET_LIMIT = 20
+
 
 class GetSecretException(Exception):
     pass
@@ -17,13 +20,9 @@ class InsertSecretException(Exception):
 
 
 class SecretsManagerClient(object):
-    def __init__(self, session=None, region_name=None, **kwargs):
-        if not session:
-            session = boto3.session.Session()
-
-        self._client = session.client(
-            service_name='secretsmanager',
-            region_name=region_name
+    def __init__(self, session=None, region_name=None, role_arn=None, **kwargs):
+        self._client = aws_session.client(
+            'secretsmanager', session=session, region_name=region_name, role_arn=role_arn
         )
 
     def get_secret_value(self, secret_id, version_stage='current') -> str:
@@ -51,6 +50,43 @@ class SecretsManagerClient(object):
 
         return resp['SecretString']
 
+    def batch_get_secret_values(self, secret_ids) -> dict:
+        '''
+        Retrieves the current value of several secrets at once, 20 per
+        request. Secrets that can't be read are left out.
+
+        :param secret_ids: IDs (friendly names) of the secrets
+        :type secret_ids: :class:`list`
+        :returns: Dict of secret ID to a tuple of secret string and version
+        :rtype: :class:`dict`
+        :raises: :class:`AttributeError` if the installed boto3 doesn't
+            support BatchGetSecretValue
+        '''
+        secret_ids = list(secret_ids)
+        batch_get = self._client.batch_get_secret_value
+        secrets = {}
+
+        for start in range(0, len(secret_ids), BATCH_GET_LIMIT):
+            request = {
+                'SecretIdList': secret_ids[start:start + BATCH_GET_LIMIT]
+            }
+
+            while True:
+                resp = batch_get(**request)
+
+                for secret in resp.get('SecretValues', []):
+                    if 'SecretString' in secret:
+                        secrets[secret['Name']] = (
+                            secret['SecretString'], secret.get('VersionId')
+                        )
+
+                if not resp.get('NextToken'):
+                    break
+
+                request['NextToken'] = resp['NextToken']
+
+        return secrets
+
     def create_secret(self, secret_name, secret_value, **kwargs):
         '''
         Creates secret in SecretsManager
@@ -140,6 +176,25 @@ class SecretsManagerClient(object):
                 'Error accessing {}: {}'.format(secret_id, e)
             )
 
+    def current_version(self, secret_id):
+        '''
+        Finds the version of a secret labelled AWSCURRENT, without reading
+        its value.
+
+        :param secret_id: ID (ARN or friendly secret name) of the secret
+        :type secret_id: :class:`str`
+        :returns: The ID of the current version, None if there isn't one
+        :rtype: :class:`str`
+        :raises: :class:`GetSecretException` if secret doesn't exist
+        '''
+        versions = self.describe_secret(secret_id).get('VersionIdsToStages', {})
+
+        for version_id, stages in versions.items():
+            if 'AWSCURRENT' in stages:
+                return version_id
+
+        return None
+
     def update_secret(self, secret_id, secret_value):
         '''
         Stores a new encrypted secret value in the specified secret by
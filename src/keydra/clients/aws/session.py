@@ -0,0 +1,108 @@
+import threading
+import time
+
+import boto3
+import boto3.session
+
+from botocore.config import Config
+
+from keydra import deadline
+from keydra import limiter
+from keydra import telemetry
+
+
+# Global variables are reused across execution contexts (if available)
+SESSION = boto3.session.Session()
+
+ROLE_SESSION_NAME = 'keydra'
+
+# Assumed role credentials are renewed this long before they expire (seconds)
+ROLE_REFRESH_MARGIN = 300
+
+# boto3 has no per-call timeout, clients get the ceiling of a call and check
+# the deadline of the run before each call instead
+CLIENT_CONFIG = Config(
+    connect_timeout=5, read_timeout=deadline.DEFAULT_CALL_CEILING
+)
+
+_CLIENTS = {}
+_ROLE_SESSIONS = {}
+_LOCK = threading.RLock()
+
+
+def client(service_name, session=None, region_name=None, role_arn=None):
+    '''
+    Gets a boto3 client, built once and shared by everyone asking for the
+    same service, region and role. boto3 clients are thread safe, and take
+    tens of milliseconds (and a fair bit of memory) to build.
+
+    Clients of sessions other than the shared one (e.g. handed over by
+    callers with their own credentials) are built as asked and not cached.
+
+    :param service_name: AWS service, e.g. 'secretsmanager'
+    :type service_name: :class:`str`
+    :param session: Optional session to build the client from, the shared
+        one by default
+    :type session: :class:`boto3.session.Session`
+    :param region_name: Region of the client, the region of the session by
+        default
+    :type region_name: :class:`str`
+    :param role_arn: Optional role to assume for the client
+    :type role_arn: :class:`str`
+    :returns: boto3 client
+    '''
+    if session is not None and session is not SESSION:
+        return _build(session, service_name, region_name)
+
+    with _LOCK:
+        session = _role_session(role_arn) if role_arn else SESSION
+        key = (service_name, region_name or SESSION.region_name, role_arn)
+        cached = _CLIENTS.get(key)
+
+        # Clients of a role are rebuilt along with its credentials
+        if cached is None or cached[0] is not session:
+            cached = (session, _build(session, service_name, region_name))
+            _CLIENTS[key] = cached
+
+        return cached[1]
+
+
+def _build(session, service_name, region_name):
+    built = session.client(
+        service_name=service_name, region_name=region_name,
+        config=CLIENT_CONFIG
+    )
+
+    return limiter.limit_client(
+        deadline.guard_client(telemetry.instrument_client(built))
+    )
+
+
+def _role_session(role_arn):
+    cached = _ROLE_SESSIONS.get(role_arn)
+
+    if cached is not None and cached[1] - ROLE_REFRESH_MARGIN > time.time():
+        return cached[0]
+
+    creds = client('sts').assume_role(
+        RoleArn=role_arn, RoleSessionName=ROLE_SESSION_NAME
+    )['Credentials']
+
+    session = boto3.session.Session(
+        aws_access_key_id=creds['AccessKeyId'],
+        aws_secret_access_key=creds['SecretAccessKey'],
+        aws_session_token=creds['SessionToken'],
+        region_name=SESSION.region_name
+    )
+    _ROLE_SESSIONS[role_arn] = (session, creds['Expiration'].timestamp())
+
+    return session
+
+
+def clear():
+    '''
+    Forgets all the clients built so far.
+    '''
+    with _LOCK:
+        _CLIENTS.clear()
+        _ROLE_SESSIONS.clear()
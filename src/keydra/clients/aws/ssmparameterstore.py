@@ -1,8 +1,7 @@
-import boto3
-import boto3.session
-
 from botocore.exceptions import ClientError
 
+from keydra.clients.aws import session as aws_session
+
 
 class GetParameterException(Exception):
     pass
@@ -13,13 +12,9 @@ class PutParameterException(Exception):
 
 
 class SSMClient(object):
-    def __init__(self, session=None, region_name=None, **kwargs):
-        if not session:
-            session = boto3.session.Session()
-
-        self._client = session.client(
-            service_name='ssm',
-            region_name=region_name
+    def __init__(self, session=None, region_name=None, role_arn=None, **kwargs):
+        self._client = aws_session.client(
+            'ssm', session=session, region_name=region_name, role_arn=role_arn
         )
 
     def parameter_exists(self, param_name) -> bool:
@@ -1,7 +1,8 @@
-import requests
-
 from requests.auth import HTTPBasicAuth
 
+from keydra.clients import http
+from keydra.config_cache import CONFIG_CACHE
+
 
 API_URL = 'https://api.bitbucket.org/2.0'
 API_TEAM = '{}/teams'.format(API_URL)
@@ -21,7 +22,7 @@ class BitbucketClient(object):
         self._authorizer = HTTPBasicAuth(user, passwd)
 
     def _query(self, url):
-        resp = requests.get(url, auth=self._authorizer)
+        resp = http.get(url, auth=self._authorizer)
 
         resp.raise_for_status()
 
@@ -31,7 +32,7 @@ class BitbucketClient(object):
             return resp.text
 
     def _post(self, url, **kwargs):
-        resp = requests.post(url, auth=self._authorizer, **kwargs)
+        resp = http.post(url, auth=self._authorizer, **kwargs)
 
         resp.raise_for_status()
 
@@ -41,7 +42,7 @@ class BitbucketClient(object):
             return resp.text
 
     def _put(self, url, **kwargs):
-        resp = requests.put(url, auth=self._authorizer, **kwargs)
+        resp = http.put(url, auth=self._authorizer, **kwargs)
 
         resp.raise_for_status()
 
@@ -51,7 +52,7 @@ class BitbucketClient(object):
             return resp.text
 
     def _delete(self, url):
-        resp = requests.delete(url, auth=self._authorizer)
+        resp = http.delete(url, auth=self._authorizer)
 
         resp.raise_for_status()
 
@@ -478,4 +479,17 @@ class BitbucketClient(object):
         '''
         url = '{}/{}/{}/{}'.format(API_REPO, username, repo, path)
 
-        return self._query(url)
+        # Only downloaded again if changed since last fetched
+        cached = CONFIG_CACHE.get(url)
+        headers = {'If-None-Match': cached.validator} if cached else {}
+
+        resp = http.get(url, auth=self._authorizer, headers=headers)
+
+        if cached is not None and resp.status_code == 304:
+            return cached.content
+
+        resp.raise_for_status()
+
+        CONFIG_CACHE.put(url, resp.headers.get('ETag'), resp.text)
+
+        return resp.text
@@ -1,4 +1,4 @@
-import requests
+from keydra.clients import http
 
 
 API_URL = 'https://api.cloudflare.com/client/v4'
@@ -20,7 +20,7 @@ class CloudflareClient(object):
         }
 
     def _query(self, url):
-        resp = requests.get(url, headers=self._auth_headers)
+        resp = http.get(url, headers=self._auth_headers)
 
         resp.raise_for_status()
 
@@ -30,7 +30,7 @@ class CloudflareClient(object):
             return resp.text
 
     def _post(self, url, **kwargs):
-        resp = requests.post(url, headers=self._auth_headers, **kwargs)
+        resp = http.post(url, headers=self._auth_headers, **kwargs)
 
         resp.raise_for_status()
 
@@ -40,7 +40,7 @@ class CloudflareClient(object):
             return resp.text
 
     def _put(self, url, **kwargs):
-        resp = requests.put(url, headers=self._auth_headers, **kwargs)
+        resp = http.put(url, headers=self._auth_headers, **kwargs)
 
         resp.raise_for_status()
 
@@ -50,7 +50,7 @@ class CloudflareClient(object):
             return resp.text
 
     def _delete(self, url):
-        resp = requests.delete(url, headers=self._auth_headers)
+        resp = http.delete(url, headers=self._auth_headers)
 
         resp.raise_for_status()
 
@@ -1,5 +1,8 @@
-from contentful_management import Client
-from contentful_management import array
+from keydra import deadline
+from keydra.imports import lazy_import
+
+Client = lazy_import('contentful_management', 'Client')
+array = lazy_import('contentful_management.array')
 
 
 class ContentfulClient(object):
@@ -11,11 +14,14 @@ class ContentfulClient(object):
         :type token: :class:`string`
         '''
 
+        # The SDK sends its requests with no timeout, nor a way to set one,
+        # so calls are only checked against the deadline as they start
         self._client = Client(
             access_token=token
         )
         self._validate_client()
 
+    @deadline.guard
     def _validate_client(self):
         '''
         Validate we have a working API connection
@@ -28,6 +34,7 @@ class ContentfulClient(object):
                 'Could not connect to Contentful API!'
             )
 
+    @deadline.guard
     def get_tokens(self):
         '''
         Get a list of the current tokens
@@ -37,6 +44,7 @@ class ContentfulClient(object):
         '''
         return self._client.personal_access_tokens().all()
 
+    @deadline.guard
     def create_token(self, name, readonly=True):
         '''
         Create a new personal access token
@@ -62,6 +70,7 @@ class ContentfulClient(object):
         )
         return new_pa_token
 
+    @deadline.guard
     def revoke_token(self, token_id):
         '''
         Revoke a token with a specified ID
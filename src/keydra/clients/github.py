@@ -1,11 +1,15 @@
-import requests
 import json
 
 from copy import deepcopy
 
 from base64 import b64encode
 
-from nacl import encoding, public
+from keydra.clients import http
+from keydra.config_cache import CONFIG_CACHE
+from keydra.imports import lazy_import
+
+encoding = lazy_import('nacl.encoding')
+public = lazy_import('nacl.public')
 
 
 API_URL = 'https://api.github.com'
@@ -34,28 +38,28 @@ class GithubClient(object):
         else:
             headers = self._authorizer
 
-        resp = requests.get(url, headers=headers)
+        resp = http.get(url, headers=headers)
 
         resp.raise_for_status()
 
         return resp.text
 
     def _post(self, url, **kwargs):
-        resp = requests.post(url, auth=self._authorizer, **kwargs)
+        resp = http.post(url, auth=self._authorizer, **kwargs)
 
         resp.raise_for_status()
 
         return resp.text
 
     def _put(self, url, **kwargs):
-        resp = requests.put(url, headers=self._authorizer, **kwargs)
+        resp = http.put(url, headers=self._authorizer, **kwargs)
 
         resp.raise_for_status()
 
         return resp.text
 
     def _delete(self, url):
-        resp = requests.delete(url, auth=self._authorizer)
+        resp = http.delete(url, auth=self._authorizer)
 
         resp.raise_for_status()
 
@@ -172,4 +176,23 @@ class GithubClient(object):
         }
         url = '{}/repos/{}/{}/contents/{}'.format(API_URL, org, repo, path)
 
-        return self._query(url, extraheaders=extras)
+        # Only downloaded again if changed since last fetched (Github doesn't
+        # count these towards the rate limit)
+        cached = CONFIG_CACHE.get(url)
+
+        if cached is not None:
+            extras['If-None-Match'] = cached.validator
+
+        headers = deepcopy(self._authorizer)
+        headers.update(extras)
+
+        resp = http.get(url, headers=headers)
+
+        if cached is not None and resp.status_code == 304:
+            return cached.content
+
+        resp.raise_for_status()
+
+        CONFIG_CACHE.put(url, resp.headers.get('ETag'), resp.text)
+
+        return resp.text
@@ -1,8 +1,15 @@
-from gitlab import Gitlab as GitlabPythonClient
-from gitlab.v4.objects import ProjectManager
+from typing import TYPE_CHECKING
 
+from keydra.clients import http
+from keydra.config_cache import CONFIG_CACHE
+from keydra.imports import lazy_import
 from keydra.logging import get_logger
 
+if TYPE_CHECKING:
+    from gitlab.v4.objects import ProjectManager
+
+GitlabPythonClient = lazy_import('gitlab', 'Gitlab')
+
 LOGGER = get_logger()
 API_URL = 'https://gitlab.com/'
 
@@ -16,10 +23,12 @@ class GitlabClient:
         :param access_token: Project Access Token
         :type access_token: :class:`str`
         '''
-        self.gpc = GitlabPythonClient(API_URL, access_token)
+        self.gpc = GitlabPythonClient(
+            API_URL, access_token, session=http.sdk_session()
+        )
         self.PROJECT_CACHE = {}
 
-    def _get_project_manager(self, repo_name) -> ProjectManager:
+    def _get_project_manager(self, repo_name) -> 'ProjectManager':
         if not self.PROJECT_CACHE.get(repo_name):
             self.PROJECT_CACHE[repo_name] = self.gpc.projects.get(repo_name)
         return self.PROJECT_CACHE[repo_name]
@@ -63,8 +72,24 @@ class GitlabClient:
         :rtype: :class:`str`
         '''
         pm = self._get_project_manager(repo_name)
+        key = '{}{}/{}/{}'.format(API_URL, repo_name, repo_branch, file_path)
+
+        # Only downloaded again if its blob (content) SHA changed since last
+        # fetched, which a HEAD request tells
+        cached = CONFIG_CACHE.get(key)
+
+        if cached is not None:
+            headers = pm.files.head(file_path=file_path, ref=repo_branch)
+
+            if headers.get('X-Gitlab-Blob-Id') == cached.validator:
+                return cached.content
+
         encoded_file = pm.files.get(
             file_path=file_path,
             ref=repo_branch
         )
-        return encoded_file.decode()
+        content = encoded_file.decode()
+
+        CONFIG_CACHE.put(key, getattr(encoded_file, 'blob_id', None), content)
+
+        return content
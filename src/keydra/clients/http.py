@@ -0,0 +1,176 @@
+import threading
+
+from http.cookiejar import DefaultCookiePolicy
+
+from keydra import deadline
+from keydra import limiter
+from keydra import retry
+from keydra import telemetry
+from keydra.imports import lazy_import
+
+requests = lazy_import('requests')
+HTTPAdapter = lazy_import('requests.adapters', 'HTTPAdapter')
+
+
+# Seconds to wait for a connection, and then for each read of the response
+# (cut shorter by the deadline of the run, if any)
+CONNECT_TIMEOUT = 5
+READ_TIMEOUT = deadline.DEFAULT_CALL_CEILING
+
+DEFAULT_TIMEOUT = (CONNECT_TIMEOUT, READ_TIMEOUT)
+
+# Hosts kept a pool of connections for, and connections kept in each pool
+DEFAULT_HOSTS = 20
+DEFAULT_POOL_SIZE = 10
+
+# Global variables are reused across execution contexts (if available)
+_SESSION = None
+_POOL_SIZE = None
+_LOCK = threading.Lock()
+
+
+def _timeout():
+    read = deadline.call_timeout(default=READ_TIMEOUT)
+
+    return (min(CONNECT_TIMEOUT, read), read)
+
+
+def _build_session(pool_size):
+    session = requests.Session()
+
+    # Shared by clients with different credentials, so nothing is kept
+    # from one call to the next
+    session.cookies.set_policy(DefaultCookiePolicy(allowed_domains=[]))
+
+    adapter = HTTPAdapter(
+        pool_connections=DEFAULT_HOSTS, pool_maxsize=pool_size
+    )
+    adapter.send = telemetry.traced(adapter.send)
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+
+    return session
+
+
+def session():
+    '''
+    :returns: The HTTP session shared by all clients, keeping connections to
+        each host alive (TLS handshakes are a large share of a short call),
+        its calls traced by `telemetry.record_calls`
+    :rtype: :class:`requests.Session`
+    '''
+    global _SESSION, _POOL_SIZE
+
+    if _SESSION is None:
+        with _LOCK:
+            if _SESSION is None:
+                _POOL_SIZE = _POOL_SIZE or DEFAULT_POOL_SIZE
+                _SESSION = _build_session(_POOL_SIZE)
+
+    return _SESSION
+
+
+def configure(pool_size):
+    '''
+    Sizes the connection pools for the number of calls Keydra may have in
+    flight against the same host. Pools only ever grow, so connections kept
+    alive by a previous run are not thrown away.
+
+    :param pool_size: Connections kept alive per host
+    :type pool_size: :class:`int`
+    '''
+    global _SESSION, _POOL_SIZE
+
+    pool_size = max(int(pool_size or 0), DEFAULT_POOL_SIZE)
+
+    with _LOCK:
+        if _POOL_SIZE is not None and pool_size <= _POOL_SIZE:
+            return
+
+        _POOL_SIZE = pool_size
+
+        if _SESSION is not None:
+            previous, _SESSION = _SESSION, _build_session(pool_size)
+            previous.close()
+
+
+def request(method, url, **kwargs):
+    '''
+    Same as `requests.request`, on the shared session and with default
+    timeouts, within the time left in the run. Calls in flight against the
+    host are held to its adaptive limit, cut when it answers 429 or 503.
+
+    :returns: The response
+    :rtype: :class:`requests.Response`
+    :raises DeadlineExceeded: The run has no time left for the call
+    '''
+    host = limiter.host_of(url)
+
+    with limiter.HOSTS.get(host).slot(host) as slot:
+        if 'timeout' not in kwargs:
+            kwargs['timeout'] = _timeout()
+
+        response = session().request(method, url, **kwargs)
+
+        if response.status_code in retry.THROTTLING_STATUSES:
+            slot.throttled()
+
+        return response
+
+
+def sdk_session():
+    '''
+    HTTP session for a provider SDK to send its requests through. Requests
+    sent without a timeout (as most SDKs do) get the default timeouts, within
+    the time left in the run when they are sent, so clients kept across
+    runs do not hold on to the timeout of the run that built them.
+
+    :returns: A new session, for the SDK client alone (SDKs keep login
+        cookies and headers on it), its calls traced like those of `session`
+    :rtype: :class:`requests.Session`
+    '''
+    sdk = requests.Session()
+    adapter = HTTPAdapter()
+    send = telemetry.traced(adapter.send)
+
+    def send_in_time(request, timeout=None, **kwargs):
+        return send(
+            request, timeout=_timeout() if timeout is None else timeout,
+            **kwargs
+        )
+
+    adapter.send = send_in_time
+    sdk.mount('https://', adapter)
+    sdk.mount('http://', adapter)
+
+    return sdk
+
+
+def get(url, **kwargs):
+    return request('GET', url, **kwargs)
+
+
+def post(url, **kwargs):
+    return request('POST', url, **kwargs)
+
+
+def put(url, **kwargs):
+    return request('PUT', url, **kwargs)
+
+
+def delete(url, **kwargs):
+    return request('DELETE', url, **kwargs)
+
+
+def clear():
+    '''
+    Closes the shared session, and its connections.
+    '''
+    global _SESSION, _POOL_SIZE
+
+    with _LOCK:
+        if _SESSION is not None:
+            _SESSION.close()
+
+        _SESSION = None
+        _POOL_SIZE = None
@@ -1,7 +1,10 @@
-import requests
-import xmltodict
 from collections import OrderedDict
 
+from keydra.clients import http
+from keydra.imports import lazy_import
+
+xmltodict = lazy_import('xmltodict')
+
 
 # https://www.qualys.com/platform-identification/
 API_URL = {
@@ -72,7 +75,7 @@ class QualysClient(object):
 
         api_url = '{}/{}'.format(self._baseurl, url)
 
-        response = requests.request(
+        response = http.request(
                 "GET",
                 api_url,
                 headers=self._headers,
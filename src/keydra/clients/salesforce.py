@@ -1,7 +1,10 @@
 import validators
 import json
 
-from simple_salesforce import Salesforce
+from keydra.clients import http
+from keydra.imports import lazy_import
+
+Salesforce = lazy_import('simple_salesforce', 'Salesforce')
 
 
 class SalesforceClient(object):
@@ -27,7 +30,8 @@ class SalesforceClient(object):
                 username=username,
                 password=password,
                 security_token=token,
-                domain=domain
+                domain=domain,
+                session=http.sdk_session()
             )
 
         self._base_url = 'https://{}/services/data/v{}/sobjects'.format(
@@ -1,8 +1,10 @@
-from zeep import Client
-from zeep.transports import Transport
-from zeep.wsse.username import UsernameToken
-from zeep import helpers
-from requests import Session
+from keydra.clients import http
+from keydra.imports import lazy_import
+
+Client = lazy_import('zeep', 'Client')
+Transport = lazy_import('zeep.transports', 'Transport')
+UsernameToken = lazy_import('zeep.wsse.username', 'UsernameToken')
+helpers = lazy_import('zeep.helpers')
 
 
 class SalesforceMarketingCloudClient(object):
@@ -28,9 +30,11 @@ class SalesforceMarketingCloudClient(object):
         wsdl = "https://{}.soap.marketingcloudapis.com/ETFramework.wsdl".format(subdomain)
 
         # Set headers & Cache wsdl
-        session = Session()
+        session = http.sdk_session()
         session.headers.update({'SOAPAction': 'Update', 'Content-Type': 'text/xml'})
-        transport = Transport(session=session)
+        # No timeout of the transport's own, so loading the WSDL and calling
+        # operations both get the timeouts of the session, within the deadline
+        transport = Transport(session=session, timeout=None)
 
         # Init Zeep Client to SFMC
         self._client = Client(
@@ -1,22 +1,42 @@
 import json
-import requests
 import time
 
-import splunklib.client as splunkclient
-
 import urllib.parse as urlparse
 
-from splunklib.binding import HTTPError
+from keydra import deadline
+from keydra.clients import http
+from keydra.imports import lazy_import
 
 from keydra.logging import get_logger
 
-from keydra.providers.base import exponential_backoff_retry
+from keydra.retry import retrying
 
 
 LOGGER = get_logger()
+
+splunkclient = lazy_import('splunklib.client')
+splunkbinding = lazy_import('splunklib.binding')
 ADMIN_API = 'https://admin.splunk.com'
 
 
+def _handler(verify):
+    '''
+    HTTP handler for the Splunk SDK, timing out each request within the time
+    left in the run when it is sent (its own handler fixes the timeout once).
+
+    :param verify: Verify TLS
+    :type verify: :class:`bool`
+    '''
+    def request(url, message, **kwargs):
+        timeout = deadline.call_timeout()
+
+        return splunkbinding.handler(timeout=timeout, verify=verify)(
+            url, message, **kwargs
+        )
+
+    return request
+
+
 class AppNotInstalledException(Exception):
     pass
 
@@ -60,7 +80,8 @@ class SplunkClient(object):
                 port=port,
                 username=username,
                 password=password,
-                verify=verify
+                verify=verify,
+                handler=_handler(verify)
             )
             self._service.login()
 
@@ -68,17 +89,17 @@ class SplunkClient(object):
 
     def _get(self, url: str, params: dict) -> dict:
         params['output_mode'] = 'json'
-        resp = requests.get(url, headers=self._auth_headers, params=params)
+        resp = http.get(url, headers=self._auth_headers, params=params)
         resp.raise_for_status()
         return resp.json()
 
     def _post(self, url: str, data: dict) -> dict:
-        resp = requests.post(url, headers=self._auth_headers, params={'output_mode': 'json'}, data=data)
+        resp = http.post(url, headers=self._auth_headers, params={'output_mode': 'json'}, data=data)
         resp.raise_for_status()
         return resp.json()
 
     def _delete(self, url: str, data: dict) -> None:
-        resp = requests.delete(url, headers=self._auth_headers, params={'output_mode': 'json'}, data=data)
+        resp = http.delete(url, headers=self._auth_headers, params={'output_mode': 'json'}, data=data)
         resp.raise_for_status()
 
     def update_app_config(self, app, path, obj, data):
@@ -121,7 +142,7 @@ class SplunkClient(object):
                 **post_data
             )
 
-        except HTTPError as error:
+        except splunkbinding.HTTPError as error:
             # We could be here because the object doesn't exist
             # or some other error
             # TODO: Find some way to massage the Splunk API to make this
@@ -190,7 +211,7 @@ class SplunkClient(object):
             )
             exists = True
 
-        except HTTPError as e:
+        except splunkbinding.HTTPError as e:
             if e.status == 404:
                 # A 404 response means the storepass does not exist
                 exists = False
@@ -409,7 +430,7 @@ class SplunkClient(object):
                     '/services/dmc/tasks/{}'.format(id),
                     output_mode='json'
                 )['body'].read()
-            except HTTPError:
+            except splunkbinding.HTTPError:
                 raise Exception('Could not fetch status for task {}'.format(id))
 
             status = json.loads(statusresp)['entry'][0]
@@ -431,7 +452,7 @@ class SplunkClient(object):
             'Deployment task did not complete within {} seconds! Aborting.'.format(timeout)
         )
 
-    @exponential_backoff_retry(5, exception_type=TaskAlreadyInProgressException)
+    @retrying(5, base=2, retry_on=TaskAlreadyInProgressException)
     def _delete_splunkcloud_httpinput(self, inputname):
         '''
         Delete a Splunk HEC token on Splunk Cloud (Classic)
@@ -450,7 +471,7 @@ class SplunkClient(object):
                 '/services/dmc/config/inputs/__indexers/http/{}'.format(inputname),
                 output_mode='json'
             )
-        except HTTPError as error:
+        except splunkbinding.HTTPError as error:
             if 'deployment task is still in progress' in str(error.body):
                 raise TaskAlreadyInProgressException()
 
@@ -460,7 +481,7 @@ class SplunkClient(object):
 
         return self._get_last_splunkcloud_deploytask()
 
-    @exponential_backoff_retry(5, exception_type=TaskAlreadyInProgressException)
+    @retrying(5, base=2, retry_on=TaskAlreadyInProgressException)
     def _create_splunkcloud_httpinput(self, inputname, inputconfig):
         '''
         Create a Splunk HEC input on Splunk Cloud (Classic)
@@ -483,7 +504,7 @@ class SplunkClient(object):
                 body=json.dumps(inputconfig)
             )
 
-        except HTTPError as error:
+        except splunkbinding.HTTPError as error:
             if 'deployment task is still in progress' in str(error.body):
                 LOGGER.info('Could not deploy task, another task is already in progress. Retrying.')
                 raise TaskAlreadyInProgressException()
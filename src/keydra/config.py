@@ -1,10 +1,15 @@
-import copy
-import math
-
 from keydra import loader
+from keydra import timing
+from keydra.config_index import ConfigIndex
 from keydra.exceptions import ConfigException
 from keydra.exceptions import InvalidSecretProvider
 from keydra.logging import get_logger
+from keydra.model import SecretSpec, as_dict, override
+from keydra.plan import DEFAULT_PLAN_DIR
+from keydra.plan import LocalFilePlanStore
+from keydra.plan import RotationPlan
+from keydra.plan import batch_bounds
+from keydra.plan import code_version
 
 KEYDRA_CONFIG_REPO = 'keydra-config'
 
@@ -18,6 +23,10 @@ ENV_TYPE_SPEC = {
 SECRETS_SPEC = ['key', 'provider']
 SECRET_ENV_SPEC = ['key', 'provider', 'source', 'envs']
 
+# Value of the "scope" config (KEYDRA_CFG_SCOPE) to only load the secrets
+# listed for the environment Keydra runs in
+SCOPE_ENVIRONMENT = 'environment'
+
 ALLOWED_ROTATION_SCHEDULES = ['nightly',
                               'weekly',
                               'monthly',
@@ -37,11 +46,14 @@ class KeydraConfig(object):
 
         self._config = config
         self._sts = sts_client
+        self._sids = {}
 
     def _fetch_current_account(self):
         return self._sts.get_caller_identity()['Account']
 
-    def _validate_spec(self, environments, secrets):
+    def _validate_spec(self, environments, secrets, scoped_env=None):
+        index = ConfigIndex.for_config(environments, secrets)
+
         for env, env_desc in environments.items():
             for key in ENVS_SPEC:
                 if key not in env_desc:
@@ -55,6 +67,10 @@ class KeydraConfig(object):
                         'AWS Environment is missing attribute: {}'.format(key)
                     )
 
+            # Only the secrets of the scoped environment were loaded
+            if scoped_env is not None and env != scoped_env:
+                continue
+
             for secret in env_desc.get('secrets', []):
                 if secret not in secrets:
                     raise ConfigException(
@@ -92,14 +108,33 @@ class KeydraConfig(object):
                     if env_restr == '*':
                         continue
 
-                    if env_restr not in set(environments.keys()):
+                    if env_restr not in index.env_names:
                         raise ConfigException(
                             'Environment "{}" from secrets.yaml is not '
                             'present in environments.yaml'.format(env_restr)
                         )
 
+    def _validate_once(self, config, scoped_env=None):
+        index = ConfigIndex.for_config(config[0], config[1])
+
+        if index.validated:
+            LOGGER.debug('Config unchanged since last validated')
+            return
+
+        if scoped_env is None:
+            self._validate_spec(*config)
+        else:
+            self._validate_spec(*config, scoped_env=scoped_env)
+
+        index.validated = True
+
     def _guess_current_environment(self, environments):
-        account_id = self._fetch_current_account()
+        return self._environment_of(
+            environments, self._fetch_current_account()
+        )
+
+    @staticmethod
+    def _environment_of(environments, account_id):
         LOGGER.debug('Attempting to identify the environment from account {}'
                      .format(account_id))
 
@@ -113,6 +148,138 @@ class KeydraConfig(object):
         raise ConfigException('No environment is mapped to AWS account {}'
                               .format(account_id))
 
+    def _shortlist_secret(self, index, current_env_name, sid, secret, rotate):
+        '''
+        :returns: The spec of the secret to process in a run of the schedule
+            in the environment, with its distribution targets expanded. None
+            if not to process.
+        :rtype: :class:`SecretSpec`
+        '''
+        current_env = index.environments[current_env_name]
+
+        if sid not in index.env_secrets(current_env_name):
+            LOGGER.debug(
+                'Skipping {} as it is not listed for environment: {}'
+                .format(sid, current_env_name))
+            return None
+
+        if secret.get('rotate', 'adhoc') != rotate and rotate != 'adhoc':
+            LOGGER.debug(
+                'Skipping {} as its rotation period ({}) doesn\'t '
+                'match current ({})'
+                .format(secret, secret.get('rotate', 'adhoc'), rotate))
+            return None
+
+        if 'distribute' not in secret:
+            return SecretSpec.from_dict(secret)
+
+        current_secret = override(secret, distribute=[])
+        context = {
+            'environment': {current_env_name: current_env},
+            'action': 'distribute',
+            'rotate': rotate
+        }
+
+        for target in index.targets(sid, current_env_name):
+            try:
+                provider = loader.load_provider_client(
+                    target['provider']
+                )
+
+                new_spec = provider.pre_process_spec(
+                    target, context=context
+                )
+
+                if any(
+                    [
+                        isinstance(new_spec, list),
+                        isinstance(new_spec, tuple)
+                    ]
+                ):
+                    current_secret['distribute'].extend(new_spec)
+                else:
+                    current_secret['distribute'].append(new_spec)
+
+            except InvalidSecretProvider as e:
+                LOGGER.warn(
+                    'Cannot load provider "{}". Unable to distribute: '
+                    '{}: {}'.format(target['provider'], target, e)
+                )
+
+                continue
+
+        if not current_secret['distribute']:
+            return None
+
+        return SecretSpec.from_dict(current_secret)
+
+    def _plan_store(self):
+        return LocalFilePlanStore(self._config.get('plandir', DEFAULT_PLAN_DIR))
+
+    def _plan(self, environments, specs):
+        '''
+        :returns: The rotation plan of the config in the current environment,
+            loaded from the plan store if compiled before by the same code
+        :rtype: :class:`RotationPlan`
+        '''
+        index = ConfigIndex.for_config(environments, specs)
+        current_env_name = self._guess_current_environment(environments)
+        plan = index.plans.get(current_env_name)
+
+        if plan is None:
+            key = '{}-{}-{}'.format(
+                index.content_hash(), current_env_name, code_version()[:16]
+            )
+            plan = self._plan_store().load(key)
+
+            if plan is None:
+                plan = RotationPlan(
+                    key, env=current_env_name, total=len(specs)
+                )
+
+            index.plans[current_env_name] = plan
+
+        return plan
+
+    def _compile(self, plan, environments, specs, rotate):
+        index = ConfigIndex.for_config(environments, specs)
+        entries = []
+
+        for position, (sid, secret) in enumerate(specs.items()):
+            current_secret = self._shortlist_secret(
+                index, plan.env, sid, secret, rotate
+            )
+
+            if current_secret is not None:
+                entries.append([position, sid, current_secret])
+
+        plan.add(rotate, entries)
+
+    def compile_plan(self, environments, specs,
+                     schedules=ALLOWED_ROTATION_SCHEDULES):
+        '''
+        Compiles the rotation plan of (validated) environments and secrets,
+        for the current account, and saves it in the plan store.
+
+        :param environments: Environments, as in environments.yaml
+        :type environments: :class:`dict`
+        :param specs: Secret specs by ID, as in secrets.yaml
+        :type specs: :class:`dict`
+        :param schedules: Rotation schedules to compile
+        :type schedules: :class:`list`
+        :returns: The plan
+        :rtype: :class:`RotationPlan`
+        '''
+        plan = self._plan(environments, specs)
+
+        for rotate in schedules:
+            if not plan.compiled(rotate):
+                self._compile(plan, environments, specs, rotate)
+
+        self._plan_store().save(plan)
+
+        return plan
+
     def _filter(self,
                 environments,
                 specs,
@@ -120,98 +287,61 @@ class KeydraConfig(object):
                 requested_secrets=None,
                 number_of_batches: int = None,
                 batch_number: int = None) -> list[dict]:
-        filtered_secrets = []
-        current_env_name = self._guess_current_environment(environments)
-        current_env = environments[current_env_name]
+        '''
+        Same as `_select`, as plain dicts. Every secret of the batch is
+        mapped to its ID (see `sid_for`), shortlisted or not.
+        '''
+        bounds = batch_bounds(len(specs), number_of_batches, batch_number)
+
+        for position, (sid, secret) in enumerate(specs.items()):
+            if bounds is None or bounds[0] <= position < bounds[1]:
+                self._sids[self._secret_location(secret)] = sid
+
+        return [
+            as_dict(secret) for secret in self._select(
+                environments, specs, rotate=rotate,
+                requested_secrets=requested_secrets,
+                number_of_batches=number_of_batches,
+                batch_number=batch_number
+            )
+        ]
 
+    def _select(self,
+                environments,
+                specs,
+                rotate: str = 'adhoc',
+                requested_secrets=None,
+                number_of_batches: int = None,
+                batch_number: int = None) -> list[dict]:
+        '''
+        Shortlists the secrets of a run, off the compiled rotation plan of
+        the current environment (compiled first if needed).
+
+        :returns: Specs of the secrets to process, in the order of the
+            config, with their distribution targets expanded
+        :rtype: :class:`list` of :class:`dict`
+        '''
         if rotate == 'adhoc' and not requested_secrets:
             LOGGER.warn('AdHoc runs need to specify the secrets to rotate')
 
-            return filtered_secrets
-
-        candidate_secrets = specs
-
-        if number_of_batches is not None and batch_number is not None:
-            if not isinstance(number_of_batches, int) or not isinstance(batch_number, int):
-                raise Exception(
-                    f"batch number {batch_number} or number of batches {number_of_batches} is not an integer")
-            if batch_number >= number_of_batches or number_of_batches <= 0 or batch_number < 0:
-                raise Exception(
-                    f"batch number {batch_number} of number of batches {batch_number} are not valid numbers")
-            batch_size = math.ceil(len(candidate_secrets) / number_of_batches)
-            starting_index = batch_size * batch_number  # assumption that batch number starts from zero
-            LOGGER.info(
-                'Batching batch number %s, batch size of %s, number of batches %s, secrets for rotation',
-                batch_number, batch_size, number_of_batches)
-            candidate_secrets = dict((k, v) for k, v in list(
-                candidate_secrets.items())[starting_index: starting_index + batch_size])
-
-        for sid, secret in candidate_secrets.items():
-            if requested_secrets and sid not in requested_secrets:
-                LOGGER.debug(
-                    'Skipping {} as it was not included in the request ({})'
-                    .format(sid, requested_secrets))
-                continue
-
-            if sid not in current_env['secrets']:
-                LOGGER.debug(
-                    'Skipping {} as it is not listed for environment: {}'
-                    .format(sid, current_env_name))
-                continue
-
-            if secret.get('rotate', 'adhoc') != rotate and rotate != 'adhoc':
-                LOGGER.debug(
-                    'Skipping {} as its rotation period ({}) doesn\'t '
-                    'match current ({})'
-                    .format(secret, secret.get('rotate', 'adhoc'), rotate))
-                continue
-
-            if 'distribute' not in secret:
-                filtered_secrets.append(secret)
-                continue
-
-            current_secret = copy.deepcopy(secret)
-            current_secret['distribute'] = []
-            context = {
-                'environment': {current_env_name: current_env},
-                'action': 'distribute',
-                'rotate': rotate
-            }
-
-            for target in secret['distribute']:
-                for env in target['envs']:
-                    if env != '*' and env != current_env_name:
-                        continue
-
-                    try:
-                        provider = loader.load_provider_client(
-                            target['provider']
-                        )
+            return []
 
-                        new_spec = provider.pre_process_spec(
-                            target, context=context
-                        )
+        plan = self._plan(environments, specs)
 
-                        if any(
-                            [
-                                isinstance(new_spec, list),
-                                isinstance(new_spec, tuple)
-                            ]
-                        ):
-                            current_secret['distribute'].extend(new_spec)
-                        else:
-                            current_secret['distribute'].append(new_spec)
-
-                    except InvalidSecretProvider as e:
-                        LOGGER.warn(
-                            'Cannot load provider "{}". Unable to distribute: '
-                            '{}: {}'.format(target['provider'], target, e)
-                        )
+        if not plan.compiled(rotate):
+            LOGGER.info('Compiling the {} plan of environment {}'.format(
+                rotate, plan.env
+            ))
+            self._compile(plan, environments, specs, rotate)
+            self._plan_store().save(plan)
 
-                        continue
+        filtered_secrets = []
 
-            if current_secret['distribute']:
-                filtered_secrets.append(current_secret)
+        for sid, secret in plan.select(
+            rotate, requested_secrets, number_of_batches, batch_number
+        ):
+            self._sids[self._secret_location(secret)] = sid
+            filtered_secrets.append(secret)
 
         return filtered_secrets
 
@@ -231,17 +361,53 @@ class KeydraConfig(object):
         LOGGER.debug('Env config: {}'.format(self._config))
 
         config_provider = loader.build_client(self._config['provider'], None)
-        config = config_provider.load_config(self._config['config'])
+        scoped = {}
+
+        with timing.span('config_load', provider=self._config['provider']):
+            if self._config.get('scope') == SCOPE_ENVIRONMENT:
+                config = config_provider.load_config(
+                    self._config['config'],
+                    env_scope=lambda envs: self._env_secrets(envs, scoped)
+                )
+            else:
+                config = config_provider.load_config(self._config['config'])
+
+        with timing.span('validate'):
+            self._validate_once(config, scoped_env=scoped.get('env'))
+
+        with timing.span('plan'):
+            return self._select(
+                config[0],
+                config[1],
+                rotate=rotate,
+                requested_secrets=secrets,
+                batch_number=batch_number,
+                number_of_batches=number_of_batches
+            )
 
-        self._validate_spec(*config)
+    def _env_secrets(self, environments, scoped):
+        env = self._guess_current_environment(environments)
+        scoped['env'] = env
 
-        return self._filter(
-            *config,
-            rotate=rotate,
-            requested_secrets=secrets,
-            batch_number=batch_number,
-            number_of_batches=number_of_batches
-        )
+        LOGGER.info('Only loading the secrets of environment {}'.format(env))
+
+        return frozenset(environments[env].get('secrets') or [])
+
+    @staticmethod
+    def _secret_location(secret):
+        return (str(secret['provider']).lower(), str(secret['key']))
+
+    def sid_for(self, secret) -> str:
+        '''
+        Gets the ID a secret is listed under in the config, which is what
+        needs to be requested to run it again (e.g. in an adhoc run).
+
+        :param secret: Secret spec, as shortlisted by `load_secrets`
+        :type secret: :class:`dict`
+        :returns: The ID of the secret, None if not loaded from this config
+        :rtype: :class:`str`
+        '''
+        return self._sids.get(self._secret_location(secret))
 
     def get_account_username(self) -> str:
         """
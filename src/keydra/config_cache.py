@@ -0,0 +1,188 @@
+import hashlib
+import json
+import os
+import tempfile
+import threading
+
+from collections import OrderedDict
+
+from keydra import logging as km_logging
+
+
+LOGGER = km_logging.get_logger()
+
+DEFAULT_CACHE_DIR = os.path.join(tempfile.gettempdir(), 'keydra', 'config')
+
+# Number of parsed files kept in memory (a config is two files)
+DEFAULT_MAX_PARSED = 16
+
+
+class CachedFile(object):
+    def __init__(self, validator, content):
+        '''
+        A remote file as last fetched.
+
+        :param validator: What the remote side identifies this content with
+            (e.g. ETag, blob SHA), sent back to only fetch it again if changed
+        :type validator: :class:`str`
+        :param content: Content of the file
+        :type content: :class:`str`
+        '''
+        self.validator = validator
+        self.content = content
+
+
+class ConfigCache(object):
+    def __init__(self, directory=DEFAULT_CACHE_DIR,
+                 max_parsed=DEFAULT_MAX_PARSED):
+        '''
+        Keeps the Keydra config files fetched from config providers (in memory
+        and on the local disk, /tmp by default), so warm invocations and
+        batches only ask the remote side whether they changed, and don't parse
+        them again when they haven't.
+
+        :param directory: Directory to keep the files in
+        :type directory: :class:`str`
+        :param max_parsed: Number of parsed files kept in memory
+        :type max_parsed: :class:`int`
+        '''
+        self._directory = directory
+        self._max_parsed = max_parsed
+        self._files = {}
+        self._parsed = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _path(self, key):
+        return os.path.join(
+            self._directory,
+            '{}.json'.format(hashlib.sha256(key.encode()).hexdigest())
+        )
+
+    def get(self, key):
+        '''
+        :param key: Identifies the file, e.g. its URL
+        :type key: :class:`str`
+        :returns: The file as last fetched, None if never fetched
+        :rtype: :class:`CachedFile`
+        '''
+        with self._lock:
+            cached = self._files.get(key)
+
+        if cached is not None:
+            return cached
+
+        try:
+            with open(self._path(key)) as cache_file:
+                entry = json.load(cache_file)
+
+            cached = CachedFile(entry['validator'], entry['content'])
+
+        except FileNotFoundError:
+            return None
+
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            LOGGER.debug('Ignoring unreadable config cache of {}: {}'.format(
+                key, e
+            ))
+            return None
+
+        with self._lock:
+            self._files[key] = cached
+
+        return cached
+
+    def put(self, key, validator, content):
+        '''
+        Caches a file just fetched. Files without a validator can't be
+        revalidated, so are not cached.
+
+        :param key: Identifies the file, e.g. its URL
+        :type key: :class:`str`
+        :param validator: What the remote side identifies this content with
+        :type validator: :class:`str`
+        :param content: Content of the file
+        :type content: :class:`str`
+        '''
+        if not validator:
+            return
+
+        cached = CachedFile(validator, content)
+
+        with self._lock:
+            self._files[key] = cached
+
+        # Only an optimisation, e.g. the disk may be read only
+        try:
+            entry = json.dumps({
+                'validator': validator,
+                'content': (
+                    content.decode() if isinstance(content, bytes) else content
+                )
+            })
+
+            os.makedirs(self._directory, exist_ok=True)
+
+            fd, tmp_path = tempfile.mkstemp(dir=self._directory)
+
+            with os.fdopen(fd, 'w') as cache_file:
+                cache_file.write(entry)
+
+            os.replace(tmp_path, self._path(key))
+
+        except (OSError, TypeError, ValueError) as e:
+            LOGGER.debug('Unable to write config cache of {}: {}'.format(
+                key, e
+            ))
+
+    def parse(self, content, filetype, parser, variant=None):
+        '''
+        Parses the content of a file, once. Parsing the same content again
+        returns the very same object, which is therefore to be treated as read
+        only.
+
+        :param content: Content of the file
+        :type content: :class:`str` or :class:`bytes`
+        :param filetype: Type of the file (e.g. 'yaml'), part of the key
+        :type filetype: :class:`str`
+        :param parser: Callable parsing the content
+        :type parser: :class:`callable`
+        :param variant: Optional (hashable) description of what the parser
+            loads, e.g. only some keys, part of the key
+        :returns: What `parser` returned for the content
+        '''
+        if isinstance(content, str):
+            digest = hashlib.sha256(content.encode()).hexdigest()
+        elif isinstance(content, bytes):
+            digest = hashlib.sha256(content).hexdigest()
+        else:
+            return parser(content)
+
+        key = (filetype.lower(), variant, digest)
+
+        with self._lock:
+            if key in self._parsed:
+                self._parsed.move_to_end(key)
+
+                return self._parsed[key]
+
+        parsed = parser(content)
+
+        with self._lock:
+            self._parsed[key] = parsed
+
+            while len(self._parsed) > self._max_parsed:
+                self._parsed.popitem(last=False)
+
+        return parsed
+
+    def clear(self):
+        '''
+        Forgets the files kept in memory (not on disk).
+        '''
+        with self._lock:
+            self._files.clear()
+            self._parsed.clear()
+
+
+# Global variables are reused across execution contexts (if available)
+CONFIG_CACHE = ConfigCache()
@@ -0,0 +1,108 @@
+import threading
+
+from keydra.plan import config_hash
+
+
+class ConfigIndex(object):
+    # Last index built, reused while the config is unchanged (config providers
+    # hand out the very same objects for an unchanged config)
+    _last = None
+    _lock = threading.Lock()
+
+    def __init__(self, environments: dict, secrets: dict):
+        '''
+        Lookups over a loaded Keydra config (environments and secrets), built
+        once so validating and filtering don't scan lists for every secret.
+
+        Use `for_config` to get one.
+
+        :param environments: Environments, as in environments.yaml
+        :type environments: :class:`dict`
+        :param secrets: Secret specs by ID, as in secrets.yaml
+        :type secrets: :class:`dict`
+        '''
+        self.environments = environments
+        self.secrets = secrets
+        self.validated = False
+        # Rotation plans of the config, by environment
+        self.plans = {}
+
+        self.env_names = frozenset(environments.keys())
+        self._env_secrets = {}
+        self._targets = {}
+        self._hash = None
+
+    @classmethod
+    def for_config(cls, environments: dict, secrets: dict):
+        '''
+        :param environments: Environments, as in environments.yaml
+        :type environments: :class:`dict`
+        :param secrets: Secret specs by ID, as in secrets.yaml
+        :type secrets: :class:`dict`
+        :returns: The index of the config, the one built last time if given
+            the very same environments and secrets
+        :rtype: :class:`ConfigIndex`
+        '''
+        with cls._lock:
+            last = cls._last
+
+            if (
+                last is None or last.environments is not environments or
+                last.secrets is not secrets
+            ):
+                last = cls._last = cls(environments, secrets)
+
+            return last
+
+    def content_hash(self) -> str:
+        '''
+        :returns: Hash of the content of the config
+        :rtype: :class:`str`
+        '''
+        if self._hash is None:
+            self._hash = config_hash(self.environments, self.secrets)
+
+        return self._hash
+
+    def env_secrets(self, env) -> frozenset:
+        '''
+        :param env: Environment name
+        :type env: :class:`str`
+        :returns: IDs of the secrets listed for the environment
+        :rtype: :class:`frozenset`
+        '''
+        try:
+            return self._env_secrets[env]
+        except KeyError:
+            pass
+
+        listed = frozenset(self.environments[env].get('secrets') or [])
+        self._env_secrets[env] = listed
+
+        return listed
+
+    def targets(self, sid, env) -> list:
+        '''
+        :param sid: Secret ID
+        :type sid: :class:`str`
+        :param env: Environment name
+        :type env: :class:`str`
+        :returns: Distribution targets of the secret applying to the
+            environment (listing it, or '*'), in the order of the spec. A
+            target listing the environment more than once is repeated.
+        :rtype: :class:`list` of :class:`dict`
+        '''
+        if env not in self._targets:
+            by_sid = {}
+
+            for secret_id, secret in self.secrets.items():
+                by_sid[secret_id] = [
+                    target
+                    for target in secret.get('distribute', [])
+                    for target_env in target['envs']
+                    if target_env == '*' or target_env == env
+                ]
+
+            self._targets[env] = by_sid
+
+        return self._targets[env].get(sid, [])
@@ -0,0 +1,219 @@
+import functools
+import json
+
+import yaml
+
+from yaml.events import AliasEvent
+from yaml.events import CollectionStartEvent
+from yaml.events import MappingEndEvent
+from yaml.events import MappingStartEvent
+from yaml.events import ScalarEvent
+from yaml.events import SequenceEndEvent
+from yaml.events import SequenceStartEvent
+from yaml.events import StreamEndEvent
+from yaml.nodes import MappingNode
+from yaml.nodes import ScalarNode
+from yaml.nodes import SequenceNode
+
+from keydra.exceptions import ConfigException
+
+
+# libyaml (C) loader when PyYAML was built with it, many times faster than
+# the pure Python one
+SafeLoader = getattr(yaml, 'CSafeLoader', yaml.SafeLoader)
+
+
+def parser(filetype, only=None):
+    '''
+    :param filetype: Type of the config file, json or yaml/yml
+    :type filetype: :class:`str`
+    :param only: Optional keys of the top level mapping to load, the rest of
+        the file is skipped (e.g. the secrets of the current environment)
+    :type only: :class:`frozenset`
+    :returns: Callable parsing the content of the file
+    :rtype: :class:`callable`
+    :raises ConfigException: If the filetype is not supported
+    '''
+    if filetype.lower() in ['json']:
+        if only is None:
+            return json.loads
+
+        return functools.partial(_json_load_keys, keys=only)
+
+    elif filetype.lower() in ['yaml', 'yml']:
+        if only is None:
+            return safe_load
+
+        return functools.partial(safe_load_keys, keys=only)
+
+    else:
+        raise ConfigException(
+            'Unsupported filetype provided: {}'.format(filetype)
+        )
+
+
+def safe_load(content):
+    '''
+    Same as `yaml.safe_load`, with libyaml if available.
+    '''
+    return yaml.load(content, Loader=SafeLoader)
+
+
+def _json_load_keys(content, keys):
+    return {
+        key: value for key, value in json.loads(content).items()
+        if key in keys
+    }
+
+
+def safe_load_keys(content, keys):
+    '''
+    Loads only some keys of a YAML document whose top level is a mapping.
+    The values of all other keys are skipped while parsing, without building
+    any object for them.
+
+    :param content: YAML document
+    :type content: :class:`str`
+    :param keys: Keys to load
+    :type keys: :class:`frozenset`
+    :returns: The keys found, and their values
+    :rtype: :class:`dict`
+    '''
+    loader = SafeLoader(content)
+
+    try:
+        loader.get_event()  # Stream start
+
+        if loader.check_event(StreamEndEvent):
+            return {}
+
+        loader.get_event()  # Document start
+
+        if not loader.check_event(MappingStartEvent):
+            return _select(safe_load(content), keys)
+
+        loader.get_event()
+
+        loaded = {}
+        anchors = {}
+
+        while not loader.check_event(MappingEndEvent):
+            key = loader.construct_document(_compose(loader, anchors))
+
+            if isinstance(key, str) and key in keys:
+                loaded[key] = loader.construct_document(
+                    _compose(loader, anchors)
+                )
+            else:
+                _skip(loader, anchors)
+
+        return loaded
+
+    except _UnknownAnchor:
+        # Invalid document, let the full load report the error properly
+        return _select(safe_load(content), keys)
+
+    finally:
+        loader.dispose()
+
+
+def _select(document, keys):
+    if not isinstance(document, dict):
+        return {}
+
+    return {key: value for key, value in document.items() if key in keys}
+
+
+class _UnknownAnchor(Exception):
+    pass
+
+
+def _resolve_tag(loader, kind, event, value=None):
+    if event.tag is not None and event.tag != '!':
+        return event.tag
+
+    return loader.resolve(kind, value, event.implicit)
+
+
+def _compose(loader, anchors):
+    '''
+    Builds the node of the next value in the event stream. Works with both
+    the C and pure Python loaders (the C one doesn't expose composing a
+    single node).
+    '''
+    event = loader.get_event()
+
+    if isinstance(event, AliasEvent):
+        if event.anchor not in anchors:
+            raise _UnknownAnchor(event.anchor)
+
+        return anchors[event.anchor]
+
+    if isinstance(event, ScalarEvent):
+        node = ScalarNode(
+            _resolve_tag(loader, ScalarNode, event, event.value),
+            event.value, event.start_mark, event.end_mark, style=event.style
+        )
+
+        if event.anchor is not None:
+            anchors[event.anchor] = node
+
+        return node
+
+    if isinstance(event, SequenceStartEvent):
+        node = SequenceNode(
+            _resolve_tag(loader, SequenceNode, event), [],
+            event.start_mark, None, flow_style=event.flow_style
+        )
+
+        if event.anchor is not None:
+            anchors[event.anchor] = node
+
+        while not loader.check_event(SequenceEndEvent):
+            node.value.append(_compose(loader, anchors))
+
+        node.end_mark = loader.get_event().end_mark
+
+        return node
+
+    node = MappingNode(
+        _resolve_tag(loader, MappingNode, event), [],
+        event.start_mark, None, flow_style=event.flow_style
+    )
+
+    if event.anchor is not None:
+        anchors[event.anchor] = node
+
+    while not loader.check_event(MappingEndEvent):
+        key = _compose(loader, anchors)
+        node.value.append((key, _compose(loader, anchors)))
+
+    node.end_mark = loader.get_event().end_mark
+
+    return node
+
+
+def _skip(loader, anchors):
+    '''
+    Skips the next value in the event stream, only building the nodes of
+    anchors (which may be referred to later on).
+    '''
+    depth = 0
+
+    while True:
+        event = loader.peek_event()
+
+        if getattr(event, 'anchor', None) is not None and not isinstance(
+            event, AliasEvent
+        ):
+            _compose(loader, anchors)
+        else:
+            loader.get_event()
+
+            if isinstance(event, CollectionStartEvent):
+                depth += 1
+            elif isinstance(event, (SequenceEndEvent, MappingEndEvent)):
+                depth -= 1
+
+        if depth == 0:
+            return
@@ -0,0 +1,120 @@
+import threading
+import time
+
+from contextlib import contextmanager
+
+
+# How long credentials are trusted for before being fetched again (seconds)
+DEFAULT_TTL = 300
+
+
+class CredentialCache(object):
+    def __init__(self, ttl=DEFAULT_TTL):
+        '''
+        Keeps Keydra provider credentials (the raw secret strings) read from
+        Secrets Manager, so targets sharing the same credentials cost a
+        single read.
+
+        The cache lives as long as the Lambda environment (so warm
+        invocations reuse it) but is only used while a run is in progress,
+        see `scope`. Entries expire after `ttl` seconds and are dropped as
+        soon as Keydra writes to them, or when their version turns out not
+        to be the current one anymore (see `loader.prefetch_provider_creds`).
+
+        :param ttl: Seconds entries are trusted for
+        :type ttl: :class:`int`
+        '''
+        self.ttl = ttl
+        self._entries = {}
+        self._scopes = 0
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def scope(self):
+        '''
+        Context manager enabling the cache for the duration of the block
+        (across all threads).
+        '''
+        with self._lock:
+            self._scopes += 1
+
+        try:
+            yield self
+        finally:
+            with self._lock:
+                self._scopes -= 1
+
+    @property
+    def active(self) -> bool:
+        return self._scopes > 0
+
+    def get(self, secret_id):
+        '''
+        :param secret_id: Secret ID (name) in Secrets Manager
+        :type secret_id: :class:`str`
+        :returns: The cached value, None if not cached, expired or the
+            cache is not active
+        :rtype: :class:`str`
+        '''
+        if not self.active:
+            return None
+
+        with self._lock:
+            entry = self._entries.get(secret_id)
+
+        if entry is None or time.monotonic() - entry['fetched_at'] > self.ttl:
+            return None
+
+        return entry['value']
+
+    def fresh(self, secret_id) -> bool:
+        '''
+        :param secret_id: Secret ID (name) in Secrets Manager
+        :type secret_id: :class:`str`
+        :returns: True if the secret is cached and not expired
+        :rtype: :class:`bool`
+        '''
+        return self.get(secret_id) is not None
+
+    def put(self, secret_id, value, version_id=None):
+        '''
+        Caches a value, if the cache is active.
+
+        :param secret_id: Secret ID (name) in Secrets Manager
+        :type secret_id: :class:`str`
+        :param value: Secret string
+        :type value: :class:`str`
+        :param version_id: Secrets Manager version of the value, if known
+        :type version_id: :class:`str`
+        '''
+        if not self.active:
+            return
+
+        with self._lock:
+            self._entries[secret_id] = {
+                'value': value,
+                'version_id': version_id,
+                'fetched_at': time.monotonic()
+            }
+
+    def version(self, secret_id):
+        '''
+        :param secret_id: Secret ID (name) in Secrets Manager
+        :type secret_id: :class:`str`
+        :returns: Version of the cached value, None if not known
+        :rtype: :class:`str`
+        '''
+        with self._lock:
+            return self._entries.get(secret_id, {}).get('version_id')
+
+    def invalidate(self, *secret_ids):
+        '''
+        Drops secrets from the cache, e.g. after writing to them.
+        '''
+        with self._lock:
+            for secret_id in secret_ids:
+                self._entries.pop(secret_id, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
@@ -0,0 +1,230 @@
+import contextvars
+import functools
+import time
+
+from contextlib import contextmanager
+
+from keydra.exceptions import DeadlineExceeded
+
+
+# Time kept aside for secrets already in flight once we stop admitting new
+# ones (seconds)
+DEFAULT_RESERVE = 60
+
+# Time kept aside to build, log and return the response (seconds)
+RESPONSE_FLOOR = 5
+
+# Longest a single outbound call may take (seconds), by provider. Calls are
+# cut shorter when the run has less time left than that.
+DEFAULT_CALL_CEILING = 60
+CALL_CEILINGS = {
+    # Qualys' XML API is slow to answer password changes
+    'qualys': 120,
+}
+
+# Deadline of the run, and provider being called, in the current context
+_DEADLINE = contextvars.ContextVar('keydra_deadline', default=None)
+_PROVIDER = contextvars.ContextVar('keydra_deadline_provider', default=None)
+
+
+class Deadline(object):
+    def __init__(self, remaining_ms, reserve=DEFAULT_RESERVE,
+                 floor=RESPONSE_FLOOR, ceilings=None):
+        '''
+        Time budget of a run, so Keydra can wrap up with a response before
+        Lambda kills the function.
+
+        :param remaining_ms: Milliseconds left until the hard timeout
+        :type remaining_ms: :class:`int`
+        :param reserve: Seconds kept aside for secrets in flight, no new
+            secret is started with less than this left
+        :type reserve: :class:`int`
+        :param floor: Seconds kept aside to return the response, secrets
+            still in flight by then are reported as such
+        :type floor: :class:`int`
+        :param ceilings: Optional longest a single call may take (seconds) by
+            provider, on top of `CALL_CEILINGS`
+        :type ceilings: :class:`dict`
+        '''
+        self._expires_at = time.monotonic() + remaining_ms / 1000.0
+        self.reserve = max(float(reserve), 0)
+        self.floor = max(float(floor), 0)
+        self.ceilings = dict(CALL_CEILINGS)
+        self.ceilings.update(
+            {
+                str(provider).lower(): float(ceiling)
+                for provider, ceiling in (ceilings or {}).items()
+            }
+        )
+
+    @classmethod
+    def from_context(cls, context, reserve=DEFAULT_RESERVE, ceilings=None):
+        '''
+        Builds a deadline out of the Lambda context.
+
+        :param context: Lambda Context runtime methods and attributes
+        :type context: :class:`object`
+        :param reserve: Seconds kept aside for secrets in flight
+        :type reserve: :class:`int`
+        :param ceilings: Optional longest a single call may take (seconds) by
+            provider
+        :type ceilings: :class:`dict`
+        :returns: The deadline, None if the context has no time limit (e.g.
+            when running locally)
+        :rtype: :class:`Deadline`
+        '''
+        remaining = getattr(context, 'get_remaining_time_in_millis', None)
+
+        if not callable(remaining):
+            return None
+
+        return cls(remaining(), reserve=reserve, ceilings=ceilings)
+
+    def remaining(self) -> float:
+        '''
+        :returns: Seconds left until the hard timeout
+        :rtype: :class:`float`
+        '''
+        return self._expires_at - time.monotonic()
+
+    def admits(self) -> bool:
+        '''
+        :returns: True if there is enough time left to start a new secret
+        :rtype: :class:`bool`
+        '''
+        return self.remaining() > self.reserve
+
+    def time_left(self) -> float:
+        '''
+        :returns: Seconds left to wait for secrets in flight
+        :rtype: :class:`float`
+        '''
+        return self.remaining() - self.floor
+
+    def ceiling(self, provider=None) -> float:
+        '''
+        :returns: Longest a single call to the provider may take (seconds)
+        :rtype: :class:`float`
+        '''
+        return self.ceilings.get(
+            str(provider).lower(), float(DEFAULT_CALL_CEILING)
+        )
+
+    def call_timeout(self, provider=None) -> float:
+        '''
+        :returns: Seconds a call to the provider may take, the least of its
+            ceiling and the time left in the run
+        :rtype: :class:`float`
+        :raises DeadlineExceeded: No time left for the call
+        '''
+        left = self.time_left()
+
+        if left <= 0:
+            raise DeadlineExceeded(
+                'Run deadline exceeded, no time left to call {}'.format(
+                    provider or 'out'
+                )
+            )
+
+        return min(self.ceiling(provider), left)
+
+
+@contextmanager
+def scope(deadline):
+    '''
+    Makes the deadline the one of the calls made in the block (and in the
+    threads and tasks it starts with a copy of its context).
+
+    :param deadline: Deadline of the run, None for no deadline
+    :type deadline: :class:`Deadline`
+    '''
+    token = _DEADLINE.set(deadline)
+
+    try:
+        yield deadline
+    finally:
+        _DEADLINE.reset(token)
+
+
+@contextmanager
+def calling(provider):
+    '''
+    Marks the calls made in the block as calls of the provider, for their
+    timeouts to use its ceiling.
+
+    :param provider: Provider name, e.g. "bitbucket"
+    :type provider: :class:`str`
+    '''
+    token = _PROVIDER.set(provider)
+
+    try:
+        yield
+    finally:
+        _PROVIDER.reset(token)
+
+
+def current():
+    '''
+    :returns: The deadline of the run being processed, if any
+    :rtype: :class:`Deadline`
+    '''
+    return _DEADLINE.get()
+
+
+def call_timeout(default=DEFAULT_CALL_CEILING) -> float:
+    '''
+    Timeout of an outbound call made now, out of the deadline of the run and
+    the ceiling of the provider being called.
+
+    :param default: Timeout when running without a deadline (seconds)
+    :type default: :class:`float`
+    :returns: Seconds the call may take
+    :rtype: :class:`float`
+    :raises DeadlineExceeded: The run has no time left
+    '''
+    deadline = _DEADLINE.get()
+
+    if deadline is None:
+        return default
+
+    return deadline.call_timeout(_PROVIDER.get())
+
+
+def check():
+    '''
+    :raises DeadlineExceeded: The run has no time left for another call
+    '''
+    call_timeout()
+
+
+def guard(fn):
+    '''
+    Decorator for calls through SDKs taking no timeout, making them raise
+    `DeadlineExceeded` instead of calling out once the run has no time left.
+    '''
+    @functools.wraps(fn)
+    def guarded(*args, **kwargs):
+        check()
+
+        return fn(*args, **kwargs)
+
+    return guarded
+
+
+def _before_call(**kwargs):
+    check()
+
+
+def guard_client(client):
+    '''
+    Makes a boto3 client raise `DeadlineExceeded` instead of calling out
+    once the run has no time left.
+
+    :param client: boto3 client
+    :returns: The client
+    '''
+    client.meta.events.register(
+        'before-call', _before_call, unique_id='keydra-deadline'
+    )
+
+    return client
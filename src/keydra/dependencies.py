@@ -0,0 +1,184 @@
+from keydra import loader
+from keydra import logging as km_logging
+from keydra.exceptions import InvalidSecretProvider
+
+
+LOGGER = km_logging.get_logger()
+
+CREDENTIALS_PROVIDER = 'secretsmanager'
+
+
+def _location(provider, key):
+    return (str(provider).lower(), str(key))
+
+
+def _credentials(provider, key_name):
+    return _location(
+        CREDENTIALS_PROVIDER, loader.provider_creds_id(str(provider), key_name)
+    )
+
+
+def reads(spec) -> set:
+    '''
+    Where a secret reads from while being rotated and distributed: the
+    operator secret referenced by `config.rotatewith`, plus the Keydra
+    credentials of the providers involved (`keydra/<provider>[/<key>]` in
+    Secrets Manager).
+
+    :param spec: Secret spec, as shortlisted by the config
+    :type spec: :class:`dict`
+    :returns: Set of (provider, key) tuples
+    :rtype: :class:`set`
+    '''
+    locations = {_credentials(spec['provider'], spec['key'])}
+
+    config = spec.get('config')
+    rotatewith = config.get('rotatewith') if isinstance(config, dict) else None
+
+    if isinstance(rotatewith, dict) and 'provider' in rotatewith and 'key' in rotatewith:
+        locations.add(_location(rotatewith['provider'], rotatewith['key']))
+
+    for target in spec.get('distribute', []):
+        locations.add(
+            _credentials(target['provider'], target.get('provider_secret_key'))
+        )
+
+    return locations
+
+
+def writes(spec) -> set:
+    '''
+    Where a secret writes to: the secret itself plus all of its
+    distribution targets.
+
+    :param spec: Secret spec, as shortlisted by the config
+    :type spec: :class:`dict`
+    :returns: Set of (provider, key) tuples
+    :rtype: :class:`set`
+    '''
+    locations = {_location(spec['provider'], spec['key'])}
+
+    for target in spec.get('distribute', []):
+        locations.add(_location(target['provider'], target['key']))
+
+    return locations
+
+
+def credentials_read(specs) -> set:
+    '''
+    The Keydra credentials secrets a set of secrets needs to be rotated and
+    distributed, leaving out providers that don't use any. Specs are grouped
+    by provider first, so each provider is only looked up once.
+
+    :param specs: Secret specs, as shortlisted by the config
+    :type specs: :class:`list` of :class:`dict`
+    :returns: Set of secret IDs in Secrets Manager
+    :rtype: :class:`set`
+    '''
+    key_names = {}
+
+    for spec in specs:
+        key_names.setdefault(str(spec['provider']).lower(), set()).add(
+            spec['key']
+        )
+
+        for target in spec.get('distribute', []):
+            key_names.setdefault(str(target['provider']).lower(), set()).add(
+                target.get('provider_secret_key')
+            )
+
+    needed = set()
+
+    for provider, names in key_names.items():
+        try:
+            if not loader.load_provider_client(provider).has_creds():
+                continue
+        except InvalidSecretProvider:
+            continue
+
+        needed.update(
+            loader.provider_creds_id(provider, key_name) for key_name in names
+        )
+
+    return needed
+
+
+def secrets_written(spec) -> set:
+    '''
+    :param spec: Secret spec, as shortlisted by the config
+    :type spec: :class:`dict`
+    :returns: IDs of the Secrets Manager secrets a secret writes to
+    :rtype: :class:`set`
+    '''
+    return {
+        key for provider, key in writes(spec) if provider == CREDENTIALS_PROVIDER
+    }
+
+
+def dependency_graph(specs) -> dict:
+    '''
+    Works out which secrets need to wait for others, so secrets reading an
+    operator secret (or credentials) never race the rotation of it.
+
+    A secret depends on another if it reads from a location the other one
+    writes to. Cycles are broken by dropping the edges into the secret
+    listed first in the config (and logged), so the result is always
+    acyclic.
+
+    :param specs: Secret specs, as shortlisted by the config
+    :type specs: :class:`list` of :class:`dict`
+    :returns: For each spec (by index), the set of indexes of the specs it
+        depends on
+    :rtype: :class:`dict`
+    '''
+    writers = {}
+
+    for idx, spec in enumerate(specs):
+        for location in writes(spec):
+            writers.setdefault(location, set()).add(idx)
+
+    graph = {}
+
+    for idx, spec in enumerate(specs):
+        graph[idx] = set()
+
+        for location in reads(spec):
+            graph[idx] |= writers.get(location, set())
+
+        graph[idx].discard(idx)
+
+    _break_cycles(specs, graph)
+
+    return graph
+
+
+def _break_cycles(specs, graph):
+    remaining = {idx: set(deps) for idx, deps in graph.items()}
+
+    while remaining:
+        ready = [idx for idx, deps in remaining.items() if not deps]
+
+        if not ready:
+            idx = min(remaining)
+
+            LOGGER.warning(
+                'Circular dependency between secrets involving {}::{}, '
+                'ignoring its dependencies on: {}'.format(
+                    specs[idx]['provider'],
+                    specs[idx]['key'],
+                    ', '.join(
+                        '{}::{}'.format(specs[d]['provider'], specs[d]['key'])
+                        for d in sorted(remaining[idx])
+                    )
+                )
+            )
+
+            graph[idx] -= remaining[idx]
+            remaining[idx] = set()
+            ready = [idx]
+
+        for idx in ready:
+            del remaining[idx]
+
+            for deps in remaining.values():
+                deps.discard(idx)
@@ -12,3 +12,7 @@ class DistributionException(Exception):
 
 class RotationException(Exception):
     pass
+
+
+class DeadlineExceeded(Exception):
+    pass
@@ -0,0 +1,365 @@
+import contextvars
+import heapq
+import threading
+import time
+
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from contextlib import contextmanager
+
+from keydra import retry
+from keydra.limiter import AdaptiveLimit
+from keydra.retry import RetryLater
+
+
+DEFAULT_CONCURRENCY = 1
+
+# Commits of the run the item being worked on belongs to, see `committing`
+_COMMITS = contextvars.ContextVar('keydra_executor_commits', default=None)
+
+
+class _Commits(object):
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.open = True
+
+    def close(self):
+        with self.lock:
+            self.open = False
+
+
+@contextmanager
+def committing():
+    '''
+    Context manager around the side effects of an item run by
+    `Executor.run` (e.g. recording its outcome), yielding whether to go
+    ahead with them: False once the run gave up on the item, which was then
+    reported as still in progress. Giving up waits for blocks in progress
+    to finish. Always True outside of a worker thread.
+    '''
+    commits = _COMMITS.get()
+
+    if commits is None:
+        yield True
+        return
+
+    with commits.lock:
+        yield commits.open
+
+
+def _call(fn, item, attempt):
+    with retry.attempt(attempt):
+        return fn(item)
+
+
+def _submit(pool, fn, item, attempt=0, commits=None):
+    # Runs in a copy of the caller's context, so context variables (e.g. the
+    # timing spans of the secret) carry over to the worker thread
+    context = contextvars.copy_context()
+
+    if commits is not None:
+        context.run(_COMMITS.set, commits)
+
+    return pool.submit(context.run, _call, fn, item, attempt)
+
+
+class ProviderLimits(object):
+    def __init__(self, limits=None, ceiling=None):
+        '''
+        Caps the number of calls in flight against each provider, so a high
+        global concurrency doesn't turn into a flood against a single API.
+
+        Caps adapt to how much each provider takes: they are cut by half
+        when it throttles, and grow back (up to the limit) as calls succeed.
+
+        :param limits: Either a single limit applied to every provider, or a
+            dict of provider name to limit. A '*' entry in the dict is used
+            as the default for providers not listed.
+        :type limits: :class:`int` or :class:`dict`
+        :param ceiling: Optional limit of the providers not given one, so
+            they are still backed off when throttling. Not capped otherwise.
+        :type ceiling: :class:`int`
+        '''
+        if limits is None:
+            limits = {}
+
+        if not isinstance(limits, dict):
+            limits = {'*': limits}
+
+        self._limits = {
+            provider.lower(): int(limit) for provider, limit in limits.items()
+        }
+        self._ceiling = ceiling
+        self._limiters = {}
+        self._lock = threading.Lock()
+
+    def limit_for(self, provider):
+        '''
+        :param provider: Name of the provider
+        :type provider: :class:`str`
+        :returns: Maximum number of calls in flight for the provider, None
+            if it is not capped
+        :rtype: :class:`int`
+        '''
+        provider = str(provider).lower()
+
+        return self._limits.get(provider, self._limits.get('*')) or None
+
+    def adaptive_limit(self, provider):
+        '''
+        :param provider: Name of the provider
+        :type provider: :class:`str`
+        :returns: Limit of the calls in flight for the provider, None if it
+            is not capped
+        :rtype: :class:`AdaptiveLimit`
+        '''
+        provider = str(provider).lower()
+
+        with self._lock:
+            if provider not in self._limiters:
+                limit = self.limit_for(provider) or self._ceiling
+
+                self._limiters[provider] = (
+                    AdaptiveLimit(limit) if limit else None
+                )
+
+            return self._limiters[provider]
+
+    @contextmanager
+    def limit(self, provider):
+        '''
+        Context manager holding one of the slots of the given provider for
+        the duration of the block. Providers without a limit are not capped.
+
+        :param provider: Name of the provider about to be called
+        :type provider: :class:`str`
+        '''
+        limiter = self.adaptive_limit(provider)
+
+        if limiter is None:
+            yield
+            return
+
+        with limiter.slot(provider):
+            yield
+
+    def snapshot(self) -> dict:
+        '''
+        :returns: Current limit, maximum, calls in flight and throttles seen,
+            by provider called so far (and capped)
+        :rtype: :class:`dict`
+        '''
+        with self._lock:
+            limiters = dict(self._limiters)
+
+        return {
+            provider: limiter.snapshot()
+            for provider, limiter in sorted(limiters.items())
+            if limiter is not None
+        }
+
+
+class Executor(object):
+    def __init__(self, max_workers=DEFAULT_CONCURRENCY):
+        '''
+        Runs units of work on a bounded pool of workers.
+
+        With a single worker everything happens inline, in order, on the
+        calling thread (exactly like a plain loop).
+
+        Units of work raising `RetryLater` are put back on a delay queue and
+        run again once due, workers moving on to other work in the meantime.
+
+        :param max_workers: Maximum number of units of work running at once
+        :type max_workers: :class:`int`
+        '''
+        self.max_workers = max(int(max_workers or DEFAULT_CONCURRENCY), 1)
+
+    def map(self, fn, items) -> list:
+        '''
+        Applies `fn` to every item, returning the results in the same order
+        as the items were provided (regardless of completion order).
+
+        :param fn: Callable invoked once per item
+        :type fn: :class:`callable`
+        :param items: Items to process
+        :type items: :class:`list`
+        :returns: One result per item, in order
+        :rtype: :class:`list`
+        '''
+        return self.run(fn, items)
+
+    def run(self, fn, items, dependencies=None, time_left=None,
+            on_timeout=None) -> list:
+        '''
+        Applies `fn` to every item, like `map`, but never starts an item
+        before all the items it depends on are done. Independent items run
+        concurrently.
+
+        :param fn: Callable invoked once per item
+        :type fn: :class:`callable`
+        :param items: Items to process
+        :type items: :class:`list`
+        :param dependencies: For each item (by index), the set of indexes of
+            the items it depends on. Must be acyclic.
+        :type dependencies: :class:`dict`
+        :param time_left: Optional callable returning the seconds left to
+            wait for results. Once out of time, unfinished items are given
+            up on, and can no longer commit their side effects (see
+            `committing`). With a single worker the item running is always
+            waited for, no other item is started past that point.
+        :type time_left: :class:`callable`
+        :param on_timeout: Callable invoked with each item given up on,
+            whether it had been started, and the error it was waiting to be
+            retried for (None if it wasn't), to get its result
+        :type on_timeout: :class:`callable`
+        :returns: One result per item, in order
+        :rtype: :class:`list`
+        '''
+        items = list(items)
+        dependencies = dependencies or {}
+
+        waiting_on = {
+            idx: set(dependencies.get(idx, ())) for idx in range(len(items))
+        }
+        results = [None] * len(items)
+
+        # Items to run again: (due time, index, `RetryLater` raised)
+        delayed = []
+
+        # Items ready to run: (index, `RetryLater` raised last, if any)
+        runnable = []
+
+        def ready():
+            idxs = sorted(idx for idx, deps in waiting_on.items() if not deps)
+
+            for idx in idxs:
+                del waiting_on[idx]
+
+            runnable.extend((idx, None) for idx in idxs)
+            now = time.monotonic()
+
+            while delayed and delayed[0][0] <= now:
+                _, idx, later = heapq.heappop(delayed)
+                runnable.append((idx, later))
+
+        def attempt(later):
+            return later.attempt if later is not None else 0
+
+        def done(idx, result):
+            try:
+                results[idx] = result()
+            except RetryLater as e:
+                heapq.heappush(delayed, (time.monotonic() + e.delay, idx, e))
+                return
+
+            for deps in waiting_on.values():
+                deps.discard(idx)
+
+        def until_due():
+            return max(delayed[0][0] - time.monotonic(), 0)
+
+        def out_of_time():
+            return time_left is not None and time_left() <= 0
+
+        in_flight = {}
+
+        if self.max_workers == 1 or len(items) < 2:
+            while waiting_on or delayed or runnable:
+                if not runnable:
+                    ready()
+
+                if out_of_time():
+                    break
+
+                if runnable:
+                    idx, later = runnable.pop(0)
+                    done(idx, lambda: _call(fn, items[idx], attempt(later)))
+
+                elif delayed:
+                    # Nothing else to do in the meantime
+                    pause = until_due()
+
+                    if time_left is not None:
+                        pause = min(pause, max(time_left(), 0))
+
+                    time.sleep(pause)
+
+                else:
+                    break
+
+            return self._give_up(
+                items, results, in_flight, delayed, runnable, waiting_on,
+                on_timeout
+            )
+
+        pool = ThreadPoolExecutor(
+            max_workers=min(self.max_workers, len(items)),
+            thread_name_prefix='keydra'
+        )
+        commits = _Commits()
+
+        try:
+            while waiting_on or in_flight or delayed:
+                ready()
+
+                while runnable:
+                    idx, later = runnable.pop(0)
+                    in_flight[
+                        _submit(pool, fn, items[idx], attempt(later), commits)
+                    ] = idx
+
+                timeout = None if time_left is None else max(time_left(), 0)
+
+                if delayed:
+                    timeout = until_due() if timeout is None else min(timeout, until_due())
+
+                if in_flight:
+                    finished, _ = wait(
+                        in_flight, timeout=timeout, return_when=FIRST_COMPLETED
+                    )
+                else:
+                    finished = set()
+                    time.sleep(timeout if delayed else 0)
+
+                if not finished:
+                    if delayed and (time_left is None or time_left() > 0):
+                        continue
+
+                    break
+
+                for future in finished:
+                    done(in_flight.pop(future), future.result)
+
+        finally:
+            # Don't hang around for work given up on, but don't let it
+            # commit anything either once reported as in progress
+            commits.close()
+            pool.shutdown(wait=not in_flight, cancel_futures=True)
+
+        return self._give_up(
+            items, results, in_flight, delayed, runnable, waiting_on,
+            on_timeout
+        )
+
+    @staticmethod
+    def _give_up(items, results, in_flight, delayed, runnable, waiting_on,
+                 on_timeout) -> list:
+        for future, idx in in_flight.items():
+            results[idx] = on_timeout(
+                items[idx], not future.cancelled(), None
+            )
+
+        # Failed at least once, and left to retry
+        for _, idx, later in delayed:
+            results[idx] = on_timeout(items[idx], True, later.error)
+
+        for idx, later in runnable:
+            if later is None:
+                results[idx] = on_timeout(items[idx], False, None)
+            else:
+                results[idx] = on_timeout(items[idx], True, later.error)
+
+        for idx in waiting_on:
+            results[idx] = on_timeout(items[idx], False, None)
+
+        return results
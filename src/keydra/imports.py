@@ -0,0 +1,174 @@
+import sys
+import threading
+import time
+
+from importlib import import_module
+from importlib.abc import MetaPathFinder
+
+
+def lazy_import(module_name, attribute=None):
+    '''
+    Stands in for a module (or an attribute of it) which is only imported
+    the first time it is actually used, keeping heavy dependencies of
+    providers out of the Lambda cold start.
+
+    E.g. `Salesforce = lazy_import('simple_salesforce', 'Salesforce')`, then
+    `Salesforce(...)` as usual.
+
+    :param module_name: Module to import
+    :type module_name: :class:`str`
+    :param attribute: Optional attribute of the module to stand in for
+    :type attribute: :class:`str`
+    :returns: A proxy of the module or attribute
+    :rtype: :class:`LazyImport`
+    '''
+    return LazyImport(module_name, attribute)
+
+
+class LazyImport(object):
+    def __init__(self, module_name, attribute=None):
+        self._module_name = module_name
+        self._attribute = attribute
+        self._target = None
+
+    def _resolve(self):
+        if self._target is None:
+            target = import_module(self._module_name)
+
+            if self._attribute is not None:
+                target = getattr(target, self._attribute)
+
+            self._target = target
+
+        return self._target
+
+    def __getattr__(self, name):
+        return getattr(self._resolve(), name)
+
+    def __call__(self, *args, **kwargs):
+        return self._resolve()(*args, **kwargs)
+
+    def __repr__(self):
+        return '<lazy {}{}>'.format(
+            self._module_name,
+            '.{}'.format(self._attribute) if self._attribute else ''
+        )
+
+
+class _TimedLoader(object):
+    def __init__(self, loader, timer):
+        self._loader = loader
+        self._timer = timer
+
+    def __getattr__(self, name):
+        return getattr(self._loader, name)
+
+    def create_module(self, spec):
+        return self._loader.create_module(spec)
+
+    def exec_module(self, module):
+        self._timer._enter()
+        start = time.perf_counter()
+
+        try:
+            self._loader.exec_module(module)
+        finally:
+            self._timer._exit(module.__name__, time.perf_counter() - start)
+
+            # Don't leave the wrapper behind, for anyone inspecting the module
+            module.__loader__ = self._loader
+
+            if getattr(module, '__spec__', None) is not None:
+                module.__spec__.loader = self._loader
+
+
+class ImportTimer(MetaPathFinder):
+    '''
+    Records how long each module takes to import, to keep an eye on the cost
+    of the imports deferred to the run (e.g. `lazy_import` of provider SDKs).
+    Only imports happening between `install` and `uninstall` (or within a
+    `with` block) are seen, nothing is hooked otherwise.
+    '''
+    def __init__(self):
+        self._timings = {}
+        self._local = threading.local()
+        self._lock = threading.Lock()
+
+    def install(self):
+        if self not in sys.meta_path:
+            sys.meta_path.insert(0, self)
+
+    def uninstall(self):
+        if self in sys.meta_path:
+            sys.meta_path.remove(self)
+
+    def __enter__(self):
+        self.install()
+
+        return self
+
+    def __exit__(self, *exc):
+        self.uninstall()
+
+    def find_spec(self, fullname, path, target=None):
+        for finder in list(sys.meta_path):
+            if isinstance(finder, ImportTimer) or not hasattr(finder, 'find_spec'):
+                continue
+
+            spec = finder.find_spec(fullname, path, target)
+
+            if spec is None:
+                continue
+
+            if spec.loader is not None and hasattr(spec.loader, 'exec_module'):
+                spec.loader = _TimedLoader(spec.loader, self)
+
+            return spec
+
+        return None
+
+    def _enter(self):
+        if not hasattr(self._local, 'children'):
+            self._local.children = []
+
+        self._local.children.append(0.0)
+
+    def _exit(self, name, elapsed):
+        children = self._local.children.pop()
+
+        if self._local.children:
+            self._local.children[-1] += elapsed
+
+        with self._lock:
+            self._timings[name] = (elapsed - children, elapsed)
+
+    def report(self, limit=25) -> dict:
+        '''
+        :param limit: Number of most expensive modules to report on
+        :type limit: :class:`int`
+        :returns: Total time spent importing, and the modules with the
+            highest cumulative import time (including the modules they
+            imported), in milliseconds
+        :rtype: :class:`dict`
+        '''
+        with self._lock:
+            timings = dict(self._timings)
+
+        modules = sorted(
+            timings.items(), key=lambda item: item[1][1], reverse=True
+        )
+
+        return {
+            'modules_imported': len(timings),
+            'total_ms': round(
+                sum(own for own, _ in timings.values()) * 1000, 2
+            ),
+            'slowest': [
+                {
+                    'module': name,
+                    'self_ms': round(own * 1000, 2),
+                    'cumulative_ms': round(cumulative * 1000, 2)
+                }
+                for name, (own, cumulative) in modules[:limit]
+            ]
+        }
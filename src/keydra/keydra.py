@@ -1,20 +1,159 @@
+import time
+
 from botocore.exceptions import ClientError
 
+from keydra import limiter
 from keydra import loader
+from keydra import retry
 from keydra import logging as km_logging
+from keydra import telemetry
+from keydra import timing
+from keydra.clients import http
 from keydra.clients.aws.cloudwatch import CloudwatchClient, timed
 from keydra.config import KeydraConfig
+from keydra.deadline import Deadline, calling, scope as deadline_scope
+from keydra.dependencies import credentials_read, dependency_graph, secrets_written
 from keydra.exceptions import ConfigException, InvalidSecretProvider
+from keydra.executor import DEFAULT_CONCURRENCY, Executor, ProviderLimits
+from keydra.executor import committing
+from keydra.ledger import RunLedger
+from keydra.model import RotationResult, as_dict
+from keydra.retry import RetryLater
 
 LOGGER = km_logging.get_logger()
 
 
 class Keydra(object):
-    def __init__(self, cfg: KeydraConfig, cw: CloudwatchClient):
+    def __init__(self, cfg: KeydraConfig, cw: CloudwatchClient,
+                 concurrency: int = DEFAULT_CONCURRENCY,
+                 provider_concurrency=None,
+                 distribution_concurrency: int = DEFAULT_CONCURRENCY,
+                 deadline: Deadline = None,
+                 ledger: RunLedger = None,
+                 retry_budget: int = retry.DEFAULT_BUDGET):
+        '''
+        :param cfg: Keydra configuration, source of the secret specs
+        :type cfg: :class:`KeydraConfig`
+        :param cw: Cloudwatch client used to emit metrics
+        :type cw: :class:`CloudwatchClient`
+        :param concurrency: Number of secrets processed at the same time,
+            defaults to 1 (one secret at a time)
+        :type concurrency: :class:`int`
+        :param provider_concurrency: Optional cap of calls in flight per
+            provider, either one number for all or a dict by provider name
+        :type provider_concurrency: :class:`int` or :class:`dict`
+        :param distribution_concurrency: Number of distribution targets of a
+            single secret distributed at the same time, defaults to 1
+        :type distribution_concurrency: :class:`int`
+        :param deadline: Optional time budget of the run. Once running out of
+            time, secrets not started yet are reported as `not_started` so a
+            follow-up run can pick them up.
+        :type deadline: :class:`Deadline`
+        :param ledger: Optional ledger of the secrets already processed in
+            the current window, which are skipped
+        :type ledger: :class:`RunLedger`
+        :param retry_budget: Retries of failed calls allowed in a run, across
+            all secrets
+        :type retry_budget: :class:`int`
+        '''
         self._cfg = cfg
         self._cw = cw
+        self._executor = Executor(max_workers=concurrency)
+        self._provider_limits = ProviderLimits(
+            provider_concurrency,
+            ceiling=concurrency * distribution_concurrency
+        )
+        self._distribution_executor = Executor(
+            max_workers=distribution_concurrency
+        )
+        self._deadline = deadline
+        self._ledger = ledger
+        self._retry_budget = retry_budget
+
+        # Secrets rotated with distribution targets left to retry, by id of
+        # their spec, until the executor runs them again
+        self._progress = {}
+
+        # Every secret in flight may be distributing to the same host
+        http.configure(pool_size=concurrency * distribution_concurrency)
 
     def rotate_and_distribute(self, run_for_secrets, rotate, batch_number=None, number_of_batches=None) -> list[dict]:
+        with timing.collect() as run_spans, telemetry.record_calls() as calls:
+            with loader.run_scope(), deadline_scope(self._deadline), \
+                    retry.budget(self._retry_budget):
+                secrets, response = self._shortlist(
+                    run_for_secrets, rotate, batch_number, number_of_batches
+                )
+
+                if response is not None:
+                    return response
+
+                self._prefetch_credentials(secrets)
+
+                response: list[dict] = self._executor.run(
+                    self._rotate_and_distribute_secret, secrets,
+                    dependencies=dependency_graph(secrets),
+                    time_left=self._deadline.time_left if self._deadline else None,
+                    on_timeout=self._unfinished
+                )
+
+            if rotate != 'adhoc':
+                self._emit_result_metrics(response)
+
+        self._log_timings(run_spans, response)
+        self._log_calls(calls)
+        self._log_limits()
+
+        return response
+
+    @staticmethod
+    def _log_calls(calls):
+        LOGGER.info(
+            {'message': 'API calls of the run', 'data': calls.report()}
+        )
+
+    def _concurrency_limits(self):
+        return {
+            'provider': self._provider_limits.snapshot(),
+            'host': limiter.HOSTS.snapshot()
+        }
+
+    def _log_limits(self):
+        LOGGER.info(
+            {
+                'message': 'Concurrency limits of the run',
+                'data': self._concurrency_limits()
+            }
+        )
+
+    @staticmethod
+    def _log_timings(run_spans, response):
+        LOGGER.info(
+            {
+                'message': 'Timings of the run',
+                'data': {
+                    'run': run_spans.to_list(),
+                    'latencies': timing.latency_report(response)
+                }
+            }
+        )
+
+    @staticmethod
+    def _prefetch_credentials(secrets):
+        try:
+            loader.prefetch_provider_creds(credentials_read(secrets))
+        except Exception as e:
+            # Only an optimisation, credentials are read as needed otherwise
+            LOGGER.warning('Failed to prefetch credentials: {}'.format(e))
+
+    def _shortlist(self, run_for_secrets, rotate, batch_number, number_of_batches):
+        '''
+        Loads the specs of the secrets to process in this run.
+
+        :returns: A tuple of the specs shortlisted and, when there is nothing
+            to process, the response to return straight away
+        :rtype: :class:`tuple`
+        '''
         try:
             secrets = self._cfg.load_secrets(
                 secrets=run_for_secrets,
@@ -24,15 +163,15 @@ class Keydra(object):
             )
         except ConfigException as e:
             LOGGER.error(e)
-            return [self._fail(e)]
+            return None, [self._fail(e).to_dict()]
 
         if rotate != 'adhoc':
             self._emit_spec_metrics(secrets)
 
         if not secrets:
-            return [self._success(
+            return secrets, [self._success(
                 'No secrets shortlisted for {} rotation'.format(rotate)
-            )]
+            ).to_dict()]
 
         LOGGER.debug(
             {
@@ -41,36 +180,197 @@ class Keydra(object):
             }
         )
 
-        response: list[dict] = []
+        return secrets, None
 
-        for secret in secrets:
-            result = {}
-            secret_id = '{}::{}'.format(secret['provider'], secret['key'])
+    def _rotate_and_distribute_secret(self, secret) -> dict:
+        progress = self._progress.pop(id(secret), None)
 
-            r_result = self._rotate_secret(secret)
+        if progress is None:
+            if self._deadline is not None and not self._deadline.admits():
+                return self._unfinished(secret, started=False)
 
-            result['secret_id'] = secret_id
-            result['key'] = secret['key']
-            result['provider'] = secret['provider']
+            if self._ledger is not None and self._ledger.done(secret):
+                return self._skipped(secret)
 
-            result[r_result.pop('action')] = self._redact_secrets(r_result, secret)
+            with timing.collect() as spans:
+                r_result = self._rotate_secret(secret)
+                result = self._rotation_result(secret, r_result)
 
-            if r_result['status'] == 'success' and 'distribute' in secret:
-                d_result = self._distribute_secret(secret, r_result['value'])
-                result[d_result.pop('action')] = d_result
+            progress = {'result': result, 'spans': spans}
 
-            response.append(result)
+            if r_result['status'] != 'success' or 'distribute' not in secret:
+                return self._finished(secret, progress)
 
-        if rotate != 'adhoc':
-            self._emit_result_metrics(response)
+            progress['value'] = r_result['value']
 
-        return response
+        with timing.collect(progress['spans']):
+            try:
+                d_result = self._distribute_secret(
+                    secret, progress['value'], progress
+                )
+            except RetryLater:
+                # Only the targets left are distributed to when run again
+                self._progress[id(secret)] = progress
+                raise
+
+        action, outcome = self._outcome(d_result)
+        progress['result'][action] = outcome
+
+        return self._finished(secret, progress)
+
+    def _finished(self, secret, progress) -> dict:
+        result = progress['result']
+        result['timings'] = progress['spans'].to_list()
+
+        with committing() as committed:
+            if not committed:
+                # Reported as in progress by a run already over, credentials
+                # it wrote are caught by the version check of the next run
+                LOGGER.warning(
+                    "Key '{}' of provider '{}' finished after the run gave "
+                    "up on it, not recording it".format(
+                        secret['key'], secret['provider']
+                    )
+                )
+                return result
+
+            loader.invalidate_credentials(secrets_written(secret))
+
+            if self._ledger is not None:
+                self._ledger.record(secret, result)
+
+        return result
+
+    def _rotation_result(self, secret, r_result) -> dict:
+        result = {}
+        secret_id = '{}::{}'.format(secret['provider'], secret['key'])
+
+        result['secret_id'] = secret_id
+        result['key'] = secret['key']
+        result['provider'] = secret['provider']
+
+        action, outcome = self._outcome(r_result)
+        result[action] = self._redact_secrets(outcome, secret)
+
+        return result
+
+    def _unfinished(self, secret, started, error=None) -> dict:
+        '''
+        Result of a secret the run ran out of time for, either never started,
+        still in flight (with an unknown outcome) or waiting to be retried
+        (failed, with the error it was retried for) when giving up on it.
+        '''
+        progress = self._progress.pop(id(secret), None)
+
+        if progress is not None:
+            return self._distribution_given_up(secret, progress)
+
+        if error is not None:
+            r_result = self._default_response(
+                'fail', action='rotate_secret',
+                msg='Gave up retrying when running out of time: {}'.format(
+                    error
+                )
+            )
+        elif started:
+            r_result = self._default_response(
+                'in_progress', action='rotate_secret',
+                msg='Still in progress when running out of time, outcome unknown'
+            )
+        else:
+            r_result = self._default_response(
+                'not_started', action='rotate_secret',
+                msg='Not started, not enough time left in this run'
+            )
+
+        LOGGER.warning(
+            "Ran out of time for key '{}' of provider '{}' ({})".format(
+                secret['key'], secret['provider'], r_result['status']
+            )
+        )
+
+        return self._unprocessed_result(secret, r_result)
+
+    def _distribution_given_up(self, secret, progress) -> dict:
+        '''
+        Result of a secret rotated, but with distribution targets still
+        waiting to be retried when running out of time. These are failed
+        with the error they were retried for.
+        '''
+        LOGGER.warning(
+            "Ran out of time distributing key '{}' of provider '{}'".format(
+                secret['key'], secret['provider']
+            )
+        )
+
+        targets = progress.setdefault('targets', {})
+
+        for idx, (_, later) in progress.pop('retries', {}).items():
+            targets[idx] = self._fail(
+                'Gave up retrying when running out of time: {}'.format(
+                    later.error
+                )
+            )
+
+        d_result = self._aggregate_distribution(
+            [targets[idx] for idx in sorted(targets)]
+        )
+        action, outcome = self._outcome(d_result)
+        progress['result'][action] = outcome
+
+        return self._finished(secret, progress)
+
+    def _skipped(self, secret) -> dict:
+        '''
+        Result of a secret already rotated and distributed earlier in the
+        current window (e.g. by the run being retried).
+        '''
+        LOGGER.info(
+            "Skipping key '{}' of provider '{}', already done in {}".format(
+                secret['key'], secret['provider'], self._ledger.run_key
+            )
+        )
+
+        return self._unprocessed_result(
+            secret,
+            self._default_response(
+                'skipped', action='rotate_secret',
+                msg='Already rotated in {}'.format(self._ledger.run_key)
+            )
+        )
+
+    def _unprocessed_result(self, secret, r_result) -> dict:
+        action, outcome = self._outcome(r_result)
+
+        return {
+            'secret_id': '{}::{}'.format(secret['provider'], secret['key']),
+            'key': secret['key'],
+            'provider': secret['provider'],
+            'sid': self._cfg.sid_for(secret),
+            action: outcome
+        }
+
+    @staticmethod
+    def _outcome(r_result):
+        '''
+        :param r_result: Result of a rotation or distribution
+        :type r_result: :class:`RotationResult`
+        :returns: The action of the result, and the rest of it as put in the
+            response (a plain dict)
+        :rtype: :class:`tuple`
+        '''
+        return r_result.get('action'), {
+            key: as_dict(value)
+            for key, value in r_result.items() if key != 'action'
+        }
 
     @staticmethod
     def _redact_secrets(result: dict, spec: dict):
         LOGGER.debug('Redacting the value of {}::{}'.format(spec['provider'], spec['key']))
         km_provider = loader.load_provider_client(spec['provider'])
-        return km_provider.redact_result(result, spec)
+
+        with timing.span('redact', provider=spec['provider']):
+            return km_provider.redact_result(result, spec)
 
     @timed('rotation', specialise=True)
     def _rotate_secret(self, secret):
@@ -79,14 +379,26 @@ class Keydra(object):
         LOGGER.debug({'message': 'Rotating secret', 'data': secret})
 
         try:
-            km = loader.build_client(secret['provider'], secret['key'])
+            km, lease = loader.checkout_client(secret['provider'], secret['key'])
 
             valid, valid_message = km.validate_spec(secret)
 
             if not valid:
                 return self._fail(valid_message, action=action)
 
-            return self._success(km.rotate(secret), action=action)
+            with self._provider_limits.limit(secret['provider']), \
+                    calling(secret['provider']), \
+                    retry.requeueing(km.rotate), \
+                    timing.span('rotate', provider=secret['provider']):
+                result = self._success(km.rotate(secret), action=action)
+
+            loader.release_client(km, lease)
+
+            return result
+
+        except RetryLater:
+            # Run again by the executor, once due
+            raise
 
         except Exception as e:
             LOGGER.error(
@@ -98,11 +410,21 @@ class Keydra(object):
             return self._fail(e, action=action)
 
     @timed('bulk_distribution', specialise=False)
-    def _distribute_secret(self, spec, secret):
+    def _distribute_secret(self, spec, secret, progress=None):
+        '''
+        Distributes the secret to the targets of the spec.
+
+        Targets to retry are not waited for: once the others are done,
+        `RetryLater` is raised for the executor of the run to call again
+        (with the same `progress`) when the first of them is due, getting on
+        with other secrets in the meantime.
+
+        :param progress: Results of the targets distributed to so far, and
+            retries of the others, by index of the target
+        :type progress: :class:`dict`
+        :raises RetryLater: Some targets are to be retried
+        '''
         action = 'distribute_secret'
-        results = []
-        has_successes = False
-        has_failures = False
 
         LOGGER.debug({'message': 'Bulk distributing secrets', 'data': spec})
 
@@ -111,8 +433,66 @@ class Keydra(object):
                 "No 'distribute' policy in spec. Ignoring.", action=action
             )
 
-        for target in spec['distribute']:
-            results.append(self._distribute_single_secret(target, secret))
+        targets = spec['distribute']
+        progress = {} if progress is None else progress
+        results = progress.setdefault('targets', {})
+        retries = progress.setdefault('retries', {})
+
+        now = time.monotonic()
+        due = [
+            idx for idx in range(len(targets))
+            if idx not in results and retries.get(idx, (now, None))[0] <= now
+        ]
+
+        outcomes = self._distribution_executor.map(
+            lambda idx: self._distribute_or_defer(
+                targets[idx], secret, retries.get(idx)
+            ),
+            due
+        )
+
+        for idx, (result, later) in zip(due, outcomes):
+            if later is None:
+                results[idx] = result
+                retries.pop(idx, None)
+            else:
+                retries[idx] = later
+
+        if retries:
+            due_at, later = min(retries.values(), key=lambda r: r[0])
+
+            raise RetryLater(
+                max(due_at - time.monotonic(), 0),
+                max(r.attempt for _, r in retries.values()),
+                later.error
+            )
+
+        return self._aggregate_distribution(
+            [results[idx] for idx in range(len(targets))]
+        )
+
+    def _distribute_or_defer(self, target, secret, retried):
+        '''
+        Distributes to the target, handing back the `RetryLater` it raises
+        (along with when it is due) instead of waiting to retry it.
+
+        :param retried: When the target was due, and the `RetryLater` it
+            raised last time, if retried
+        :type retried: :class:`tuple`
+        :returns: The result, and None, or None and the retry
+        :rtype: :class:`tuple`
+        '''
+        try:
+            with retry.attempt(retried[1].attempt if retried else 0):
+                return self._distribute_single_secret(target, secret), None
+
+        except RetryLater as e:
+            return None, (time.monotonic() + e.delay, e)
+
+    def _aggregate_distribution(self, results):
+        action = 'distribute_secret'
+        has_successes = False
+        has_failures = False
 
         for result in results:
             if result.get('status') == 'fail':
@@ -157,18 +537,20 @@ class Keydra(object):
             return self._fail(valid_message)
 
         try:
-            km = loader.build_client(
-                target['provider'], target.get('provider_secret_key')
-            )
-            if callable(getattr(km, "load_config")):
-                LOGGER.debug(
-                    "{} is a config provider! Setting default org/account.".format(
-                        target['provider']
-                    )
-                )
-                km.accountusername = self._cfg.get_account_username()
+            km, lease = self._checkout_distribution_client(target)
+
+            with self._provider_limits.limit(target['provider']), \
+                    calling(target['provider']), \
+                    retry.requeueing(km.distribute), \
+                    timing.span('distribute', provider=target['provider']):
+                result = self._success(km.distribute(secret, target))
+
+            loader.release_client(km, lease)
+
+            return result
 
-            return self._success(km.distribute(secret, target))
+        except RetryLater:
+            raise
 
         except Exception as e:
             LOGGER.error(
@@ -179,22 +561,36 @@ class Keydra(object):
             )
             return self._fail(e)
 
+    def _checkout_distribution_client(self, target):
+        km, lease = loader.checkout_client(
+            target['provider'], target.get('provider_secret_key')
+        )
+        if callable(getattr(km, "load_config")):
+            LOGGER.debug(
+                "{} is a config provider! Setting default org/account.".format(
+                    target['provider']
+                )
+            )
+            km.accountusername = self._cfg.get_account_username()
+
+        return km, lease
+
     @staticmethod
     def _default_response(status, action=None, msg=None, value=None):
-        response = {
+        fields = {
             'status': status,
         }
 
         if action is not None:
-            response['action'] = action
+            fields['action'] = action
 
         if msg is not None:
-            response['msg'] = msg
+            fields['msg'] = msg
 
         if value is not None:
-            response['value'] = value
+            fields['value'] = value
 
-        return response
+        return RotationResult(**fields)
 
     @staticmethod
     def _fail(msg, action=None, value=None):
@@ -210,6 +606,10 @@ class Keydra(object):
 
     # TODO: abstract these metrics functions to a class
     def _emit_spec_metrics(self, secrets):
+        with timing.span('metrics_emit'):
+            self._put_spec_metrics(secrets)
+
+    def _put_spec_metrics(self, secrets):
         total_rotations = len(secrets)
         total_distribution_points = 0
 
@@ -248,6 +648,16 @@ class Keydra(object):
             LOGGER.warn('Not able to emit metrics for config! -> {}'.format(e))
 
     def _emit_result_metrics(self, results):
+        with timing.span('metrics_emit'):
+            self._put_result_metrics(results)
+            self._put_limit_metrics()
+
+    def _put_limit_metrics(self):
+        for scope, limits in self._concurrency_limits().items():
+            for name, limit in limits.items():
+                self._cw.put_concurrency_limit(scope, name, limit['limit'])
+
+    def _put_result_metrics(self, results):
         successful_rotations = 0
         failed_rotations = 0
         successful_distributions = 0
@@ -0,0 +1,203 @@
+import datetime
+import json
+import os
+import tempfile
+import threading
+
+from abc import ABC
+from abc import abstractmethod
+
+from keydra import logging as km_logging
+
+
+LOGGER = km_logging.get_logger()
+
+DEFAULT_LEDGER_DIR = os.path.join(tempfile.gettempdir(), 'keydra', 'ledger')
+
+# Window a run of each trigger belongs to, retries within the same window
+# share the same ledger. Triggers not listed (e.g. adhoc) are not tracked.
+SCHEDULE_WINDOWS = {
+    'nightly': '%Y-%m-%d',
+    'weekly': '%G-W%V',
+    'monthly': '%Y-%m',
+}
+
+
+class LedgerStore(ABC):
+    '''
+    Where run ledgers are kept. Implement this to keep them somewhere that
+    outlives the Lambda execution environment (e.g. DynamoDB or S3), and set
+    `durable` to True.
+    '''
+    # Whether ledgers are seen by every Lambda execution environment, not
+    # only the one which wrote them
+    durable = False
+
+    @abstractmethod
+    def load(self, run_key: str) -> dict:
+        '''
+        :param run_key: Identifier of the run (trigger + window)
+        :type run_key: :class:`str`
+        :returns: Entries recorded for the run so far, by secret ID
+        :rtype: :class:`dict`
+        '''
+        pass
+
+    @abstractmethod
+    def save(self, run_key: str, entries: dict):
+        '''
+        :param run_key: Identifier of the run (trigger + window)
+        :type run_key: :class:`str`
+        :param entries: All entries of the run, by secret ID
+        :type entries: :class:`dict`
+        '''
+        pass
+
+
+class LocalFileLedgerStore(LedgerStore):
+    def __init__(self, directory=DEFAULT_LEDGER_DIR):
+        '''
+        Keeps ledgers as JSON files on the local disk (in /tmp by default),
+        which survives retries landing on the same warm Lambda environment.
+
+        :param directory: Directory to keep the ledgers in
+        :type directory: :class:`str`
+        '''
+        self._directory = directory
+
+    def _path(self, run_key):
+        return os.path.join(self._directory, '{}.json'.format(run_key))
+
+    def load(self, run_key: str) -> dict:
+        try:
+            with open(self._path(run_key)) as ledger:
+                return json.load(ledger)
+
+        except FileNotFoundError:
+            return {}
+
+        except (OSError, ValueError) as e:
+            LOGGER.warning(
+                'Unable to read run ledger {}, starting afresh: {}'.format(
+                    run_key, e
+                )
+            )
+            return {}
+
+    def save(self, run_key: str, entries: dict):
+        os.makedirs(self._directory, exist_ok=True)
+
+        # Written aside and moved in place, so a run killed mid-write never
+        # leaves a corrupt ledger behind
+        fd, tmp_path = tempfile.mkstemp(dir=self._directory)
+
+        with os.fdopen(fd, 'w') as ledger:
+            json.dump(entries, ledger)
+
+        os.replace(tmp_path, self._path(run_key))
+
+
+class RunLedger(object):
+    def __init__(self, store: LedgerStore, run_key: str):
+        '''
+        Checkpoints the secrets fully processed in a run, so a retried or
+        resumed run of the same window only redoes the others.
+
+        Use `for_trigger` to build one.
+
+        :param store: Where to keep the ledger
+        :type store: :class:`LedgerStore`
+        :param run_key: Identifier of the run (trigger + window)
+        :type run_key: :class:`str`
+        '''
+        self._store = store
+        self.run_key = run_key
+        self._lock = threading.Lock()
+        self._entries = store.load(run_key)
+
+    @property
+    def durable(self) -> bool:
+        '''
+        :returns: True if retries landing on another Lambda execution
+            environment see this ledger
+        :rtype: :class:`bool`
+        '''
+        return self._store.durable
+
+    @classmethod
+    def for_trigger(cls, trigger, store: LedgerStore = None, now=None):
+        '''
+        :param trigger: Trigger of the run (nightly, weekly, ...)
+        :type trigger: :class:`str`
+        :param store: Where to keep the ledger, local disk by default
+        :type store: :class:`LedgerStore`
+        :param now: Time of the run, defaults to now (UTC)
+        :type now: :class:`datetime.datetime`
+        :returns: The ledger of the current window of the trigger, None if
+            the trigger is not on a schedule (e.g. adhoc)
+        :rtype: :class:`RunLedger`
+        '''
+        window = SCHEDULE_WINDOWS.get(trigger)
+
+        if window is None:
+            return None
+
+        if now is None:
+            now = datetime.datetime.now(datetime.timezone.utc)
+
+        return cls(
+            store or LocalFileLedgerStore(),
+            '{}-{}'.format(trigger, now.strftime(window))
+        )
+
+    @staticmethod
+    def _secret_id(secret):
+        return '{}::{}'.format(secret['provider'], secret['key'])
+
+    @staticmethod
+    def _status(result, action):
+        return result.get(action, {}).get('status')
+
+    def done(self, secret) -> bool:
+        '''
+        :param secret: Secret spec
+        :type secret: :class:`dict`
+        :returns: True if the secret was already rotated and distributed
+            in this window
+        :rtype: :class:`bool`
+        '''
+        with self._lock:
+            return self._secret_id(secret) in self._entries
+
+    def record(self, secret, result):
+        '''
+        Checkpoints the outcome of a secret. Only secrets rotated and
+        distributed successfully are recorded, everything else is redone
+        on the next run of the window.
+
+        :param secret: Secret spec
+        :type secret: :class:`dict`
+        :param result: Result of rotating and distributing the secret
+        :type result: :class:`dict`
+        '''
+        if self._status(result, 'rotate_secret') != 'success':
+            return
+
+        if self._status(result, 'distribute_secret') not in (None, 'success'):
+            return
+
+        with self._lock:
+            self._entries[self._secret_id(secret)] = {
+                'completed_at': datetime.datetime.now(
+                    datetime.timezone.utc
+                ).isoformat()
+            }
+
+            try:
+                self._store.save(self.run_key, self._entries)
+            except Exception as e:
+                LOGGER.warning(
+                    'Unable to checkpoint run ledger {}: {}'.format(
+                        self.run_key, e
+                    )
+                )
@@ -0,0 +1,353 @@
+import asyncio
+import threading
+
+from contextlib import asynccontextmanager, contextmanager
+from urllib.parse import urlsplit
+
+from keydra import deadline
+from keydra import retry
+from keydra.exceptions import DeadlineExceeded
+
+
+# Calls in flight against a single host, at most
+DEFAULT_HOST_LIMIT = 32
+
+# How much a limit grows over a round of successful calls, and what it is
+# cut to when throttled
+INCREASE = 1.0
+DECREASE = 0.5
+
+SUCCESS = 'success'
+THROTTLED = 'throttled'
+FAILED = 'failed'
+
+_SLOT = 'keydra_limiter_slot'
+
+
+class Slot(object):
+    def __init__(self):
+        '''
+        Outcome of a call made holding a slot of an `AdaptiveLimit`.
+        '''
+        self.outcome = SUCCESS
+
+    def throttled(self):
+        '''
+        Marks the call as throttled (e.g. answered with a 429).
+        '''
+        self.outcome = THROTTLED
+
+    def failed(self, error):
+        '''
+        Marks the call as failed with the error, as throttled if the API was
+        throttling (unless already marked so).
+
+        :param error: Error the call failed with
+        :type error: :class:`Exception`
+        '''
+        if self.outcome != THROTTLED:
+            self.outcome = THROTTLED if retry.throttled(error) else FAILED
+
+
+class AdaptiveLimit(object):
+    def __init__(self, maximum, minimum=1, increase=INCREASE,
+                 decrease=DECREASE):
+        '''
+        Number of calls allowed in flight against an API, adapting to how
+        much it takes (AIMD): every successful call grows the limit by
+        `increase` / limit (`increase` over a full round of calls), and
+        being throttled cuts it by `decrease`. Starts at `maximum`.
+
+        Throttles of calls started before the last cut don't cut the limit
+        again, so a burst of 429s only halves it once.
+
+        :param maximum: Highest the limit goes
+        :type maximum: :class:`int`
+        :param minimum: Lowest the limit goes
+        :type minimum: :class:`int`
+        :param increase: Growth of the limit over a round of successes
+        :type increase: :class:`float`
+        :param decrease: Factor the limit is cut by when throttled
+        :type decrease: :class:`float`
+        '''
+        self.maximum = max(float(maximum), 1)
+        self.minimum = min(max(float(minimum), 1), self.maximum)
+        self.increase = increase
+        self.decrease = decrease
+        self.throttles = 0
+        self._limit = self.maximum
+        self._in_flight = 0
+        self._epoch = 0
+        self._cond = threading.Condition()
+
+    @property
+    def limit(self) -> int:
+        '''
+        :returns: Calls currently allowed in flight
+        :rtype: :class:`int`
+        '''
+        return max(int(self._limit), 1)
+
+    def acquire(self, timeout=None):
+        '''
+        Waits for a slot.
+
+        :param timeout: Seconds to wait at most, forever by default
+        :type timeout: :class:`float`
+        :returns: A token to `release` the slot with, None if none freed up
+            in time
+        '''
+        with self._cond:
+            if not self._cond.wait_for(
+                lambda: self._in_flight < self.limit, timeout
+            ):
+                return None
+
+            self._in_flight += 1
+
+            return self._epoch
+
+    def acquire_in_time(self, name):
+        '''
+        Waits for a slot, no longer than the deadline of the run.
+
+        :param name: What the slot is for, e.g. the host to call
+        :type name: :class:`str`
+        :returns: A token to `release` the slot with
+        :raises DeadlineExceeded: No slot freed up before the deadline
+        '''
+        run_deadline = deadline.current()
+        token = self.acquire(
+            timeout=max(run_deadline.time_left(), 0) if run_deadline else None
+        )
+
+        if token is None:
+            raise DeadlineExceeded(
+                'Run deadline exceeded waiting for a slot to call {}'.format(
+                    name
+                )
+            )
+
+        return token
+
+    def release(self, token, outcome=SUCCESS):
+        '''
+        Frees a slot, adapting the limit to the outcome of the call.
+
+        :param token: Token `acquire` returned
+        :param outcome: SUCCESS, THROTTLED or FAILED (neither grows nor cuts
+            the limit)
+        :type outcome: :class:`str`
+        '''
+        with self._cond:
+            self._in_flight -= 1
+
+            if outcome == THROTTLED:
+                self.throttles += 1
+
+                if token == self._epoch:
+                    self._limit = max(self.minimum, self._limit * self.decrease)
+                    self._epoch += 1
+
+            elif outcome == SUCCESS:
+                self._limit = min(
+                    self.maximum, self._limit + self.increase / self._limit
+                )
+
+            self._cond.notify_all()
+
+    @contextmanager
+    def slot(self, name):
+        '''
+        Holds a slot for the duration of the block, waiting no longer than
+        the deadline of the run. Errors leaving the block count as throttles
+        if the API was throttling, and as failures otherwise.
+
+        :param name: What the slot is for, e.g. the provider to call
+        :type name: :class:`str`
+        :returns: The slot, to mark the call as throttled with
+        :rtype: :class:`Slot`
+        :raises DeadlineExceeded: No slot freed up before the deadline
+        '''
+        token = self.acquire_in_time(name)
+        held = Slot()
+
+        try:
+            yield held
+
+        except Exception as e:
+            held.failed(e)
+
+            raise
+
+        finally:
+            self.release(token, held.outcome)
+
+    def snapshot(self) -> dict:
+        with self._cond:
+            return {
+                'limit': self.limit,
+                'maximum': int(self.maximum),
+                'in_flight': self._in_flight,
+                'throttles': self.throttles
+            }
+
+
+class AsyncAdaptiveLimit(object):
+    def __init__(self, limit):
+        '''
+        Holds slots of an `AdaptiveLimit` from coroutines, waiting for one
+        without blocking the event loop. Must be created in the loop running
+        the coroutines (asyncio primitives are bound to it), and be the only
+        way slots of the limit are taken in that loop.
+
+        :param limit: Limit to hold slots of
+        :type limit: :class:`AdaptiveLimit`
+        '''
+        self.limit = limit
+        self._freed = asyncio.Condition()
+
+    @asynccontextmanager
+    async def slot(self, name):
+        '''
+        Same as `AdaptiveLimit.slot`, awaiting a slot.
+
+        :param name: What the slot is for, e.g. the provider to call
+        :type name: :class:`str`
+        :returns: The slot, to mark the call as throttled with
+        :rtype: :class:`Slot`
+        :raises DeadlineExceeded: No slot freed up before the deadline
+        '''
+        run_deadline = deadline.current()
+        tokens = []
+
+        def acquired():
+            token = self.limit.acquire(timeout=0)
+
+            if token is not None:
+                tokens.append(token)
+
+            return bool(tokens)
+
+        async with self._freed:
+            try:
+                await asyncio.wait_for(
+                    self._freed.wait_for(acquired),
+                    max(run_deadline.time_left(), 0) if run_deadline else None
+                )
+            except asyncio.TimeoutError:
+                raise DeadlineExceeded(
+                    'Run deadline exceeded waiting for a slot to call '
+                    '{}'.format(name)
+                )
+
+        held = Slot()
+
+        try:
+            yield held
+
+        except Exception as e:
+            held.failed(e)
+
+            raise
+
+        finally:
+            self.limit.release(tokens[0], held.outcome)
+
+            async with self._freed:
+                self._freed.notify_all()
+
+
+class AdaptiveLimits(object):
+    def __init__(self, maximum, maximums=None):
+        '''
+        Adaptive limits by key (e.g. provider or host), created as needed.
+
+        :param maximum: Highest a limit goes
+        :type maximum: :class:`int`
+        :param maximums: Optional highest a limit goes, by key
+        :type maximums: :class:`dict`
+        '''
+        self.maximum = maximum
+        self._maximums = dict(maximums or {})
+        self._limits = {}
+        self._lock = threading.Lock()
+
+    def get(self, key) -> AdaptiveLimit:
+        with self._lock:
+            if key not in self._limits:
+                self._limits[key] = AdaptiveLimit(
+                    self._maximums.get(key, self.maximum)
+                )
+
+            return self._limits[key]
+
+    def snapshot(self) -> dict:
+        '''
+        :returns: Current limit, maximum, calls in flight and throttles
+            seen, by key
+        :rtype: :class:`dict`
+        '''
+        with self._lock:
+            limits = dict(self._limits)
+
+        return {key: limit.snapshot() for key, limit in sorted(limits.items())}
+
+
+# Limits of the hosts Keydra calls, reused across runs of a warm Lambda
+HOSTS = AdaptiveLimits(DEFAULT_HOST_LIMIT)
+
+
+def host_of(url) -> str:
+    return urlsplit(url).hostname or url
+
+
+def _before_call(params, context, **kwargs):
+    host = host_of(params['url'])
+    limit = HOSTS.get(host)
+    context[_SLOT] = (limit, limit.acquire_in_time(host))
+
+
+def _after_call(http_response, parsed, context, **kwargs):
+    held = context.pop(_SLOT, None)
+
+    if held is None:
+        return
+
+    code = (parsed or {}).get('Error', {}).get('Code')
+    throttled = (
+        http_response.status_code in retry.THROTTLING_STATUSES or
+        code in retry.THROTTLING_CODES
+    )
+
+    held[0].release(held[1], THROTTLED if throttled else SUCCESS)
+
+
+def _after_call_error(context, **kwargs):
+    held = context.pop(_SLOT, None)
+
+    if held is not None:
+        held[0].release(held[1], FAILED)
+
+
+def limit_client(client):
+    '''
+    Holds every call of a boto3 client to the adaptive limit of the host
+    it calls.
+
+    :param client: boto3 client
+    :returns: The client
+    '''
+    events = client.meta.events
+
+    events.register(
+        'before-call', _before_call, unique_id='keydra-limiter-before'
+    )
+    events.register(
+        'after-call', _after_call, unique_id='keydra-limiter-after'
+    )
+    events.register(
+        'after-call-error', _after_call_error, unique_id='keydra-limiter-error'
+    )
+
+    return client
@@ -1,29 +1,53 @@
-import boto3
+import hashlib
 import json
 
 from botocore.exceptions import ClientError
 
-from importlib import import_module
 import inspect
 
+from contextlib import contextmanager
+
 from keydra import logging as km_logging
 
+from keydra.clients.aws import session as aws_session
+from keydra.clients.aws.secretsmanager import GetSecretException
 from keydra.clients.aws.secretsmanager import SecretsManagerClient
 
+from keydra.credentials import CredentialCache
+
 from keydra.exceptions import ConfigException, InvalidSecretProvider
 
+from keydra.executor import Executor
+
+from keydra.pool import ClientPool
+
 from keydra.providers.base import BaseProvider
 
+from keydra.registry import Registry
+
+from keydra import timing
+
 
 DEFAULT_REGION_NAME = 'ap-southeast-2'
 
 # Global variables are reused across execution contexts (if available)
-SESSION = boto3.Session()
+SESSION = aws_session.SESSION
 
 KEYDRA_SECRETS_PREFIX = 'keydra'
 
 SECRETS_MANAGER = SecretsManagerClient(region_name=DEFAULT_REGION_NAME)
 
+# Kept across warm invocations, see CredentialCache
+CREDENTIALS = CredentialCache()
+
+PREFETCH_WORKERS = 8
+
+# Kept across warm invocations, see ClientPool
+CLIENT_POOL = ClientPool()
+
+# Tag of the clients of providers not using Keydra credentials
+NO_CREDENTIALS = '-'
+
 LOCAL_PROVIDERS = {
     'appsync': 'aws_appsync',
     'firehose': 'aws_kinesisfirehose',
@@ -43,15 +67,104 @@ LOCAL_CLIENTS = {
 LOGGER = km_logging.get_logger()
 
 
-def fetch_provider_creds(provider, key_name):
+def provider_creds_id(provider, key_name):
     secret_id = '{}/{}'.format(KEYDRA_SECRETS_PREFIX, provider.lower())
 
     if key_name:
         secret_id = '{}/{}'.format(secret_id, key_name)
 
+    return secret_id
+
+
+def prefetch_provider_creds(secret_ids):
+    '''
+    Loads a set of Keydra credentials into the credential cache in bulk
+    (BatchGetSecretValue, or parallel reads if not available), so runs don't
+    read them one by one as secrets get processed. Credentials already
+    cached are skipped, unless their version is not the current one anymore
+    (see `_drop_stale_creds`), the ones that can't be read are left for
+    `fetch_provider_creds` to report on.
+
+    Only effective while the credential cache is active.
+
+    :param secret_ids: IDs of the credentials secrets (keydra/...)
+    :type secret_ids: :class:`set`
+    '''
+    if not CREDENTIALS.active:
+        return
+
+    _drop_stale_creds(sorted(s for s in secret_ids if CREDENTIALS.fresh(s)))
+
+    missing = sorted(s for s in secret_ids if not CREDENTIALS.fresh(s))
+
+    if not missing:
+        return
+
+    LOGGER.debug('Prefetching {} from Secrets Manager'.format(', '.join(missing)))
+
     try:
-        LOGGER.debug('Loading {} from Secrets Manager'.format(secret_id))
-        secret_value = SECRETS_MANAGER.get_secret_value(secret_id)
+        secrets = SECRETS_MANAGER.batch_get_secret_values(missing)
+
+    except (AttributeError, ClientError) as e:
+        LOGGER.debug('Batch read not available ({}), reading in parallel'.format(e))
+
+        def read(secret_id):
+            try:
+                return secret_id, SECRETS_MANAGER.get_secret_value(secret_id)
+            except ClientError:
+                return secret_id, None
+
+        secrets = {
+            secret_id: (value, None)
+            for secret_id, value in Executor(PREFETCH_WORKERS).map(read, missing)
+            if value is not None
+        }
+
+    for secret_id, (value, version_id) in secrets.items():
+        CREDENTIALS.put(secret_id, value, version_id=version_id)
+
+
+def _drop_stale_creds(secret_ids):
+    '''
+    Forgets cached credentials (and the clients built with them) that
+    changed since they were read, e.g. rotated outside of Keydra, going by
+    the version labelled AWSCURRENT. Credentials cached without a version
+    can't be checked, so they are dropped too.
+
+    :param secret_ids: IDs of the cached credentials secrets
+    :type secret_ids: :class:`list`
+    '''
+    def current(secret_id):
+        if CREDENTIALS.version(secret_id) is None:
+            return secret_id, None
+
+        try:
+            return secret_id, SECRETS_MANAGER.current_version(secret_id)
+        except GetSecretException:
+            return secret_id, None
+
+    stale = {
+        secret_id
+        for secret_id, version_id in Executor(PREFETCH_WORKERS).map(current, secret_ids)
+        if version_id is None or version_id != CREDENTIALS.version(secret_id)
+    }
+
+    if stale:
+        LOGGER.debug('Dropping stale {}'.format(', '.join(sorted(stale))))
+        invalidate_credentials(stale)
+
+
+def fetch_provider_creds(provider, key_name):
+    secret_id = provider_creds_id(provider, key_name)
+
+    try:
+        secret_value = CREDENTIALS.get(secret_id)
+
+        if secret_value is None:
+            LOGGER.debug('Loading {} from Secrets Manager'.format(secret_id))
+            secret_value = SECRETS_MANAGER.get_secret_value(secret_id)
+            CREDENTIALS.put(secret_id, secret_value)
+
     except ClientError as e:  # pragma: no cover
         LOGGER.debug('Not able to read credentials for: {} -- {}'.format(provider, e))
         raise ConfigException('Failed to read {} from Secrets Manager: {}'.format(secret_id, e))
@@ -64,34 +177,40 @@ def fetch_provider_creds(provider, key_name):
         raise ConfigException('The value of {} is not valid JSON'.format(secret_id))
 
 
-def load_provider_client(secret_provider: str):
-    try:
-        sanitized_provider = secret_provider.lower()
-        module_name = 'keydra.providers.{}'.format(
-            LOCAL_PROVIDERS.get(sanitized_provider, sanitized_provider)
-        )
-        module = import_module(module_name)
-
-        providers = []
-        for _, obj in inspect.getmembers(module):
-            if (inspect.isclass(obj)
-                    and issubclass(obj, BaseProvider)
-                    and obj != BaseProvider):
-                providers.append(obj)
-
-        if len(providers) == 0:
-            raise AttributeError(
-                'Didn\'t find any classes extending BaseProvider in {}'
-                .format(module_name)
-            )
+def _provider_classes(module):
+    return [
+        obj for _, obj in inspect.getmembers(module, inspect.isclass)
+        if issubclass(obj, BaseProvider) and obj != BaseProvider
+    ]
+
+
+def _client_classes(module):
+    return [
+        obj for name, obj in inspect.getmembers(module)
+        if name.endswith('Client')
+    ]
 
-        if len(providers) > 1:
-            raise AttributeError(
-                'Found multiple classes extending BaseProvider in {}'
-                .format(module_name)
-            )
 
-        return providers[0]
+PROVIDERS = Registry(
+    'BaseProvider',
+    'keydra.providers',
+    _provider_classes,
+    aliases=LOCAL_PROVIDERS,
+    entry_point_group='keydra.providers'
+)
+
+CLIENTS = Registry(
+    'Client',
+    'keydra.clients',
+    _client_classes,
+    aliases=LOCAL_CLIENTS,
+    entry_point_group='keydra.clients'
+)
+
+
+def load_provider_client(secret_provider: str):
+    try:
+        return PROVIDERS.get(secret_provider)
 
     except (ModuleNotFoundError, AttributeError) as e:
         raise InvalidSecretProvider(
@@ -103,30 +222,7 @@ def load_provider_client(secret_provider: str):
 
 def load_client(provider):
     try:
-        sanitized_provider = provider.lower()
-        module_name = 'keydra.clients.{}'.format(
-            LOCAL_CLIENTS.get(sanitized_provider, sanitized_provider)
-        )
-        module = import_module(module_name)
-
-        providers = []
-        for _, obj in inspect.getmembers(module):
-            if _.endswith('Client'):
-                providers.append(obj)
-
-        if len(providers) == 0:
-            raise AttributeError(
-                'Didn\'t find any classes extending object in {}'
-                .format(module_name)
-            )
-
-        if len(providers) > 1:
-            raise AttributeError(
-                'Found multiple classes extending object in {}'
-                .format(module_name)
-            )
-
-        return providers[0]
+        return CLIENTS.get(provider)
 
     except (ModuleNotFoundError, AttributeError) as e:
         raise InvalidSecretProvider(
@@ -140,12 +236,95 @@ def build_client(secret_provider, key_name):
     km_provider = load_provider_client(secret_provider)
     credentials = None
     if km_provider.has_creds():
-        credentials = fetch_provider_creds(secret_provider, key_name)
+        with timing.span('credential_fetch', provider=secret_provider):
+            credentials = fetch_provider_creds(secret_provider, key_name)
     else:
         LOGGER.debug('Don\'t need to fetch creds for ' + secret_provider)
 
-    return km_provider(
-        session=SESSION,
-        credentials=credentials,
-        region_name=DEFAULT_REGION_NAME
-    )
+    with timing.span('client_build', provider=secret_provider):
+        return km_provider(
+            session=SESSION,
+            credentials=credentials,
+            region_name=DEFAULT_REGION_NAME
+        )
+
+
+@contextmanager
+def run_scope():
+    '''
+    Context manager enabling the credential cache and the client pool for
+    the duration of a run.
+    '''
+    with CREDENTIALS.scope(), CLIENT_POOL.scope():
+        yield
+
+
+def _credentials_tag(secret_provider, key_name):
+    try:
+        if not load_provider_client(secret_provider).has_creds():
+            return NO_CREDENTIALS
+    except InvalidSecretProvider:
+        return None
+
+    value = CREDENTIALS.get(provider_creds_id(secret_provider, key_name))
+
+    if value is None:
+        return None
+
+    return hashlib.sha256(value.encode('utf-8')).hexdigest()
+
+
+def checkout_client(secret_provider, key_name):
+    '''
+    Gets a provider client, reusing an idle one built with the same
+    credentials if there is one in the pool.
+
+    :param secret_provider: Name of the provider
+    :type secret_provider: :class:`str`
+    :param key_name: Credentials key, if any
+    :type key_name: :class:`str`
+    :returns: The client and its lease, to pass to `release_client` once
+        done with it
+    :rtype: :class:`tuple`
+    '''
+    key = (secret_provider.lower(), key_name or None)
+    tag = _credentials_tag(secret_provider, key_name)
+    km = CLIENT_POOL.checkout(key, tag)
+
+    if km is None:
+        km = build_client(secret_provider, key_name)
+        # Credentials were just read (and cached) to build the client
+        tag = _credentials_tag(secret_provider, key_name)
+
+    return km, (key, tag)
+
+
+def release_client(km, lease):
+    '''
+    Gives a client obtained with `checkout_client` back to the pool. Clients
+    that failed shouldn't be given back, in case they are in a bad state.
+    '''
+    key, tag = lease
+    CLIENT_POOL.release(key, tag, km)
+
+
+def invalidate_credentials(secret_ids):
+    '''
+    Forgets everything built out of the given Keydra credentials secrets,
+    e.g. after they were written to.
+
+    :param secret_ids: IDs of the secrets in Secrets Manager
+    :type secret_ids: :class:`set`
+    '''
+    CREDENTIALS.invalidate(*secret_ids)
+
+    # Clients are tagged with their credentials version, so they'd be
+    # discarded anyway. This only frees them sooner.
+    prefix = '{}/'.format(KEYDRA_SECRETS_PREFIX)
+
+    for secret_id in secret_ids:
+        if not secret_id.startswith(prefix):
+            continue
+
+        provider, _, key_name = secret_id[len(prefix):].partition('/')
+        CLIENT_POOL.invalidate((provider, key_name or None))
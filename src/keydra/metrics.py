@@ -0,0 +1,195 @@
+import json
+import sys
+import threading
+import time
+
+from keydra import logging as km_logging
+
+
+LOGGER = km_logging.get_logger()
+
+NAMESPACE = 'Keydra'
+
+# Most datums CloudWatch takes in one PutMetricData call
+MAX_DATUMS_PER_CALL = 1000
+
+# Most distinct values CloudWatch takes in one datum
+MAX_VALUES_PER_DATUM = 150
+
+# Most values EMF takes for one metric of a record
+MAX_EMF_VALUES = 100
+
+
+class CloudwatchBackend(object):
+    def __init__(self, client):
+        '''
+        Publishes metrics with PutMetricData.
+
+        :param client: boto3 CloudWatch client
+        :type client: :class:`botocore.client.CloudWatch`
+        '''
+        self._client = client
+
+    def publish(self, namespace: str, metric_data: list):
+        for start in range(0, len(metric_data), MAX_DATUMS_PER_CALL):
+            self._client.put_metric_data(
+                MetricData=metric_data[start:start + MAX_DATUMS_PER_CALL],
+                Namespace=namespace
+            )
+
+
+class EmfBackend(object):
+    def __init__(self, stream=None):
+        '''
+        Publishes metrics in the CloudWatch Embedded Metric Format: records
+        written to the Lambda log, which CloudWatch turns into metrics. No
+        API call is made.
+
+        :param stream: Where to write the records to, stdout by default
+        :type stream: :class:`io.TextIOBase`
+        '''
+        self._stream = stream
+
+    def publish(self, namespace: str, metric_data: list):
+        stream = self._stream or sys.stdout
+        timestamp = int(time.time() * 1000)
+
+        for datum in metric_data:
+            dimensions = {
+                d['Name']: d['Value'] for d in datum.get('Dimensions', [])
+            }
+
+            if 'Values' in datum:
+                values = [
+                    value
+                    for value, count in zip(
+                        datum['Values'],
+                        datum.get('Counts', [1] * len(datum['Values']))
+                    )
+                    for _ in range(int(count))
+                ]
+            else:
+                values = [datum['Value']]
+
+            for start in range(0, len(values), MAX_EMF_VALUES):
+                chunk = values[start:start + MAX_EMF_VALUES]
+                record = {
+                    '_aws': {
+                        'Timestamp': timestamp,
+                        'CloudWatchMetrics': [
+                            {
+                                'Namespace': namespace,
+                                'Dimensions': [list(dimensions)],
+                                'Metrics': [
+                                    {
+                                        'Name': datum['MetricName'],
+                                        'Unit': datum.get('Unit', 'None')
+                                    }
+                                ]
+                            }
+                        ]
+                    },
+                    datum['MetricName']: chunk if len(chunk) > 1 else chunk[0]
+                }
+                record.update(dimensions)
+
+                stream.write(json.dumps(record) + '\n')
+
+        stream.flush()
+
+
+BACKENDS = {
+    'cloudwatch': CloudwatchBackend,
+    'emf': lambda client: EmfBackend(),
+}
+
+
+class MetricsBuffer(object):
+    def __init__(self, backend, max_datums=MAX_DATUMS_PER_CALL):
+        '''
+        Aggregates metric samples in memory, to publish them in a few calls
+        (as values and counts) rather than one call per sample.
+
+        Samples are published by `flush`, or as soon as `max_datums` datums
+        are buffered.
+
+        :param backend: Where to publish the metrics to
+        :type backend: :class:`CloudwatchBackend` or :class:`EmfBackend`
+        :param max_datums: Datums to buffer before publishing
+        :type max_datums: :class:`int`
+        '''
+        self._backend = backend
+        self._max_datums = max_datums
+        self._samples = {}
+        self._lock = threading.Lock()
+
+    def record(self, name: str, value, dimensions=None, unit='None',
+               namespace=NAMESPACE):
+        '''
+        :param name: Metric name
+        :type name: :class:`str`
+        :param value: Sample
+        :type value: :class:`float`
+        :param dimensions: Dimensions of the metric, by name
+        :type dimensions: :class:`dict`
+        :param unit: CloudWatch unit of the sample
+        :type unit: :class:`str`
+        '''
+        key = (
+            namespace, name, tuple(sorted((dimensions or {}).items())), unit
+        )
+
+        with self._lock:
+            counts = self._samples.setdefault(key, {})
+            counts[value] = counts.get(value, 0) + 1
+
+            full = self._datums_buffered() >= self._max_datums
+
+        if full:
+            self.flush()
+
+    def _datums_buffered(self):
+        return sum(
+            -(-len(counts) // MAX_VALUES_PER_DATUM)
+            for counts in self._samples.values()
+        )
+
+    def flush(self):
+        '''
+        Publishes the samples buffered so far. Never raises, failing to
+        publish metrics must not fail a run.
+        '''
+        with self._lock:
+            samples, self._samples = self._samples, {}
+
+        by_namespace = {}
+
+        for (namespace, name, dimensions, unit), counts in samples.items():
+            values = list(counts.items())
+
+            for start in range(0, len(values), MAX_VALUES_PER_DATUM):
+                chunk = values[start:start + MAX_VALUES_PER_DATUM]
+
+                by_namespace.setdefault(namespace, []).append(
+                    {
+                        'MetricName': name,
+                        'Dimensions': [
+                            {'Name': d_name, 'Value': d_value}
+                            for d_name, d_value in dimensions
+                        ],
+                        'Unit': unit,
+                        'Values': [value for value, _ in chunk],
+                        'Counts': [count for _, count in chunk]
+                    }
+                )
+
+        for namespace, metric_data in by_namespace.items():
+            try:
+                self._backend.publish(namespace, metric_data)
+
+            except Exception as e:
+                LOGGER.warning(
+                    'Unable to publish {} metric(s): {}'.format(
+                        len(metric_data), e
+                    )
+                )
@@ -0,0 +1,204 @@
+'''
+Specs (secrets and their distribution targets) and results are shared, not
+copied, as they flow through Keydra: the same spec is handed to every run of
+a warm Lambda, and targets expanded from one spec share everything they
+don't override.
+
+Shortlisted specs are read-only records (`SecretSpec`, holding its
+`DistributionTarget`s), and the outcomes of rotations and distributions are
+`RotationResult`s. Records are mappings too, so code reading specs and
+results as dicts keeps working, and `as_dict` turns them back into plain
+dicts (e.g. for JSON). Use `override` to change a spec.
+'''
+from collections.abc import Mapping
+
+# Marks a field absent from the dict a record was built from
+_UNSET = object()
+
+
+def override(mapping: dict, **changes) -> dict:
+    '''
+    Copy-on-write update of a spec or result.
+
+    :param mapping: Spec or result to change, left untouched
+    :type mapping: :class:`dict`
+    :param changes: Keys to set
+    :returns: A new dict (or record, for records) with the changes, sharing
+        all other values with `mapping`
+    :rtype: :class:`dict`
+    '''
+    if isinstance(mapping, _Record):
+        return mapping.replace(**changes)
+
+    changed = dict(mapping)
+    changed.update(changes)
+
+    return changed
+
+
+def as_dict(value):
+    '''
+    Dict adapter of records, also usable as the `default` of `json.dumps`.
+
+    :param value: Record, or anything else (returned as is)
+    :returns: A plain dict of the record (records it holds converted too)
+    '''
+    if isinstance(value, _Record):
+        return value.to_dict()
+
+    if isinstance(value, (list, tuple)):
+        return [as_dict(item) for item in value]
+
+    return value
+
+
+class _Record(Mapping):
+    '''
+    Immutable record of known fields (in `__slots__`), plus the other keys
+    of the dict it was built from, read as a mapping of all of them.
+    '''
+    __slots__ = ('extra',)
+
+    def __init__(self, extra=None, **fields):
+        for name in self._fields():
+            object.__setattr__(self, name, fields.pop(name, _UNSET))
+
+        if fields:
+            raise TypeError('Unknown fields: {}'.format(', '.join(fields)))
+
+        object.__setattr__(self, 'extra', dict(extra or {}))
+
+    @classmethod
+    def _fields(cls):
+        return cls.__slots__
+
+    def __setattr__(self, name, value):
+        raise AttributeError(
+            '{} is read-only, use replace()'.format(type(self).__name__)
+        )
+
+    def __getattribute__(self, name):
+        value = object.__getattribute__(self, name)
+
+        return None if value is _UNSET else value
+
+    def __getitem__(self, key):
+        if key in self._fields():
+            value = object.__getattribute__(self, key)
+
+            if value is _UNSET:
+                raise KeyError(key)
+
+            return value
+
+        return self.extra[key]
+
+    def __iter__(self):
+        for name in self._fields():
+            if self.has(name):
+                yield name
+
+        yield from self.extra
+
+    def __len__(self):
+        return sum(1 for _ in self)
+
+    def __eq__(self, other):
+        if not isinstance(other, Mapping):
+            return NotImplemented
+
+        return self.to_dict() == {
+            key: as_dict(value) for key, value in other.items()
+        }
+
+    __hash__ = None
+
+    def __repr__(self):
+        return '{}({!r})'.format(type(self).__name__, self.to_dict())
+
+    def has(self, name) -> bool:
+        '''
+        :returns: Whether the field was set (possibly to None)
+        :rtype: :class:`bool`
+        '''
+        return object.__getattribute__(self, name) is not _UNSET
+
+    def replace(self, **changes):
+        '''
+        :returns: A copy of the record with some keys changed, sharing all
+            other values
+        '''
+        fields = {
+            name: object.__getattribute__(self, name)
+            for name in self._fields()
+        }
+        extra = dict(self.extra)
+
+        for key, value in changes.items():
+            if key in fields:
+                fields[key] = value
+            else:
+                extra[key] = value
+
+        return type(self)(extra=extra, **fields)
+
+    @classmethod
+    def from_dict(cls, data: dict):
+        fields = {}
+        extra = {}
+
+        for key, value in data.items():
+            if key in cls._fields():
+                fields[key] = value
+            else:
+                extra[key] = value
+
+        return cls(extra=extra, **fields)
+
+    def to_dict(self) -> dict:
+        return {key: as_dict(value) for key, value in self.items()}
+
+
+class DistributionTarget(_Record):
+    '''
+    Where a secret is distributed to, an entry of "distribute" in
+    secrets.yaml.
+    '''
+    __slots__ = ('provider', 'key', 'source', 'envs', 'config')
+
+
+class SecretSpec(_Record):
+    '''
+    A secret, as in secrets.yaml. `distribute` is a tuple of
+    :class:`DistributionTarget`.
+    '''
+    __slots__ = ('provider', 'key', 'rotate', 'distribute')
+
+    def __init__(self, extra=None, **fields):
+        distribute = fields.get('distribute', _UNSET)
+
+        if distribute is not _UNSET and not (
+            isinstance(distribute, tuple) and all(
+                isinstance(target, DistributionTarget)
+                for target in distribute
+            )
+        ):
+            fields['distribute'] = tuple(
+                target if isinstance(target, DistributionTarget)
+                else DistributionTarget.from_dict(target)
+                for target in fields['distribute']
+            )
+
+        super().__init__(extra=extra, **fields)
+
+    @property
+    def secret_id(self) -> str:
+        return '{}::{}'.format(self.provider, self.key)
+
+
+class RotationResult(_Record):
+    '''
+    Outcome of rotating or distributing a secret. Fields left unset are left
+    out of its dict.
+    '''
+    __slots__ = ('status', 'action', 'msg', 'value')
@@ -0,0 +1,301 @@
+import argparse
+import gzip
+import hashlib
+import json
+import math
+import os
+import tempfile
+import threading
+
+from keydra import logging as km_logging
+from keydra.model import SecretSpec, as_dict
+
+
+LOGGER = km_logging.get_logger()
+
+DEFAULT_PLAN_DIR = os.path.join(tempfile.gettempdir(), 'keydra', 'plan')
+
+# Package the modules shaping plans (config, providers...) are part of
+CODE_PACKAGE = os.path.dirname(os.path.abspath(__file__))
+
+_CODE_VERSION = None
+
+
+def config_hash(environments: dict, secrets: dict) -> str:
+    '''
+    :param environments: Environments, as in environments.yaml
+    :type environments: :class:`dict`
+    :param secrets: Secret specs by ID, as in secrets.yaml
+    :type secrets: :class:`dict`
+    :returns: Hash of the content of the config
+    :rtype: :class:`str`
+    '''
+    return hashlib.sha256(
+        json.dumps(
+            [environments, secrets],
+            sort_keys=True, separators=(',', ':'), default=str
+        ).encode()
+    ).hexdigest()
+
+
+def code_version() -> str:
+    '''
+    Fingerprint of the Keydra code, so plans compiled by another version of
+    Keydra (e.g. one expanding distribution targets differently) are not
+    reused. Worked out once per Lambda environment.
+
+    :returns: Hash of the content of the Python modules of Keydra
+    :rtype: :class:`str`
+    '''
+    global _CODE_VERSION
+
+    if _CODE_VERSION is None:
+        digest = hashlib.sha256()
+
+        for root, dirs, files in os.walk(CODE_PACKAGE):
+            dirs.sort()
+
+            for name in sorted(files):
+                if not name.endswith('.py'):
+                    continue
+
+                path = os.path.join(root, name)
+                digest.update(os.path.relpath(path, CODE_PACKAGE).encode())
+
+                with open(path, 'rb') as module:
+                    digest.update(module.read())
+
+        _CODE_VERSION = digest.hexdigest()
+
+    return _CODE_VERSION
+
+
+def batch_bounds(total, number_of_batches, batch_number):
+    '''
+    :param total: Number of secrets in the config
+    :type total: :class:`int`
+    :param number_of_batches: Number of batches the secrets are split in
+    :type number_of_batches: :class:`int`
+    :param batch_number: Batch of this run, starting from 0
+    :type batch_number: :class:`int`
+    :returns: Start (inclusive) and end (exclusive) positions, in the config,
+        of the secrets of the batch. None if not batched.
+    :rtype: :class:`tuple`
+    '''
+    if number_of_batches is None or batch_number is None:
+        return None
+
+    if not isinstance(number_of_batches, int) or not isinstance(batch_number, int):
+        raise Exception(
+            f"batch number {batch_number} or number of batches {number_of_batches} is not an integer")
+    if batch_number >= number_of_batches or number_of_batches <= 0 or batch_number < 0:
+        raise Exception(
+            f"batch number {batch_number} of number of batches {batch_number} are not valid numbers")
+    batch_size = math.ceil(total / number_of_batches)
+    starting_index = batch_size * batch_number  # assumption that batch number starts from zero
+    LOGGER.info(
+        'Batching batch number %s, batch size of %s, number of batches %s, secrets for rotation',
+        batch_number, batch_size, number_of_batches)
+
+    return starting_index, starting_index + batch_size
+
+
+class RotationPlan(object):
+    def __init__(self, key, env, total, schedules=None):
+        '''
+        The secrets (validated and with their distribution targets expanded)
+        each rotation schedule processes in an environment, compiled once
+        per config and account.
+
+        :param key: Identifies the config, environment and Keydra code the
+            plan is for
+        :type key: :class:`str`
+        :param env: Name of the environment
+        :type env: :class:`str`
+        :param total: Number of secrets in the config (batches are sized
+            after it)
+        :type total: :class:`int`
+        :param schedules: Compiled schedules, lists of `[position in the
+            config, secret ID, spec]` by schedule
+        :type schedules: :class:`dict`
+        '''
+        self.key = key
+        self.env = env
+        self.total = total
+        self._schedules = dict(schedules or {})
+        self._lock = threading.Lock()
+
+    def compiled(self, rotate) -> bool:
+        return rotate in self._schedules
+
+    def add(self, rotate, entries):
+        '''
+        :param rotate: Rotation schedule
+        :type rotate: :class:`str`
+        :param entries: `[position in the config, secret ID, spec]` of the
+            secrets processed by the schedule, in the order of the config
+        :type entries: :class:`list`
+        '''
+        with self._lock:
+            self._schedules[rotate] = entries
+
+    def select(self, rotate, requested_secrets=None, number_of_batches=None,
+               batch_number=None) -> list:
+        '''
+        :returns: Secret ID and spec of the secrets of a run, the specs as
+            `KeydraConfig._shortlist_secret` shortlisted them
+        :rtype: :class:`list` of :class:`tuple`
+        '''
+        bounds = batch_bounds(self.total, number_of_batches, batch_number)
+        selected = []
+
+        for position, sid, spec in self._schedules[rotate]:
+            if bounds is not None and not bounds[0] <= position < bounds[1]:
+                continue
+
+            if requested_secrets and sid not in requested_secrets:
+                continue
+
+            selected.append((sid, spec))
+
+        return selected
+
+    def to_dict(self) -> dict:
+        with self._lock:
+            return {
+                'key': self.key,
+                'env': self.env,
+                'total': self.total,
+                'schedules': {
+                    rotate: [
+                        [position, sid, as_dict(spec)]
+                        for position, sid, spec in entries
+                    ]
+                    for rotate, entries in self._schedules.items()
+                }
+            }
+
+    @classmethod
+    def from_dict(cls, plan: dict):
+        return cls(
+            plan['key'], plan['env'], plan['total'],
+            {
+                rotate: [
+                    [position, sid, SecretSpec.from_dict(spec)]
+                    for position, sid, spec in entries
+                ]
+                for rotate, entries in plan['schedules'].items()
+            }
+        )
+
+
+class LocalFilePlanStore(object):
+    def __init__(self, directory=DEFAULT_PLAN_DIR):
+        '''
+        Keeps compiled plans as gzipped JSON files, in /tmp by default.
+
+        :param directory: Directory to keep the plans in
+        :type directory: :class:`str`
+        '''
+        self._directory = directory
+
+    def _path(self, key):
+        return os.path.join(self._directory, '{}.json.gz'.format(key))
+
+    def load(self, key):
+        '''
+        :param key: Identifies the config and account of the plan
+        :type key: :class:`str`
+        :returns: The plan, None if not compiled yet
+        :rtype: :class:`RotationPlan`
+        '''
+        try:
+            with gzip.open(self._path(key), 'rt') as plan_file:
+                return RotationPlan.from_dict(json.load(plan_file))
+
+        except FileNotFoundError:
+            return None
+
+        except (OSError, ValueError, KeyError) as e:
+            LOGGER.warning(
+                'Unable to read plan {}, compiling again: {}'.format(key, e)
+            )
+            return None
+
+    def save(self, plan: RotationPlan):
+        '''
+        Saves a plan. Plans of configs which can't be represented in JSON
+        (e.g. YAML dates) are not saved.
+        '''
+        try:
+            content = gzip.compress(
+                json.dumps(plan.to_dict(), separators=(',', ':')).encode()
+            )
+
+            os.makedirs(self._directory, exist_ok=True)
+
+            # Written aside and moved in place, so a run killed mid-write
+            # never leaves a corrupt plan behind
+            fd, tmp_path = tempfile.mkstemp(dir=self._directory)
+
+            with os.fdopen(fd, 'wb') as plan_file:
+                plan_file.write(content)
+
+            os.replace(tmp_path, self._path(plan.key))
+
+        except (OSError, TypeError, ValueError) as e:
+            LOGGER.warning('Unable to save plan {}: {}'.format(plan.key, e))
+
+
+class _Account(object):
+    def __init__(self, account):
+        self._account = account
+
+    def get_caller_identity(self):
+        return {'Account': self._account}
+
+
+def main(args=None):
+    '''
+    Compiles the plan of every rotation schedule ahead of time, e.g. to ship
+    it along with Keydra (see the "plandir" config).
+
+    python -m keydra.plan environments.yaml secrets.yaml --account 0123456789
+    '''
+    # Imported here, the config needs this module
+    from keydra import config_parser
+    from keydra.config import KeydraConfig
+
+    parser = argparse.ArgumentParser(prog='python -m keydra.plan')
+    parser.add_argument('environments')
+    parser.add_argument('secrets')
+    parser.add_argument('--account', required=True)
+    parser.add_argument('--directory', default=DEFAULT_PLAN_DIR)
+    options = parser.parse_args(args)
+
+    loaded = []
+
+    for path in [options.environments, options.secrets]:
+        with open(path) as config_file:
+            loaded.append(
+                config_parser.parser(os.path.splitext(path)[1][1:])(
+                    config_file.read()
+                )
+            )
+
+    cfg = KeydraConfig(
+        config={
+            'provider': None,
+            'config': {},
+            'plandir': options.directory
+        },
+        sts_client=_Account(options.account)
+    )
+    cfg._validate_spec(*loaded)
+    plan = cfg.compile_plan(*loaded)
+
+    print('Compiled {} to {}'.format(plan.key, options.directory))
+
+
+if __name__ == '__main__':  # pragma: no cover
+    main()
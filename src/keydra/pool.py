@@ -0,0 +1,114 @@
+import threading
+import time
+
+from contextlib import contextmanager
+
+
+# How long an idle client is kept for before being discarded (seconds)
+DEFAULT_MAX_IDLE = 300
+
+
+class ClientPool(object):
+    def __init__(self, max_idle=DEFAULT_MAX_IDLE):
+        '''
+        Keeps initialised provider clients around, so targets (and warm
+        invocations) using the same provider and credentials don't pay for
+        a new client, and its login, every time.
+
+        Clients are checked out exclusively, so a client is never used by
+        two threads at once. Each client is tagged with the version of the
+        credentials it was built with, and only handed out again for the
+        same version.
+
+        Like the credential cache, the pool lives as long as the Lambda
+        environment but is only used while a run is in progress.
+
+        :param max_idle: Seconds an idle client is kept for
+        :type max_idle: :class:`int`
+        '''
+        self.max_idle = max_idle
+        self._idle = {}
+        self._scopes = 0
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def scope(self):
+        '''
+        Context manager enabling the pool for the duration of the block
+        (across all threads).
+        '''
+        with self._lock:
+            self._scopes += 1
+
+        try:
+            yield self
+        finally:
+            with self._lock:
+                self._scopes -= 1
+
+    @property
+    def active(self) -> bool:
+        return self._scopes > 0
+
+    def checkout(self, key, tag):
+        '''
+        Takes an idle client out of the pool.
+
+        :param key: Identifies the clients that are interchangeable, e.g.
+            provider and credentials key
+        :type key: :class:`tuple`
+        :param tag: Version of the credentials the client must have been
+            built with, None if unknown
+        :type tag: :class:`str`
+        :returns: A client, to be given back with `release`, or None if
+            there is no suitable one (or the pool is not active)
+        '''
+        if not self.active or tag is None:
+            return None
+
+        now = time.monotonic()
+
+        with self._lock:
+            idle = self._idle.get(key, [])
+
+            while idle:
+                client, client_tag, released_at = idle.pop()
+
+                if client_tag == tag and now - released_at <= self.max_idle:
+                    return client
+
+        return None
+
+    def release(self, key, tag, client):
+        '''
+        Gives a client back to the pool, once done with it.
+
+        :param key: Key the client was checked out with
+        :type key: :class:`tuple`
+        :param tag: Version of the credentials the client was built with,
+            None if unknown (the client is discarded)
+        :type tag: :class:`str`
+        :param client: The client
+        '''
+        if not self.active or tag is None:
+            return
+
+        with self._lock:
+            self._idle.setdefault(key, []).append(
+                (client, tag, time.monotonic())
+            )
+
+    def invalidate(self, key):
+        '''
+        Discards the idle clients of a key, e.g. once their credentials
+        have been rotated.
+
+        :param key: Key the clients were checked out with
+        :type key: :class:`tuple`
+        '''
+        with self._lock:
+            self._idle.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._idle.clear()
@@ -0,0 +1,276 @@
+import collections
+import cProfile
+import datetime
+import os
+import pstats
+import sys
+import tempfile
+import threading
+import tracemalloc
+
+from keydra import logging as km_logging
+
+
+LOGGER = km_logging.get_logger()
+
+DEFAULT_PROFILE_DIR = os.path.join(tempfile.gettempdir(), 'keydra', 'profile')
+
+DEFAULT_TOP = 20
+
+# Seconds between two samples of the sampling profiler
+DEFAULT_INTERVAL = 0.005
+
+SAMPLING = 'sampling'
+DETERMINISTIC = 'cprofile'
+
+
+def _frame_name(code):
+    return '{}:{}'.format(os.path.basename(code.co_filename), code.co_name)
+
+
+class SamplingProfiler(object):
+    def __init__(self, interval=DEFAULT_INTERVAL):
+        '''
+        Samples the stacks of the thread starting it and of the threads it
+        starts (Keydra processes secrets on worker threads) at a fixed
+        interval, from a background thread.
+
+        :param interval: Seconds between two samples
+        :type interval: :class:`float`
+        '''
+        self._interval = interval
+        self._stacks = collections.Counter()
+        self._stop = threading.Event()
+        self._thread = None
+        self._ignored = set()
+
+    def start(self):
+        # Only the thread starting the profiler and the threads it starts
+        # are sampled, not whatever else was around already
+        self._ignored = set(sys._current_frames()) - {threading.get_ident()}
+        self._thread = threading.Thread(
+            target=self._sample, name='keydra-profiler', daemon=True
+        )
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def _sample(self):
+        own = threading.get_ident()
+
+        while not self._stop.wait(self._interval):
+            for ident, frame in sys._current_frames().items():
+                if ident == own or ident in self._ignored:
+                    continue
+
+                stack = []
+
+                while frame is not None:
+                    stack.append(_frame_name(frame.f_code))
+                    frame = frame.f_back
+
+                self._stacks[';'.join(reversed(stack))] += 1
+
+    def hot_functions(self, top=DEFAULT_TOP) -> list:
+        '''
+        :returns: The functions most often running (on top of a stack),
+            with the (estimated) seconds spent in them, and in them and what
+            they called
+        :rtype: :class:`list` of :class:`dict`
+        '''
+        own = collections.Counter()
+        total = collections.Counter()
+
+        for stack, samples in self._stacks.items():
+            frames = stack.split(';')
+            own[frames[-1]] += samples
+
+            for name in set(frames):
+                total[name] += samples
+
+        return [
+            {
+                'function': name,
+                'samples': total[name],
+                'seconds': round(total[name] * self._interval, 3),
+                'own_seconds': round(samples * self._interval, 3)
+            }
+            for name, samples in own.most_common(top)
+        ]
+
+    def collapsed(self) -> str:
+        '''
+        :returns: The samples as collapsed stacks, one "frame;frame;... count"
+            line per stack (as read by flamegraph.pl or speedscope)
+        :rtype: :class:`str`
+        '''
+        return ''.join(
+            '{} {}\n'.format(stack, samples)
+            for stack, samples in sorted(self._stacks.items())
+        )
+
+
+class DeterministicProfiler(object):
+    def __init__(self):
+        '''
+        Profiles every call made by the thread starting it, with cProfile.
+        Work done on other threads (e.g. with a concurrency over 1) is not
+        seen.
+        '''
+        self._profile = cProfile.Profile()
+
+    def start(self):
+        self._profile.enable()
+
+    def stop(self):
+        self._profile.disable()
+
+    def hot_functions(self, top=DEFAULT_TOP) -> list:
+        stats = pstats.Stats(self._profile).stats
+        ranked = sorted(
+            stats.items(), key=lambda item: item[1][2], reverse=True
+        )[:top]
+
+        return [
+            {
+                'function': '{}:{}:{}'.format(
+                    os.path.basename(filename), line, name
+                ),
+                'calls': calls,
+                'seconds': round(cumulative, 6),
+                'own_seconds': round(own, 6)
+            }
+            for (filename, line, name), (_, calls, own, cumulative, _) in ranked
+        ]
+
+    def collapsed(self) -> str:
+        '''
+        :returns: Collapsed "caller;callee count" stacks, one level deep
+            (cProfile doesn't keep full stacks), weighted in microseconds
+        :rtype: :class:`str`
+        '''
+        lines = []
+
+        for (filename, line, name), (_, _, _, _, callers) in sorted(
+            pstats.Stats(self._profile).stats.items()
+        ):
+            callee = '{}:{}'.format(os.path.basename(filename), name)
+
+            for (c_filename, _, c_name), timing in callers.items():
+                lines.append(
+                    '{}:{};{} {}\n'.format(
+                        os.path.basename(c_filename), c_name, callee,
+                        int(timing[3] * 1000000)
+                    )
+                )
+
+        return ''.join(lines)
+
+
+class Profiler(object):
+    def __init__(self, mode=SAMPLING, top=DEFAULT_TOP, stacks_dir=None):
+        '''
+        Profiles a run (CPU and memory allocations), for `summary` once done.
+        Use as a context manager.
+
+        :param mode: "sampling" (every thread, low overhead) or "cprofile"
+            (every call of the current thread)
+        :type mode: :class:`str`
+        :param top: Number of functions and allocation sites to report
+        :type top: :class:`int`
+        :param stacks_dir: Optional directory to write the collapsed stacks
+            of the run to
+        :type stacks_dir: :class:`str`
+        '''
+        if mode == DETERMINISTIC:
+            self._cpu = DeterministicProfiler()
+        elif mode == SAMPLING:
+            self._cpu = SamplingProfiler()
+        else:
+            raise ValueError('Unknown profiling mode: {}'.format(mode))
+
+        self.mode = mode
+        self._top = top
+        self._stacks_dir = stacks_dir
+        self._tracing = False
+        self._snapshot = None
+        self._peak = None
+        self._stacks_file = None
+
+    def __enter__(self):
+        # Keep tracing memory if someone else started it
+        self._tracing = not tracemalloc.is_tracing()
+
+        if self._tracing:
+            tracemalloc.start()
+
+        tracemalloc.reset_peak()
+        self._cpu.start()
+
+        return self
+
+    def __exit__(self, *exc):
+        self._cpu.stop()
+
+        self._snapshot = tracemalloc.take_snapshot()
+        self._peak = tracemalloc.get_traced_memory()[1]
+
+        if self._tracing:
+            tracemalloc.stop()
+
+        if self._stacks_dir:
+            self._stacks_file = self._write_stacks()
+
+        return False
+
+    def _write_stacks(self):
+        try:
+            os.makedirs(self._stacks_dir, exist_ok=True)
+
+            path = os.path.join(
+                self._stacks_dir,
+                'keydra-{}-{}.collapsed'.format(
+                    self.mode,
+                    datetime.datetime.now().strftime('%Y%m%dT%H%M%S%f')
+                )
+            )
+
+            with open(path, 'w') as stacks:
+                stacks.write(self._cpu.collapsed())
+
+            return path
+
+        except OSError as e:
+            LOGGER.warning('Unable to write profile stacks: {}'.format(e))
+
+            return None
+
+    def _allocations(self):
+        return [
+            {
+                'location': '{}:{}'.format(
+                    os.path.basename(stat.traceback[0].filename),
+                    stat.traceback[0].lineno
+                ),
+                'kb': round(stat.size / 1024.0, 1),
+                'blocks': stat.count
+            }
+            for stat in self._snapshot.statistics('lineno')[:self._top]
+        ]
+
+    def summary(self) -> dict:
+        '''
+        :returns: The hottest functions, the largest allocation sites still
+            alive at the end of the run, the peak of traced memory and where
+            the collapsed stacks were written to, if anywhere
+        :rtype: :class:`dict`
+        '''
+        return {
+            'mode': self.mode,
+            'hot_functions': self._cpu.hot_functions(self._top),
+            'allocations': self._allocations(),
+            'peak_memory_kb': round((self._peak or 0) / 1024.0, 1),
+            'stacks_file': self._stacks_file
+        }
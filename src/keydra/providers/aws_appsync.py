@@ -1,6 +1,4 @@
-import boto3
-import boto3.session
-
+from keydra.clients.aws import session as aws_session
 from keydra.providers.base import BaseProvider
 
 from keydra.exceptions import DistributionException
@@ -14,7 +12,7 @@ from keydra.clients.aws.appsync import CreateApiKeyException
 from keydra.clients.aws.appsync import DeleteApiKeyException
 from keydra.clients.aws.appsync import ListApiKeysException
 from keydra.logging import get_logger
-from keydra.providers.base import exponential_backoff_retry
+from keydra.retry import retrying
 
 
 TEMPLATE_FOR_KEY = 'km_managed_{}'
@@ -26,7 +24,7 @@ LOGGER = get_logger()
 class Client(BaseProvider):
     def __init__(self, session=None, region_name=None, credentials=None):
         if session is None:
-            session = boto3.session.Session()
+            session = aws_session.SESSION
 
         self._appsync_client = AppSyncClient(
             session=session,
@@ -107,7 +105,7 @@ class Client(BaseProvider):
             )
             raise RotationException(e)
 
-    @exponential_backoff_retry(3)
+    @retrying()
     def rotate(self, secret):
         return self._rotate(secret)
 
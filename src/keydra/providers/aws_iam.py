@@ -1,18 +1,20 @@
-from typing import FrozenSet, List
-import boto3
-import boto3.session
+from typing import TYPE_CHECKING, FrozenSet, List
 
 from botocore.exceptions import ClientError
-from mypy_boto3_iam.type_defs import TagTypeDef
 
+from keydra.clients.aws import session as aws_session
 from keydra.providers.base import BaseProvider
-from keydra.providers.base import exponential_backoff_retry
+from keydra.retry import retrying
 
 from keydra.exceptions import DistributionException
 from keydra.exceptions import RotationException
 
 from keydra.logging import get_logger
-from mypy_boto3_iam.client import IAMClient
+
+if TYPE_CHECKING:
+    # Type stubs, only needed by type checkers
+    from mypy_boto3_iam.client import IAMClient
+    from mypy_boto3_iam.type_defs import TagTypeDef
 
 
 LOGGER = get_logger()
@@ -31,14 +33,14 @@ def _explain_secret(aws_secret):
 class Client(BaseProvider):
     def __init__(self, session=None, region_name=None, credentials=None):
         if session is None:
-            session = boto3.session.Session()
+            session = aws_session.SESSION
 
-        self._client: IAMClient = session.client('iam')
+        self._client: 'IAMClient' = aws_session.client('iam', session=session)
         self._account_id = None
 
     def _get_aws_account_id(self) -> str:
         if self._account_id is None:
-            self._account_id = boto3.client(
+            self._account_id = aws_session.client(
                 'sts').get_caller_identity().get('Account')
 
         return self._account_id
@@ -287,7 +289,7 @@ class Client(BaseProvider):
         for policy_arn in union_policy_arns - expected_policy_arns:
             self._detach_policy_from_user(policy_arn, username)
 
-    @exponential_backoff_retry(3)
+    @retrying()
     def rotate(self, secret):
         try:
             self._create_user_if_not_available(
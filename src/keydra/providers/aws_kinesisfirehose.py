@@ -1,10 +1,8 @@
-import boto3
-import boto3.session
-
+from keydra.clients.aws import session as aws_session
 from keydra.clients.aws.kinesisfirehose import FirehoseClient
 
 from keydra.providers.base import BaseProvider
-from keydra.providers.base import exponential_backoff_retry
+from keydra.retry import retrying
 
 from keydra.exceptions import DistributionException
 from keydra.exceptions import RotationException
@@ -17,9 +15,10 @@ LOGGER = get_logger()
 class Client(BaseProvider):
     def __init__(self, session=None, region_name=None, credentials=None):
         if session is None:
-            session = boto3.session.Session()
+            session = aws_session.SESSION
 
         self._session = session
+        self._region = region_name
         self._init_client(region_name)
 
     def _init_client(self, region):
@@ -32,9 +31,9 @@ class Client(BaseProvider):
         raise RotationException('AWS Kinesis Firehose provider does not support rotation')
 
     def _distribute(self, secret, target):
-        # Use the specified region if provided, else use the region Keydra is running in
-        if target['config'].get('region') is not None:
-            self._init_client(target['config']['region'])
+        # Use the specified region if provided, else use the region Keydra is running in.
+        # Clients are shared by region, so switching back and forth is cheap.
+        self._init_client(target['config'].get('region') or self._region)
 
         if not self._client.stream_exists(target['key']):
             raise DistributionException(
@@ -73,7 +72,7 @@ class Client(BaseProvider):
 
         return target
 
-    @exponential_backoff_retry(3)
+    @retrying()
     def distribute(self, secret, target):
         return self._distribute(secret, target)
 
@@ -1,9 +1,8 @@
-import boto3
-import boto3.session
 import json
 
+from keydra.clients.aws import session as aws_session
 from keydra.providers.base import BaseProvider
-from keydra.providers.base import exponential_backoff_retry
+from keydra.retry import retrying
 
 from keydra.exceptions import DistributionException
 
@@ -30,7 +29,7 @@ class SSMParameterProvider(BaseProvider):
             # credentials must be present for the loader to init the provider
             credentials=None):
         if session is None:  # pragma: no cover
-            session = boto3.session.Session()
+            session = aws_session.SESSION
 
         self._client = client or SSMClient(
             session=session,
@@ -135,7 +134,7 @@ class SSMParameterProvider(BaseProvider):
         )
         return current_secret
 
-    @exponential_backoff_retry(3)
+    @retrying()
     def distribute(self, secret, destination):
         try:
             return self._distribute_secret(secret, destination)
@@ -1,58 +1,41 @@
-import copy
+import asyncio
+import contextvars
+import functools
 import json
-import time
 import math
-import random
 
 from abc import ABC
 from abc import abstractmethod
 
 from keydra.exceptions import ConfigException
+from keydra.model import as_dict, override
+from keydra.retry import DEFAULT_CAP, retrying
 
 
 def exponential_backoff_retry(attempts: int, delay: float = 2, max_random: float = 3, exception_type=None):
     '''
-    Retries execution while it throws exceptions for the amount of times
-    set up. Adds some randomness to the delay each time.
+    Retries execution while it throws errors, for the amount of times set
+    up. Kept for providers not using `keydra.retry.retrying` yet, which it
+    now goes through (`max_random` is no longer used, waits are randomised
+    by the retry policy, from `delay` up).
 
     When giving up, re-raises the original exception.
 
-    :param attempts: Number of attempts before giving up
+    :param attempts: Number of retries before giving up
     :type attempts: :class:`int`
-    :param delay: Number of seconds to delay before retrying
+    :param delay: Number of seconds to delay before retrying, at least
     :type delay: :class:`float`
-    :param max_random: Maximum number of extra seconds to add to the delay
+    :param max_random: Unused
     :type max_random: :class:`float`
     :param exception_type: Optional, only retry is exception thrown is of this type
     :type exception_type: :class:`class`
     :returns: original return of invoked function or method
     '''
-    attempts = math.floor(attempts)
-
-    def decorator(f):
-        def retry(*args, **kwargs):
-            t_attempts = attempts
-            t_delay = delay
-            exc = None
-
-            while t_attempts >= 0:
-                try:
-                    return f(*args, **kwargs)
-                except Exception as e:
-                    exc = e
-
-                    if exception_type and not isinstance(e, exception_type):
-                        break
-
-                    t_attempts -= 1
-                    time.sleep(t_delay + random.uniform(0, max_random))
-                    t_delay *= delay
-
-            if exc:
-                raise exc
-
-        return retry
-    return decorator
+    return retrying(
+        retries=math.floor(attempts), base=delay,
+        cap=max(delay, DEFAULT_CAP), retry_on=exception_type or Exception,
+        floor=delay
+    )
 
 
 class BaseProvider(ABC):
@@ -64,7 +47,48 @@ class BaseProvider(ABC):
     def distribute(self, secret, key):
         pass
 
-    def load_config(self, config):
+    async def rotate_async(self, key):
+        '''
+        Asynchronous counterpart of `rotate`, used by the asyncio runner.
+
+        Runs the (blocking) `rotate` in the default executor of the event
+        loop, there is no asyncio HTTP client in Keydra. Only worth
+        overriding for providers bringing their own.
+        '''
+        return await asyncio.get_running_loop().run_in_executor(
+            None,
+            functools.partial(contextvars.copy_context().run, self.rotate, key)
+        )
+
+    async def distribute_async(self, secret, key):
+        '''
+        Asynchronous counterpart of `distribute`, used by the asyncio runner.
+
+        Runs the (blocking) `distribute` in the default executor of the
+        event loop, there is no asyncio HTTP client in Keydra. Only worth
+        overriding for providers bringing their own.
+        '''
+        return await asyncio.get_running_loop().run_in_executor(
+            None,
+            functools.partial(
+                contextvars.copy_context().run, self.distribute, secret, key
+            )
+        )
+
+    def load_config(self, config, env_scope=None):
+        '''
+        Loads the Keydra config, implemented by config providers.
+
+        :param config: Config of the config provider (repositories, paths...)
+        :type config: :class:`dict`
+        :param env_scope: Optional callable, given the environments loaded,
+            returning the IDs (a :class:`frozenset`) of the only secrets
+            worth loading. Passed when Keydra is configured to only load the
+            secrets of its environment.
+        :type env_scope: :class:`callable`
+        :returns: Environments and secrets
+        :rtype: :class:`tuple` of :class:`dict`
+        '''
         raise NotImplementedError(
             '{} does not implement "load_config"'.format(
                 self.__class__.__name__
@@ -86,7 +110,8 @@ class BaseProvider(ABC):
 
         if missing_keys:
             return False, 'Invalid spec. Missing keys: {} for {}'.format(
-                ', '.join(missing_keys), json.dumps(spec, indent=2)
+                ', '.join(missing_keys),
+                json.dumps(spec, indent=2, default=as_dict)
             )
 
         return True, 'All good!'
@@ -101,17 +126,21 @@ class BaseProvider(ABC):
 
     @classmethod
     def redact_result(cls, result: dict, spec: dict) -> dict:
-        redacted_result = copy.deepcopy(result)
-        safe_keys = [key.lower() for key in cls.safe_to_log_keys(spec)]
-
         # If we got a result
-        if 'value' in redacted_result:
-            for key in list(redacted_result['value'].keys()):
-                # redact all values except for the approved ones
-                if key.lower() not in safe_keys:
-                    redacted_result['value'][key] = '***'
+        if 'value' not in result:
+            return override(result)
+
+        safe_keys = [key.lower() for key in cls.safe_to_log_keys(spec)]
 
-        return redacted_result
+        # redact all values except for the approved ones, copy on write so
+        # the result itself is left untouched
+        return override(
+            result,
+            value={
+                key: value if key.lower() in safe_keys else '***'
+                for key, value in result['value'].items()
+            }
+        )
 
     @classmethod
     def has_creds(cls):
@@ -1,7 +1,7 @@
 from keydra.clients.cloudflare import CloudflareClient
 
 from keydra.providers.base import BaseProvider
-from keydra.providers.base import exponential_backoff_retry
+from keydra.retry import retrying
 
 from keydra.exceptions import DistributionException
 from keydra.exceptions import RotationException
@@ -82,7 +82,7 @@ class Client(BaseProvider):
 
         return resp
 
-    @exponential_backoff_retry(3)
+    @retrying()
     def rotate(self, secret):
         return self._rotate(secret.get('key'))
 
@@ -1,7 +1,7 @@
 from keydra.clients.contentful import ContentfulClient
 
 from keydra.providers.base import BaseProvider
-from keydra.providers.base import exponential_backoff_retry
+from keydra.retry import retrying
 
 from keydra.exceptions import DistributionException
 from keydra.exceptions import RotationException
@@ -70,7 +70,7 @@ class Client(BaseProvider):
             f'{PW_FIELD}': new_token.token,
         }
 
-    @exponential_backoff_retry(3)
+    @retrying()
     def rotate(self, secret):
         return self._rotate_secret(secret)
 
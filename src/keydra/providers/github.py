@@ -1,20 +1,20 @@
-import copy
-import json
-import yaml
-
 from keydra.clients.github import GithubClient
 
+from keydra import config_parser
+from keydra.config_cache import CONFIG_CACHE
+
 from keydra.providers.base import BaseProvider
 from keydra.providers.base import ConfigProvider
 
-from keydra.providers.base import exponential_backoff_retry
+from keydra.retry import retrying
 
-from keydra.exceptions import ConfigException
 from keydra.exceptions import DistributionException
 from keydra.exceptions import RotationException
 
 from keydra.logging import get_logger
 
+from keydra.model import override
+
 
 LOGGER = get_logger()
 
@@ -77,7 +77,7 @@ class Client(BaseProvider):
         except Exception as e:
             raise DistributionException(e)
 
-    @exponential_backoff_retry(3)
+    @retrying()
     def distribute(self, secret, destination):
         return self._distribute(secret, destination)
 
@@ -110,24 +110,30 @@ class Client(BaseProvider):
     def pre_process_spec(self, spec, context: dict):
         specs = []
 
-        target = copy.deepcopy(spec)
+        # Copy on write, targets share what they don't override with the spec
+        target = spec
 
         current_env_name, current_env = list(
             context.get('environment', {}).items()
         )[0]
 
         if 'ENV' in target['key']:
-            target['key'] = target['key'].format(
-                **{'ENV': current_env_name.upper()}
+            target = override(
+                target,
+                key=target['key'].format(**{'ENV': current_env_name.upper()})
             )
 
         if 'ENV' in target.get('config', {}).get(
             'environment', ''
         ):
-            target['config']['environment'] = target[
-                'config'
-            ]['environment'].format(
-                **{'ENV': current_env_name.upper()}
+            target = override(
+                target,
+                config=override(
+                    target['config'],
+                    environment=target['config']['environment'].format(
+                        **{'ENV': current_env_name.upper()}
+                    )
+                )
             )
 
         if spec['config']['scope'] in ['deployment', 'repository'] and any(
@@ -137,16 +143,18 @@ class Client(BaseProvider):
             ]
         ):
             for repo in spec['config']['repository']:
-                new_target = copy.deepcopy(target)
-                new_target['config']['repository'] = repo
-
-                specs.append(new_target)
+                specs.append(
+                    override(
+                        target,
+                        config=override(target['config'], repository=repo)
+                    )
+                )
         else:
             specs.append(target)
 
         return specs
 
-    def _load_remote_file(self, repo, path, username, filetype):
+    def _load_remote_file(self, repo, path, username, filetype, only=None):
         LOGGER.info(
             'Loading remote file from Github repo {} at path {}'.format(repo, path)
         )
@@ -159,18 +167,11 @@ class Client(BaseProvider):
 
         LOGGER.debug('Remote file content: \n{}'.format(resp))
 
-        if filetype.lower() in ['json']:
-            return json.loads(resp)
-
-        elif filetype.lower() in ['yaml', 'yml']:
-            return yaml.safe_load(resp)
-
-        else:
-            raise ConfigException(
-                'Unsupported filetype provided: {}'.format(filetype)
-            )
+        return CONFIG_CACHE.parse(
+            resp, filetype, config_parser.parser(filetype, only), variant=only
+        )
 
-    def load_config(self, config):
+    def load_config(self, config, env_scope=None):
         Cp = ConfigProvider(config)
 
         LOGGER.info('Attempting to load config from Github')
@@ -186,7 +187,8 @@ class Client(BaseProvider):
             repo=Cp.secrets_repo,
             path=Cp.secrets_path,
             filetype=Cp.secrets_filetype,
-            username=Cp.username
+            username=Cp.username,
+            only=env_scope(envs) if env_scope else None
         )
 
         return envs, specs
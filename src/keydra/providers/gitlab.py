@@ -1,15 +1,13 @@
-import copy
-import json
-
-import yaml
 from schema import And, Optional, Or, Regex, Schema, SchemaError, Use
 
+from keydra import config_parser
 from keydra.clients.gitlab import GitlabClient
-from keydra.exceptions import (ConfigException, DistributionException,
-                               RotationException)
+from keydra.config_cache import CONFIG_CACHE
+from keydra.exceptions import DistributionException, RotationException
 from keydra.logging import get_logger
-from keydra.providers.base import (BaseProvider, ConfigProvider,
-                                   exponential_backoff_retry)
+from keydra.model import override
+from keydra.providers.base import BaseProvider, ConfigProvider
+from keydra.retry import retrying
 
 LOGGER = get_logger()
 SPEC_SCHEMA = Schema({'provider': 'gitlab',
@@ -73,7 +71,7 @@ class Client(BaseProvider):
         except Exception as e:
             raise DistributionException(e)
 
-    def _load_as_dict_from_repo(self, file_path, repo_name, repo_branch, filetype):
+    def _load_as_dict_from_repo(self, file_path, repo_name, repo_branch, filetype, only=None):
         LOGGER.info(
             'Loading remote file from GitLab repo {} at path {}'.format(repo_name, file_path)
         )
@@ -86,16 +84,11 @@ class Client(BaseProvider):
 
         LOGGER.debug('Remote file content: \n{}'.format(file_content))
 
-        if filetype.lower() in ['json']:
-            return json.loads(file_content)
-        elif filetype.lower() in ['yaml', 'yml']:
-            return yaml.safe_load(file_content)
-        else:
-            raise ConfigException(
-                'Unsupported filetype provided: {}'.format(filetype)
-            )
+        return CONFIG_CACHE.parse(
+            file_content, filetype, config_parser.parser(filetype, only), variant=only
+        )
 
-    def load_config(self, config):
+    def load_config(self, config, env_scope=None):
         cp = ConfigProvider(config)
 
         envs = self._load_as_dict_from_repo(
@@ -109,7 +102,8 @@ class Client(BaseProvider):
             file_path=cp.secrets_path,
             repo_name=cp.secrets_repo,
             repo_branch=cp.secrets_repo_branch,
-            filetype=cp.secrets_filetype
+            filetype=cp.secrets_filetype,
+            only=env_scope(envs) if env_scope else None
         )
 
         return envs, secrets
@@ -117,7 +111,7 @@ class Client(BaseProvider):
     def rotate(self, secret):
         raise RotationException("Not implemented for GitLab")
 
-    @ exponential_backoff_retry(3)
+    @retrying()
     def distribute(self, secret, destination):
         return self._distribute(secret, destination)
 
@@ -138,24 +132,30 @@ class Client(BaseProvider):
     def pre_process_spec(self, spec, context: dict):
         specs = []
 
-        target = copy.deepcopy(spec)
+        # Copy on write, targets share what they don't override with the spec
+        target = spec
 
         current_env_name, current_env = list(
             context.get('environment', {}).items()
         )[0]
 
         if 'ENV' in target['key']:
-            target['key'] = target['key'].format(
-                **{'ENV': current_env_name.upper()}
+            target = override(
+                target,
+                key=target['key'].format(**{'ENV': current_env_name.upper()})
             )
 
         if 'ENV' in target.get('config', {}).get(
             'environment', ''
         ):
-            target['config']['environment'] = target[
-                'config'
-            ]['environment'].format(
-                **{'ENV': current_env_name.upper()}
+            target = override(
+                target,
+                config=override(
+                    target['config'],
+                    environment=target['config']['environment'].format(
+                        **{'ENV': current_env_name.upper()}
+                    )
+                )
             )
 
         if spec['config']['scope'] in ['deployment', 'repository'] and any(
@@ -165,10 +165,12 @@ class Client(BaseProvider):
             ]
         ):
             for repo in spec['config']['repository']:
-                new_target = copy.deepcopy(target)
-                new_target['config']['repository'] = repo
-
-                specs.append(new_target)
+                specs.append(
+                    override(
+                        target,
+                        config=override(target['config'], repository=repo)
+                    )
+                )
         else:
             specs.append(target)
 
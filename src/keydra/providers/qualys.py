@@ -1,13 +1,12 @@
-import boto3
-import boto3.session
 import json
 
+from keydra.clients.aws import session as aws_session
 from keydra.clients.qualys import QualysClient
 
 from keydra import loader
 
 from keydra.providers.base import BaseProvider
-from keydra.providers.base import exponential_backoff_retry
+from keydra.retry import retrying
 
 from keydra.exceptions import DistributionException
 from keydra.exceptions import RotationException
@@ -24,7 +23,7 @@ class Client(BaseProvider):
     def __init__(self, session=None, credentials=None, region_name=None):
 
         if session is None:
-            session = boto3.session.Session()
+            session = aws_session.SESSION
 
         self._session = session
         self._region = region_name
@@ -93,7 +92,7 @@ class Client(BaseProvider):
 
         return resp
 
-    @exponential_backoff_retry(3)
+    @retrying()
     def rotate(self, secret):
         return self._rotate_secret(secret)
 
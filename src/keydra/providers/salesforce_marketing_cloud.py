@@ -1,13 +1,12 @@
 from typing import NamedTuple
-import boto3
-import boto3.session
 
+from keydra.clients.aws import session as aws_session
 from keydra.clients.salesforce_marketing_cloud import SalesforceMarketingCloudClient
 
 from keydra.clients.aws.secretsmanager import SecretsManagerClient
 
 from keydra.providers.base import BaseProvider
-from keydra.providers.base import exponential_backoff_retry
+from keydra.retry import retrying
 
 from keydra.exceptions import ConfigException, DistributionException
 from keydra.exceptions import RotationException
@@ -35,7 +34,7 @@ class Client(BaseProvider):
         self._orig_secret = credentials
 
         if session is None:
-            session = boto3.session.Session()
+            session = aws_session.SESSION
 
         self._smclient = SecretsManagerClient(
             session=session,
@@ -110,7 +109,7 @@ class Client(BaseProvider):
             f"{opts.password_field}": new_passwd
         }
 
-    @exponential_backoff_retry(3)
+    @retrying()
     def rotate(self, secret):
         return self._rotate_secret(secret)
 
@@ -1,13 +1,12 @@
-import boto3
-import boto3.session
 import validators
 
+from keydra.clients.aws import session as aws_session
 from keydra.clients.splunk import SplunkClient
 
 from keydra.clients.aws.secretsmanager import SecretsManagerClient
 
 from keydra.providers.base import BaseProvider
-from keydra.providers.base import exponential_backoff_retry
+from keydra.retry import retrying
 
 from keydra.exceptions import DistributionException
 from keydra.exceptions import RotationException
@@ -25,7 +24,7 @@ class Client(BaseProvider):
                  region_name=None, verify=False):
 
         if session is None:
-            session = boto3.session.Session()
+            session = aws_session.SESSION
 
         self._smclient = SecretsManagerClient(
             session=session,
@@ -104,7 +103,7 @@ class Client(BaseProvider):
             f"{PW_FIELD}": new_passwd
         }
 
-    @exponential_backoff_retry(3)
+    @retrying()
     def rotate(self, secret):
         return self._rotate_secret(secret)
 
@@ -234,7 +233,7 @@ class Client(BaseProvider):
 
         return destination
 
-    @exponential_backoff_retry(3)
+    @retrying()
     def distribute(self, secret, destination):
         return self._distribute(secret, destination)
 
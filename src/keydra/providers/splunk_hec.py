@@ -1,16 +1,15 @@
-import boto3
-import boto3.session
 import json
 import validators
 
 import keydra.providers.splunk
 
+from keydra.clients.aws import session as aws_session
 from keydra import loader
 
 from keydra.clients.splunk import SplunkClient
 
 from keydra.providers.base import BaseProvider
-from keydra.providers.base import exponential_backoff_retry
+from keydra.retry import retrying
 
 from keydra.exceptions import DistributionException
 from keydra.exceptions import RotationException
@@ -30,7 +29,7 @@ class Client(BaseProvider):
                  region_name=None, verify=False):
 
         if session is None:
-            session = boto3.session.Session()
+            session = aws_session.SESSION
 
         self._session = session
         self._region = region_name
@@ -114,7 +113,7 @@ class Client(BaseProvider):
             f'{PW_FIELD}': newtoken
         }
 
-    @exponential_backoff_retry(3)
+    @retrying()
     def rotate(self, secret):
         return self._rotate_secret(secret)
 
@@ -0,0 +1,153 @@
+import threading
+
+from importlib import import_module
+from importlib import metadata
+
+from keydra import logging as km_logging
+
+
+LOGGER = km_logging.get_logger()
+
+
+def _entry_points(group):
+    entry_points = metadata.entry_points()
+
+    # Python 3.10+ returns a selectable collection, 3.9 a dict by group
+    if hasattr(entry_points, 'select'):
+        return entry_points.select(group=group)
+
+    return entry_points.get(group, [])
+
+
+class Registry(object):
+    def __init__(self, kind, package, select, aliases=None,
+                 entry_point_group=None):
+        '''
+        Resolves names (e.g. 'iam', 'bitbucket') to the class implementing
+        them, once. Later lookups of the same name are a dict access.
+
+        Names are looked up, in order, in the classes registered explicitly,
+        in `<package>.<name>` (or the module aliased to the name) and in the
+        `entry_point_group` package entry points, so third party packages
+        can ship their own implementations.
+
+        :param kind: What is being resolved, used in errors (e.g. 'Client')
+        :type kind: :class:`str`
+        :param package: Package holding the built-in modules
+        :type package: :class:`str`
+        :param select: Callable returning the candidate classes of a module,
+            exactly one is expected
+        :type select: :class:`callable`
+        :param aliases: Names mapped to the module they live in
+        :type aliases: :class:`dict`
+        :param entry_point_group: Optional group of the entry points to
+            discover third party implementations from
+        :type entry_point_group: :class:`str`
+        '''
+        self._kind = kind
+        self._package = package
+        self._select = select
+        self._aliases = aliases or {}
+        self._entry_point_group = entry_point_group
+        self._entry_points = None
+        self._classes = {}
+        self._lock = threading.RLock()
+
+    def register(self, name, cls):
+        '''
+        Registers a class under a name, taking precedence over discovery.
+
+        :param name: Name to register the class under (case insensitive)
+        :type name: :class:`str`
+        :param cls: Implementation
+        :type cls: :class:`class`
+        '''
+        with self._lock:
+            self._classes[name.lower()] = cls
+
+    def clear(self):
+        '''
+        Forgets everything resolved (and registered) so far.
+        '''
+        with self._lock:
+            self._classes.clear()
+            self._entry_points = None
+
+    def get(self, name):
+        '''
+        :param name: Name to resolve (case insensitive)
+        :type name: :class:`str`
+        :returns: The class implementing the name
+        :rtype: :class:`class`
+        :raises ModuleNotFoundError: If nothing implements the name
+        :raises AttributeError: If the module found doesn't hold exactly one
+            candidate class
+        '''
+        name = name.lower()
+
+        try:
+            return self._classes[name]
+        except KeyError:
+            pass
+
+        with self._lock:
+            if name not in self._classes:
+                self._classes[name] = self._resolve(name)
+
+            return self._classes[name]
+
+    def _resolve(self, name):
+        module_name = '{}.{}'.format(
+            self._package, self._aliases.get(name, name)
+        )
+
+        try:
+            module = import_module(module_name)
+
+        except ModuleNotFoundError as e:
+            # Only fall back to entry points when the module itself is
+            # missing, not when one of its own imports is
+            if e.name != module_name:
+                raise
+
+            entry_point = self._discovered().get(name)
+
+            if entry_point is None:
+                raise
+
+            LOGGER.debug(
+                'Loading {} "{}" from entry point {}'.format(
+                    self._kind, name, entry_point.value
+                )
+            )
+            return entry_point.load()
+
+        candidates = self._select(module)
+
+        if len(candidates) == 0:
+            raise AttributeError(
+                'Didn\'t find any {} classes in {}'.format(
+                    self._kind, module_name
+                )
+            )
+
+        if len(candidates) > 1:
+            raise AttributeError(
+                'Found multiple {} classes in {}'.format(
+                    self._kind, module_name
+                )
+            )
+
+        return candidates[0]
+
+    def _discovered(self):
+        if self._entry_point_group is None:
+            return {}
+
+        if self._entry_points is None:
+            self._entry_points = {
+                entry_point.name.lower(): entry_point
+                for entry_point in _entry_points(self._entry_point_group)
+            }
+
+        return self._entry_points
@@ -0,0 +1,498 @@
+import contextvars
+import datetime
+import functools
+import random
+import threading
+import time
+
+from contextlib import contextmanager
+from email.utils import parsedate_to_datetime
+
+from botocore import exceptions as boto_exceptions
+
+from keydra import deadline
+from keydra import logging as km_logging
+from keydra.exceptions import ConfigException, DeadlineExceeded
+from keydra.imports import lazy_import
+
+
+requests_exceptions = lazy_import('requests.exceptions')
+
+LOGGER = km_logging.get_logger()
+
+# Retries of a call, and seconds the first retry waits at most
+DEFAULT_RETRIES = 3
+DEFAULT_BASE = 1
+
+# Longest wait between two attempts (seconds)
+DEFAULT_CAP = 20
+
+# Longest wait asked for by a Retry-After header Keydra goes along with
+# (seconds), calls asking for longer are given up on
+MAX_RETRY_AFTER = 60
+
+# Retries shared by every call of a run, so an API having a bad day doesn't
+# have every secret back off for the whole run
+DEFAULT_BUDGET = 30
+
+RETRYABLE_STATUSES = frozenset([408, 425, 429, 500, 502, 503, 504])
+
+# Statuses APIs slow callers down with
+THROTTLING_STATUSES = frozenset([429, 503])
+
+# Error codes AWS throttles with, often along with a 400
+THROTTLING_CODES = frozenset([
+    'Throttling',
+    'ThrottlingException',
+    'ThrottledException',
+    'RequestThrottled',
+    'RequestThrottledException',
+    'TooManyRequestsException',
+    'RequestLimitExceeded',
+    'SlowDown',
+    'PriorRequestNotComplete',
+    'RequestTimeout',
+    'RequestTimeoutException',
+    'ProvisionedThroughputExceededException',
+])
+
+# Retries of the run being processed, in the current context
+_BUDGET = contextvars.ContextVar('keydra_retry_budget', default=None)
+
+# Retries already made of the unit of work being (re)run by a scheduler, and
+# the function whose retries the scheduler takes over
+_ATTEMPT = contextvars.ContextVar('keydra_retry_attempt', default=0)
+_REQUEUED = contextvars.ContextVar('keydra_retry_requeued', default=None)
+
+# Set on errors already retried as much as allowed, so the retries of
+# callers don't retry them all over again
+_GAVE_UP = '_keydra_gave_up'
+
+
+class RetryLater(Exception):
+    def __init__(self, delay, attempt, error=None):
+        '''
+        Raised instead of waiting to retry a call, for the scheduler running
+        it to run it again once `delay` seconds have passed (doing other work
+        in the meantime).
+
+        :param delay: Seconds to wait before running the call again
+        :type delay: :class:`float`
+        :param attempt: Retries made of the call, counting the one asked for
+        :type attempt: :class:`int`
+        :param error: Error the call is retried for
+        :type error: :class:`Exception`
+        '''
+        super().__init__(
+            'Retry in {:.1f}s (retry {}): {}'.format(delay, attempt, error)
+        )
+        self.delay = delay
+        self.attempt = attempt
+        self.error = error
+
+
+class RetryBudget(object):
+    def __init__(self, retries=DEFAULT_BUDGET):
+        '''
+        Retries left for a run.
+
+        :param retries: Retries allowed, across all calls
+        :type retries: :class:`int`
+        '''
+        self.retries = retries
+        self.spent = 0
+        self._lock = threading.Lock()
+
+    def take(self) -> bool:
+        '''
+        :returns: True if a retry is left (and now spent), False otherwise
+        :rtype: :class:`bool`
+        '''
+        with self._lock:
+            if self.spent >= self.retries:
+                return False
+
+            self.spent += 1
+
+            return True
+
+
+@contextmanager
+def budget(retries=DEFAULT_BUDGET):
+    '''
+    Shares a budget of retries between the calls made in the block (and in
+    the threads and tasks it starts with a copy of its context). Calls
+    retried outside of a budget are only bound by their own retries.
+
+    :param retries: Retries allowed, across all calls
+    :type retries: :class:`int`
+    :returns: The budget
+    :rtype: :class:`RetryBudget`
+    '''
+    run_budget = RetryBudget(retries)
+    token = _BUDGET.set(run_budget)
+
+    try:
+        yield run_budget
+    finally:
+        _BUDGET.reset(token)
+
+
+@contextmanager
+def attempt(retries):
+    '''
+    Runs the block as a retry of a unit of work put back by a scheduler.
+
+    :param retries: Retries already made of the unit of work
+    :type retries: :class:`int`
+    '''
+    token = _ATTEMPT.set(retries)
+
+    try:
+        yield
+    finally:
+        _ATTEMPT.reset(token)
+
+
+@contextmanager
+def requeueing(fn):
+    '''
+    Lets the scheduler running the block take over the retries of `fn`
+    (a function decorated with `retrying`, called in the block): rather than
+    waiting to retry it, `RetryLater` is raised.
+
+    Only the retries of `fn` itself are taken over, retried functions it
+    calls wait as usual.
+
+    :param fn: Function, or method, called in the block
+    :type fn: :class:`callable`
+    '''
+    token = _REQUEUED.set(getattr(fn, '__func__', fn))
+
+    try:
+        yield
+    finally:
+        _REQUEUED.reset(token)
+
+
+def _retry_after(headers):
+    value = None
+
+    for name, header in (headers or {}).items():
+        if str(name).lower() == 'retry-after':
+            value = str(header).strip()
+
+    if not value:
+        return None
+
+    try:
+        return max(float(value), 0)
+    except ValueError:
+        pass
+
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+
+    return max(
+        (when - datetime.datetime.now(datetime.timezone.utc)).total_seconds(),
+        0
+    )
+
+
+def _response_of(exc):
+    '''
+    :returns: Status code, error code and headers of the response an error
+        is about, as far as known
+    :rtype: :class:`tuple`
+    '''
+    response = getattr(exc, 'response', None)
+
+    # botocore.exceptions.ClientError
+    if isinstance(response, dict):
+        metadata = response.get('ResponseMetadata', {})
+
+        return (
+            metadata.get('HTTPStatusCode'),
+            response.get('Error', {}).get('Code'),
+            metadata.get('HTTPHeaders')
+        )
+
+    # requests.HTTPError
+    if getattr(response, 'status_code', None) is not None:
+        return response.status_code, None, response.headers
+
+    # splunklib.binding.HTTPError, gitlab.GitlabError
+    status = getattr(exc, 'status', None) or getattr(exc, 'response_code', None)
+
+    if isinstance(status, int):
+        headers = getattr(exc, 'headers', None)
+
+        if isinstance(headers, list):
+            headers = dict(headers)
+
+        return status, None, headers if isinstance(headers, dict) else None
+
+    return None, None, None
+
+
+def _transport_error(exc):
+    return isinstance(
+        exc,
+        (
+            ConnectionError,
+            TimeoutError,
+            boto_exceptions.ConnectionError,
+            boto_exceptions.HTTPClientError,
+            requests_exceptions.ConnectionError,
+            requests_exceptions.Timeout,
+            requests_exceptions.ChunkedEncodingError,
+        )
+    )
+
+
+def _causes(exc):
+    seen = set()
+
+    while exc is not None and id(exc) not in seen:
+        seen.add(id(exc))
+        yield exc
+        exc = exc.__cause__ or exc.__context__
+
+
+def classify(exc) -> tuple:
+    '''
+    Tells errors worth retrying (throttling, server errors, connections
+    dropped) from errors that would fail again (validation errors, missing
+    permissions, bad config). The errors an error was raised from are looked
+    at too, as providers wrap the errors of their clients.
+
+    Errors of unknown kinds (e.g. the errors providers raise themselves)
+    are not worth retrying, only the ones known to be transient are.
+
+    :param exc: Error raised by a call
+    :type exc: :class:`Exception`
+    :returns: Whether the call is worth retrying, and the seconds the API
+        asked to wait before retrying it (None if it didn't)
+    :rtype: :class:`tuple`
+    '''
+    for cause in _causes(exc):
+        if getattr(cause, _GAVE_UP, False):
+            return False, None
+
+        if isinstance(cause, (DeadlineExceeded, ConfigException)):
+            return False, None
+
+        if _transport_error(cause):
+            return True, None
+
+        status, code, headers = _response_of(cause)
+
+        if code in THROTTLING_CODES:
+            return True, _retry_after(headers)
+
+        if status is None:
+            continue
+
+        if status in RETRYABLE_STATUSES:
+            return True, _retry_after(headers)
+
+        if 400 <= status < 500 or status in (501, 505):
+            return False, None
+
+        if status >= 500:
+            return True, _retry_after(headers)
+
+    return False, None
+
+
+def throttled(exc) -> bool:
+    '''
+    :param exc: Error raised by a call
+    :type exc: :class:`Exception`
+    :returns: True if the error (or one it was raised from) says the API is
+        throttling calls
+    :rtype: :class:`bool`
+    '''
+    for cause in _causes(exc):
+        status, code, _ = _response_of(cause)
+
+        if code in THROTTLING_CODES or status in THROTTLING_STATUSES:
+            return True
+
+    return False
+
+
+class RetryPolicy(object):
+    def __init__(self, retries=DEFAULT_RETRIES, base=DEFAULT_BASE,
+                 cap=DEFAULT_CAP, retry_on=None, floor=0):
+        '''
+        How calls are retried: errors worth retrying are retried up to
+        `retries` times, waiting a random time (full jitter) between 0 (or
+        `floor`) and a bound doubling from `base * 2`, capped at `cap`
+        seconds, or as long as the API asked to with Retry-After.
+
+        Calls are not retried once the run is out of retries (see `budget`)
+        or would run past its deadline waiting.
+
+        :param retries: Retries of a call, on top of the first attempt
+        :type retries: :class:`int`
+        :param base: Seconds the bound of the waits doubles from
+        :type base: :class:`float`
+        :param cap: Longest wait between two attempts, in seconds
+        :type cap: :class:`float`
+        :param retry_on: Optional error types to retry, only, regardless of
+            how they classify
+        :type retry_on: :class:`type` or :class:`tuple`
+        :param floor: Seconds every retry waits at least, 0 for full jitter
+        :type floor: :class:`float`
+        '''
+        self.retries = max(int(retries), 0)
+        self.base = max(float(base), 0)
+        self.cap = max(float(cap), self.base)
+        self.retry_on = retry_on
+        self.floor = min(max(float(floor), 0), self.cap)
+
+    def backoff(self, retry) -> float:
+        '''
+        :param retry: Retry about to be made, from 0
+        :type retry: :class:`int`
+        :returns: Seconds to wait before it
+        :rtype: :class:`float`
+        '''
+        bound = min(self.cap, self.base * 2 ** (retry + 1))
+
+        return random.uniform(self.floor, max(bound, self.floor))
+
+    def _decide(self, exc):
+        if self.retry_on is None:
+            return classify(exc)
+
+        if isinstance(exc, DeadlineExceeded) or getattr(exc, _GAVE_UP, False):
+            return False, None
+
+        return isinstance(exc, self.retry_on), None
+
+    def _wait(self, retry, retry_after):
+        '''
+        :returns: Seconds to wait before the retry, None to give up instead
+        '''
+        if retry >= self.retries:
+            return None
+
+        if retry_after is not None:
+            if retry_after > MAX_RETRY_AFTER:
+                return None
+
+            wait = retry_after
+        else:
+            wait = self.backoff(retry)
+
+        run_deadline = deadline.current()
+
+        if run_deadline is not None and wait >= run_deadline.time_left():
+            return None
+
+        run_budget = _BUDGET.get()
+
+        if run_budget is not None and not run_budget.take():
+            LOGGER.warning(
+                'Out of retries for this run ({} spent)'.format(
+                    run_budget.spent
+                )
+            )
+            return None
+
+        return wait
+
+    def call(self, f, *args, requeue=False, **kwargs):
+        '''
+        Calls `f`, retrying it as the policy says.
+
+        :param requeue: Raise `RetryLater` rather than waiting to retry, for
+            the scheduler to run `f` again (as retry `attempt`)
+        :type requeue: :class:`bool`
+        :returns: What `f` returns
+        :raises Exception: The last error of `f`, when giving up on it
+        :raises RetryLater: `f` is to be retried, when requeueing
+        '''
+        retry = _ATTEMPT.get() if requeue else 0
+
+        while True:
+            try:
+                return f(*args, **kwargs)
+
+            except RetryLater:
+                # Retries of a requeued call made within `f`
+                raise
+
+            except Exception as e:
+                retryable, retry_after = self._decide(e)
+
+                if not retryable:
+                    raise
+
+                wait = self._wait(retry, retry_after)
+
+                if wait is None:
+                    setattr(e, _GAVE_UP, True)
+                    raise
+
+                LOGGER.warning(
+                    '{} {} in {:.1f}s ({}/{}): {}'.format(
+                        'Requeueing' if requeue else 'Retrying',
+                        getattr(f, '__qualname__', f), wait, retry + 1,
+                        self.retries, e
+                    )
+                )
+
+                if requeue:
+                    raise RetryLater(wait, retry + 1, error=e) from e
+
+                time.sleep(wait)
+                retry += 1
+
+
+def retrying(retries=DEFAULT_RETRIES, base=DEFAULT_BASE, cap=DEFAULT_CAP,
+             retry_on=None, floor=0):
+    '''
+    Decorates a function (or method) to retry it with a `RetryPolicy`.
+
+    Retried functions calling other retried functions don't multiply their
+    retries: errors the inner function was retried for as much as allowed
+    are not retried by the outer one.
+
+    :param retries: Retries of a call, on top of the first attempt
+    :type retries: :class:`int`
+    :param base: Seconds the bound of the waits doubles from
+    :type base: :class:`float`
+    :param cap: Longest wait between two attempts, in seconds
+    :type cap: :class:`float`
+    :param retry_on: Optional error types to retry, only
+    :type retry_on: :class:`type` or :class:`tuple`
+    :param floor: Seconds every retry waits at least, 0 for full jitter
+    :type floor: :class:`float`
+    '''
+    policy = RetryPolicy(
+        retries=retries, base=base, cap=cap, retry_on=retry_on, floor=floor
+    )
+
+    def decorator(f):
+        @functools.wraps(f)
+        def retried(*args, **kwargs):
+            requeue = _REQUEUED.get() is retried
+
+            if requeue:
+                # Calls made by `f` wait to be retried, as usual
+                token = _REQUEUED.set(None)
+
+                try:
+                    return policy.call(f, *args, requeue=True, **kwargs)
+                finally:
+                    _REQUEUED.reset(token)
+
+            return policy.call(f, *args, **kwargs)
+
+        return retried
+    return decorator
@@ -0,0 +1,227 @@
+import contextvars
+import functools
+import re
+import threading
+import time
+
+from contextlib import contextmanager
+from urllib.parse import urlsplit
+
+
+# Calls of the run being processed, in the current context
+_CALLS = contextvars.ContextVar('keydra_calls', default=None)
+
+# Path segments replaced with '*' in the operation of HTTP calls, so calls
+# to the same endpoint for different objects add up (e.g. one call per user)
+_ID_SEGMENT = re.compile(
+    r'^(\d+|\{?[0-9a-fA-F]{8}(-[0-9a-fA-F]{4}){3}-[0-9a-fA-F]{12}\}?|[0-9a-fA-F]{16,})$'
+)
+
+_START = 'keydra_telemetry_start'
+
+
+class CallLog(object):
+    def __init__(self):
+        '''
+        Outbound API calls (HTTP and AWS) made during a run, aggregated by
+        host and operation.
+        '''
+        self._calls = {}
+        self._lock = threading.Lock()
+
+    def record(self, host, operation, status, seconds, bytes_sent=0,
+               bytes_received=0):
+        '''
+        :param host: Host called, e.g. api.github.com
+        :type host: :class:`str`
+        :param operation: What was called, e.g. "GET /repos/*/keys" or
+            "iam.ListAccessKeys"
+        :type operation: :class:`str`
+        :param status: HTTP status code, or "error" if the call got no
+            response
+        :param seconds: Duration of the call
+        :type seconds: :class:`float`
+        '''
+        with self._lock:
+            stats = self._calls.get((host, operation))
+
+            if stats is None:
+                stats = self._calls[(host, operation)] = {
+                    'calls': 0,
+                    'statuses': {},
+                    'bytes_sent': 0,
+                    'bytes_received': 0,
+                    'seconds': 0.0,
+                    'max_seconds': 0.0
+                }
+
+            stats['calls'] += 1
+            stats['statuses'][str(status)] = stats['statuses'].get(str(status), 0) + 1
+            stats['bytes_sent'] += bytes_sent or 0
+            stats['bytes_received'] += bytes_received or 0
+            stats['seconds'] += seconds
+            stats['max_seconds'] = max(stats['max_seconds'], seconds)
+
+    def report(self, top=20) -> dict:
+        '''
+        :param top: Number of operations to list, the most called first
+        :type top: :class:`int`
+        :returns: Total calls and time, calls by host and the most called
+            operations
+        :rtype: :class:`dict`
+        '''
+        with self._lock:
+            calls = [
+                dict(stats, host=host, operation=operation)
+                for (host, operation), stats in self._calls.items()
+            ]
+
+        by_host = {}
+
+        for stats in calls:
+            by_host[stats['host']] = by_host.get(stats['host'], 0) + stats['calls']
+            stats['seconds'] = round(stats['seconds'], 6)
+            stats['max_seconds'] = round(stats['max_seconds'], 6)
+
+        calls.sort(key=lambda stats: (-stats['calls'], -stats['seconds']))
+
+        return {
+            'calls': sum(stats['calls'] for stats in calls),
+            'seconds': round(sum(stats['seconds'] for stats in calls), 6),
+            'by_host': by_host,
+            'top_operations': calls[:top]
+        }
+
+
+@contextmanager
+def record_calls():
+    '''
+    Records the outbound API calls made in the block (and in the threads
+    and tasks it starts with a copy of its context).
+
+    :returns: The calls
+    :rtype: :class:`CallLog`
+    '''
+    calls = CallLog()
+    token = _CALLS.set(calls)
+
+    try:
+        yield calls
+    finally:
+        _CALLS.reset(token)
+
+
+def _operation(method, url):
+    path = '/'.join(
+        '*' if _ID_SEGMENT.match(segment) else segment
+        for segment in urlsplit(url).path.split('/')
+    )
+
+    return '{} {}'.format(method, path or '/')
+
+
+def traced(send):
+    '''
+    Traces the HTTP calls sent by a `requests` transport adapter (the
+    sessions of `keydra.clients.http`). Calls are only recorded within
+    `record_calls`.
+
+    :param send: The `send` method of the adapter
+    :type send: :class:`callable`
+    :returns: `send`, recording the calls it makes
+    :rtype: :class:`callable`
+    '''
+    @functools.wraps(send)
+    def traced_send(request, **kwargs):
+        calls = _CALLS.get()
+
+        if calls is None:
+            return send(request, **kwargs)
+
+        start = time.perf_counter()
+        status = 'error'
+        received = 0
+
+        try:
+            response = send(request, **kwargs)
+            status = response.status_code
+
+            if not kwargs.get('stream'):
+                received = len(response.content or b'')
+
+            return response
+
+        finally:
+            # Streamed bodies (files, generators) are not counted
+            body = request.body if isinstance(request.body, (bytes, str)) else b''
+
+            calls.record(
+                urlsplit(request.url).hostname,
+                _operation(request.method, request.url),
+                status,
+                time.perf_counter() - start,
+                bytes_sent=len(body),
+                bytes_received=received
+            )
+
+    return traced_send
+
+
+def _before_call(model, context, **kwargs):
+    context[_START] = (
+        time.perf_counter(),
+        model.service_model.endpoint_prefix,
+        '{}.{}'.format(model.service_model.service_name, model.name)
+    )
+
+
+def _after_call(http_response, context, **kwargs):
+    _record_aws(context, http_response.status_code, http_response)
+
+
+def _after_call_error(context, **kwargs):
+    _record_aws(context, 'error', None)
+
+
+def _record_aws(context, status, http_response):
+    calls = _CALLS.get()
+    started = context.pop(_START, None)
+
+    if calls is None or started is None:
+        return
+
+    start, host, operation = started
+    received = 0
+
+    if http_response is not None:
+        if http_response.url:
+            host = urlsplit(http_response.url).hostname or host
+
+        received = int(http_response.headers.get('content-length') or 0)
+
+    calls.record(
+        host,
+        operation,
+        status,
+        time.perf_counter() - start,
+        bytes_received=received
+    )
+
+
+def instrument_client(client):
+    '''
+    Traces the calls of a boto3 client (counted once per API call, retries
+    included). Calls are only recorded within `record_calls`.
+
+    :param client: boto3 client
+    :returns: The client
+    '''
+    events = client.meta.events
+
+    events.register('before-call', _before_call, unique_id='keydra-telemetry-before')
+    events.register('after-call', _after_call, unique_id='keydra-telemetry-after')
+    events.register(
+        'after-call-error', _after_call_error, unique_id='keydra-telemetry-error'
+    )
+
+    return client
@@ -0,0 +1,137 @@
+import contextvars
+import math
+import threading
+import time
+
+from contextlib import contextmanager
+
+
+# Spans of the secret (or run) being processed, in the current context
+_SPANS = contextvars.ContextVar('keydra_spans', default=None)
+
+PERCENTILES = (50, 95, 99)
+
+
+class Spans(object):
+    def __init__(self):
+        '''
+        Durations of the phases of processing a secret (or of a run), taken
+        with `span`. Distributions running in other threads add to the same
+        spans, as they copy the context of the secret.
+        '''
+        self._entries = []
+        self._lock = threading.Lock()
+
+    def add(self, phase, seconds, provider=None):
+        entry = {'phase': phase, 'seconds': round(seconds, 6)}
+
+        if provider is not None:
+            entry['provider'] = str(provider).lower()
+
+        with self._lock:
+            self._entries.append(entry)
+
+    def to_list(self) -> list:
+        '''
+        :returns: The spans, in the order they finished
+        :rtype: :class:`list` of :class:`dict`
+        '''
+        with self._lock:
+            return list(self._entries)
+
+
+@contextmanager
+def span(phase, provider=None):
+    '''
+    Times the block (with `time.perf_counter`), as a phase of the secret or
+    run being processed. Does nothing outside of `collect`.
+
+    :param phase: Name of the phase, e.g. "rotate"
+    :type phase: :class:`str`
+    :param provider: Provider the phase is about, if any
+    :type provider: :class:`str`
+    '''
+    spans = _SPANS.get()
+
+    if spans is None:
+        yield
+        return
+
+    start = time.perf_counter()
+
+    try:
+        yield
+    finally:
+        spans.add(phase, time.perf_counter() - start, provider=provider)
+
+
+@contextmanager
+def collect(spans=None):
+    '''
+    Collects the spans taken in the block (and in the threads and tasks it
+    starts with a copy of its context).
+
+    :param spans: Optional spans to add to, e.g. of a secret being run again
+    :type spans: :class:`Spans`
+    :returns: The spans
+    :rtype: :class:`Spans`
+    '''
+    spans = Spans() if spans is None else spans
+    token = _SPANS.set(spans)
+
+    try:
+        yield spans
+    finally:
+        _SPANS.reset(token)
+
+
+def percentile(samples, pct):
+    '''
+    :param samples: Sorted samples
+    :type samples: :class:`list`
+    :param pct: Percentile, between 0 and 100
+    :type pct: :class:`int`
+    :returns: The nearest-rank percentile of the samples
+    :rtype: :class:`float`
+    '''
+    rank = max(int(math.ceil(pct / 100.0 * len(samples))), 1)
+
+    return samples[rank - 1]
+
+
+def latency_report(results) -> dict:
+    '''
+    Aggregates the spans attached to results (under "timings") into latency
+    percentiles of each phase, by provider.
+
+    :param results: Results of a run
+    :type results: :class:`list` of :class:`dict`
+    :returns: Number of samples and percentiles (p50, p95, p99) in seconds,
+        by provider and phase
+    :rtype: :class:`dict`
+    '''
+    samples = {}
+
+    for result in results:
+        for entry in result.get('timings', []) if isinstance(result, dict) else []:
+            samples.setdefault(
+                entry.get('provider', '-'), {}
+            ).setdefault(entry['phase'], []).append(entry['seconds'])
+
+    report = {}
+
+    for provider, phases in samples.items():
+        for phase, durations in phases.items():
+            durations.sort()
+
+            stats = {'count': len(durations)}
+            stats.update(
+                {
+                    'p{}'.format(pct): percentile(durations, pct)
+                    for pct in PERCENTILES
+                }
+            )
+
+            report.setdefault(provider, {})[phase] = stats
+
+    return report
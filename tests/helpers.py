@@ -0,0 +1,14 @@
+import requests
+
+
+def http_error(status, headers=None):
+    '''
+    :returns: The error `raise_for_status` raises for a response with the
+        status (and headers)
+    :rtype: :class:`requests.HTTPError`
+    '''
+    response = requests.Response()
+    response.status_code = status
+    response.headers.update(headers or {})
+
+    return requests.HTTPError('{} Error'.format(status), response=response)
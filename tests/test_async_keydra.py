@@ -0,0 +1,189 @@
+import asyncio
+import threading
+import unittest
+
+from unittest.mock import MagicMock
+from unittest.mock import patch
+
+from keydra.async_keydra import AsyncKeydra
+from keydra.clients.aws.cloudwatch import CloudwatchClient
+from keydra.providers.base import BaseProvider
+
+from tests.helpers import http_error
+
+
+class SyncProvider(BaseProvider):
+    def __init__(self, **kwargs):
+        pass
+
+    def rotate(self, secret):
+        return {
+            'provider': secret['provider'],
+            'key': secret['key'],
+            'secret': 'rotated',
+            'thread': threading.current_thread().name
+        }
+
+    def distribute(self, secret, destination):
+        return destination
+
+
+class NativeAsyncProvider(SyncProvider):
+    in_flight = 0
+    peak = 0
+
+    async def distribute_async(self, secret, destination):
+        NativeAsyncProvider.in_flight += 1
+        NativeAsyncProvider.peak = max(
+            NativeAsyncProvider.peak, NativeAsyncProvider.in_flight
+        )
+
+        await asyncio.sleep(0.01)
+
+        NativeAsyncProvider.in_flight -= 1
+
+        return destination
+
+    def distribute(self, secret, destination):
+        raise AssertionError('The async runner should not block')
+
+
+class ThrottledProvider(SyncProvider):
+    async def distribute_async(self, secret, destination):
+        await asyncio.sleep(0.01)
+
+        raise http_error(429)
+
+
+_PROVIDERS = {'sync': SyncProvider, 'native': NativeAsyncProvider}
+
+
+def _providers(name):
+    return _PROVIDERS[name]
+
+
+def _build_client(provider, key):
+    return _providers(provider)()
+
+
+class TestAsyncKeydra(unittest.TestCase):
+    def setUp(self):
+        CloudwatchClient.instance = MagicMock()
+        self._cfg = MagicMock()
+        NativeAsyncProvider.in_flight = 0
+        NativeAsyncProvider.peak = 0
+
+    @patch('keydra.loader.build_client', side_effect=_build_client)
+    @patch('keydra.loader.load_provider_client', side_effect=_providers)
+    def test_rotate_and_distribute(self, mk_lpc, mk_bc):
+        self._cfg.load_secrets.return_value = [
+            {
+                'provider': 'sync',
+                'key': 'secret_{}'.format(i),
+                'distribute': [
+                    {'provider': 'native', 'key': 'VAR_{}'.format(t)}
+                    for t in range(5)
+                ]
+            }
+            for i in range(4)
+        ]
+
+        kdra = AsyncKeydra(
+            cfg=self._cfg, cw=MagicMock(), concurrency=4,
+            distribution_concurrency=5, provider_concurrency={'native': 10},
+            executor_workers=2
+        )
+
+        result = kdra.rotate_and_distribute(
+            run_for_secrets=None, rotate='nightly'
+        )
+
+        self.assertEqual(
+            [r['key'] for r in result],
+            ['secret_{}'.format(i) for i in range(4)]
+        )
+
+        for entry in result:
+            self.assertEqual(entry['rotate_secret']['status'], 'success')
+            self.assertEqual(entry['rotate_secret']['value']['secret'], '***')
+            self.assertEqual(entry['distribute_secret']['status'], 'success')
+            self.assertEqual(
+                [d['value']['key'] for d in entry['distribute_secret']['value']],
+                ['VAR_{}'.format(t) for t in range(5)]
+            )
+
+        # Capped by the provider limit, not by the number of threads
+        self.assertEqual(NativeAsyncProvider.peak, 10)
+
+    @patch('keydra.loader.build_client', side_effect=_build_client)
+    @patch('keydra.loader.load_provider_client', side_effect=_providers)
+    def test_throttling_cuts_provider_limit(self, mk_lpc, mk_bc):
+        self._cfg.load_secrets.return_value = [
+            {
+                'provider': 'sync',
+                'key': 'secret',
+                'distribute': [
+                    {'provider': 'throttled', 'key': 'VAR_{}'.format(t)}
+                    for t in range(4)
+                ]
+            }
+        ]
+
+        kdra = AsyncKeydra(
+            cfg=self._cfg, cw=MagicMock(), distribution_concurrency=4
+        )
+
+        with patch.dict(_PROVIDERS, {'throttled': ThrottledProvider}):
+            result = kdra.rotate_and_distribute(
+                run_for_secrets=None, rotate='adhoc'
+            )
+
+        self.assertEqual(result[0]['distribute_secret']['status'], 'fail')
+
+        # Not given a limit, but still backed off up to the ceiling
+        self.assertEqual(
+            kdra._provider_limits.snapshot()['throttled'],
+            {'limit': 2, 'maximum': 4, 'in_flight': 0, 'throttles': 4}
+        )
+
+    @patch('keydra.loader.build_client', side_effect=Exception('Boom'))
+    @patch('keydra.loader.load_provider_client', side_effect=_providers)
+    def test_rotate_failure(self, mk_lpc, mk_bc):
+        self._cfg.load_secrets.return_value = [
+            {'provider': 'sync', 'key': 'secret'}
+        ]
+
+        result = AsyncKeydra(cfg=self._cfg, cw=MagicMock()).rotate_and_distribute(
+            run_for_secrets=None, rotate='adhoc'
+        )
+
+        self.assertEqual(result[0]['rotate_secret']['status'], 'fail')
+        self.assertEqual(result[0]['rotate_secret']['msg'], 'Boom')
+        self.assertNotIn('distribute_secret', result[0])
+
+    def test_nothing_shortlisted(self):
+        self._cfg.load_secrets.return_value = []
+
+        result = AsyncKeydra(cfg=self._cfg, cw=MagicMock()).rotate_and_distribute(
+            run_for_secrets=None, rotate='nightly'
+        )
+
+        self.assertEqual(result[0]['status'], 'success')
+
+    @patch('keydra.loader.build_client', side_effect=_build_client)
+    @patch('keydra.loader.load_provider_client', side_effect=_providers)
+    def test_out_of_time(self, mk_lpc, mk_bc):
+        self._cfg.load_secrets.return_value = [
+            {'provider': 'sync', 'key': 'secret'}
+        ]
+        self._cfg.sid_for.return_value = 'secret_sid'
+        deadline = MagicMock()
+        deadline.admits.return_value = False
+        deadline.time_left.return_value = 10
+
+        result = AsyncKeydra(
+            cfg=self._cfg, cw=MagicMock(), deadline=deadline
+        ).rotate_and_distribute(run_for_secrets=None, rotate='adhoc')
+
+        self.assertEqual(result[0]['rotate_secret']['status'], 'not_started')
+        self.assertEqual(result[0]['sid'], 'secret_sid')
@@ -2,6 +2,7 @@ import unittest
 
 from keydra.clients.aws.cloudwatch import CloudwatchClient
 from keydra.clients.aws.cloudwatch import timed
+from keydra.metrics import MetricsBuffer
 
 from unittest.mock import call
 from unittest.mock import MagicMock
@@ -18,7 +19,8 @@ class TestCloudwatchClient(unittest.TestCase):
         self.assertEqual(c1, c2)
 
     def test_timed_decorator(self):
-        with patch.object(CloudwatchClient, 'instance') as mk_ti:
+        with patch.object(CloudwatchClient, 'instance') as mk_ti, \
+                patch('time.perf_counter', side_effect=[10, 10.25, 20, 22]):
             @timed('Dimension', specialise=True)
             def a(*args, **kwargs):
                 return 'a'
@@ -29,11 +31,10 @@ class TestCloudwatchClient(unittest.TestCase):
             self.assertEqual(resp_a, 'a')
             self.assertEqual(resp_b, 'a')
 
-            # TODO: This 0 here is brittle and needs to be replaced.
-            # Let's consider using 'freezegun' when we have a chance
+            # Timed from the start of each call
             mk_ti.put_execution_time.assert_has_calls(
                 [
-                    call('Dimension', 0), call('Dimension_beer', 0)
+                    call('Dimension', 0.25), call('Dimension_beer', 2)
                 ]
             )
 
@@ -55,3 +56,72 @@ class TestCloudwatchClient(unittest.TestCase):
                 a(True, False)
             except Exception as e:
                 self.fail('timed decorator can NEVER fail: ', e)
+
+    def test_execution_times_buffered(self):
+        backend = MagicMock()
+
+        with patch.object(CloudwatchClient, 'instance', None):
+            cw = CloudwatchClient.getInstance(MagicMock())
+            cw.metrics = MetricsBuffer(backend)
+
+            cw.put_execution_time('rotation_iam', 1)
+            cw.put_execution_time('rotation_iam', 1)
+            cw.put_execution_time('rotation_iam', 2)
+
+            backend.publish.assert_not_called()
+
+            cw.flush()
+
+            backend.publish.assert_called_once_with(
+                'Keydra',
+                [
+                    {
+                        'MetricName': 'ExecutionTime',
+                        'Dimensions': [
+                            {'Name': 'Action', 'Value': 'rotation_iam'}
+                        ],
+                        'Unit': 'Seconds',
+                        'Values': [1, 2],
+                        'Counts': [2, 1]
+                    }
+                ]
+            )
+
+    def test_concurrency_limits_buffered(self):
+        backend = MagicMock()
+
+        with patch.object(CloudwatchClient, 'instance', None):
+            cw = CloudwatchClient.getInstance(MagicMock())
+            cw.metrics = MetricsBuffer(backend)
+
+            cw.put_concurrency_limit('host', 'api.github.com', 4)
+            cw.flush()
+
+            backend.publish.assert_called_once_with(
+                'Keydra',
+                [
+                    {
+                        'MetricName': 'ConcurrencyLimit',
+                        'Dimensions': [
+                            {'Name': 'Name', 'Value': 'api.github.com'},
+                            {'Name': 'Scope', 'Value': 'host'}
+                        ],
+                        'Unit': 'Count',
+                        'Values': [4],
+                        'Counts': [1]
+                    }
+                ]
+            )
+
+    def test_emf_backend(self):
+        with patch.object(CloudwatchClient, 'instance', None):
+            cw = CloudwatchClient.getInstance(MagicMock(), backend='emf')
+
+            with patch('sys.stdout') as mk_stdout:
+                cw.put_metric_data(
+                    MetricData=[{'MetricName': 'M', 'Value': 1}],
+                    Namespace='Keydra'
+                )
+
+            mk_stdout.write.assert_called_once()
+            cw._client.put_metric_data.assert_not_called()
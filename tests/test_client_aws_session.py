@@ -0,0 +1,77 @@
+import datetime
+import time
+import unittest
+
+from keydra.clients.aws import session as aws_session
+
+from unittest.mock import MagicMock
+from unittest.mock import patch
+
+
+class TestAwsSession(unittest.TestCase):
+    def setUp(self):
+        aws_session.clear()
+        self.addCleanup(aws_session.clear)
+
+    @patch.object(aws_session, 'SESSION')
+    def test_client_shared_by_service_and_region(self, mk_session):
+        mk_session.region_name = 'ap-southeast-2'
+        mk_session.client.side_effect = lambda **kwargs: MagicMock()
+
+        c1 = aws_session.client('secretsmanager')
+        c2 = aws_session.client('secretsmanager', region_name='ap-southeast-2')
+        c3 = aws_session.client('secretsmanager', region_name='us-east-1')
+        c4 = aws_session.client('iam', session=mk_session)
+
+        self.assertIs(c1, c2)
+        self.assertIsNot(c1, c3)
+        self.assertIsNot(c1, c4)
+        self.assertIs(c4, aws_session.client('iam'))
+        self.assertEqual(mk_session.client.call_count, 3)
+
+    @patch.object(aws_session, 'SESSION')
+    def test_client_of_foreign_session_not_cached(self, mk_session):
+        session = MagicMock()
+
+        c1 = aws_session.client('ssm', session=session, region_name='r')
+        c2 = aws_session.client('ssm', session=session, region_name='r')
+
+        self.assertEqual(session.client.call_count, 2)
+        session.client.assert_called_with(
+            service_name='ssm', region_name='r',
+            config=aws_session.CLIENT_CONFIG
+        )
+        mk_session.client.assert_not_called()
+        self.assertIs(c1, c2)  # Same MagicMock return value
+
+    @patch.object(aws_session.boto3.session, 'Session')
+    @patch.object(aws_session, 'SESSION')
+    def test_client_of_role(self, mk_session, mk_role_session):
+        mk_session.region_name = 'ap-southeast-2'
+        expiration = datetime.datetime.fromtimestamp(time.time() + 3600)
+        mk_session.client.return_value.assume_role.return_value = {
+            'Credentials': {
+                'AccessKeyId': 'a',
+                'SecretAccessKey': 'b',
+                'SessionToken': 'c',
+                'Expiration': expiration
+            }
+        }
+
+        c1 = aws_session.client('iam', role_arn='arn:role')
+        c2 = aws_session.client('iam', role_arn='arn:role')
+
+        self.assertIs(c1, c2)
+        mk_session.client.return_value.assume_role.assert_called_once_with(
+            RoleArn='arn:role', RoleSessionName='keydra'
+        )
+        mk_role_session.assert_called_once_with(
+            aws_access_key_id='a',
+            aws_secret_access_key='b',
+            aws_session_token='c',
+            region_name='ap-southeast-2'
+        )
+        mk_role_session.return_value.client.assert_called_once_with(
+            service_name='iam', region_name=None,
+            config=aws_session.CLIENT_CONFIG
+        )
@@ -2,6 +2,7 @@ import unittest
 import requests
 
 from unittest.mock import patch
+from unittest.mock import MagicMock
 
 from keydra.clients import bitbucket
 
@@ -17,7 +18,7 @@ class TestBitbucketClient(unittest.TestCase):
             requests.auth.HTTPBasicAuth
         )
 
-    @patch.object(bitbucket.requests, 'put')
+    @patch.object(bitbucket.http, 'put')
     def test__put(self, mk_put):
         cli = bitbucket.BitbucketClient(
             user='username',
@@ -27,7 +28,7 @@ class TestBitbucketClient(unittest.TestCase):
         mk_put().json.return_value = {'test': 'response'}
         self.assertEqual(cli._put(url='test', json={}), {'test': 'response'})
 
-    @patch.object(bitbucket.requests, 'get')
+    @patch.object(bitbucket.http, 'get')
     def test__get(self, mk_get):
         cli = bitbucket.BitbucketClient(
             user='username',
@@ -36,7 +37,7 @@ class TestBitbucketClient(unittest.TestCase):
         mk_get().json.return_value = {'test': 'response'}
         self.assertEqual(cli._query(url='test'), {'test': 'response'})
 
-    @patch.object(bitbucket.requests, 'post')
+    @patch.object(bitbucket.http, 'post')
     def test__post(self, mk_post):
         cli = bitbucket.BitbucketClient(
             user='username',
@@ -45,7 +46,7 @@ class TestBitbucketClient(unittest.TestCase):
         mk_post().json.return_value = {'test': 'response'}
         self.assertEqual(cli._post(url='test'), {'test': 'response'})
 
-    @patch.object(bitbucket.requests, 'delete')
+    @patch.object(bitbucket.http, 'delete')
     def test__delete(self, mk_del):
         cli = bitbucket.BitbucketClient(
             user='username',
@@ -56,3 +57,25 @@ class TestBitbucketClient(unittest.TestCase):
         self.assertEqual(
             cli._delete(url='test'), {'status': 200, 'text': {'status': 200, 'text': 'woot'}}
         )
+
+    @patch.object(bitbucket, 'CONFIG_CACHE')
+    @patch.object(bitbucket.http, 'get')
+    def test__fetch_file_from_repository(self, mk_get, mk_cache):
+        cli = bitbucket.BitbucketClient(
+            user='username',
+            passwd='secret'
+        )
+        mk_cache.get.return_value = None
+        mk_get.return_value = MagicMock(
+            status_code=200, text='content', headers={'ETag': '"etag"'}
+        )
+
+        self.assertEqual(
+            cli.fetch_file_from_repository(
+                repo='repo', path='path', username='user'
+            ),
+            'content'
+        )
+        mk_cache.put.assert_called_once_with(
+            '{}/user/repo/path'.format(bitbucket.API_REPO), '"etag"', 'content'
+        )
@@ -3,8 +3,11 @@ import unittest
 from unittest.mock import MagicMock
 from unittest.mock import patch
 
+from keydra import deadline
 from keydra.clients.contentful import ContentfulClient
 from keydra.clients.contentful import ConnectionException
+from keydra.deadline import Deadline
+from keydra.exceptions import DeadlineExceeded
 
 from contentful_management import Client
 from contentful_management.array import Array
@@ -59,6 +62,20 @@ class TestContentfulClient(unittest.TestCase):
             'id'
         )
 
+    @patch.object(ContentfulClient, '__init__')
+    def test__revoke_token_deadline_exceeded(self, mk_client_init):
+        mk_client_init.return_value = None
+        cf = ContentfulClient(
+                token=CREDS['key']
+            )
+        cf._client = MagicMock()
+
+        with deadline.scope(Deadline(1000, floor=5)):
+            with self.assertRaises(DeadlineExceeded):
+                cf.revoke_token('id')
+
+        cf._client.personal_access_tokens.assert_not_called()
+
     @patch.object(ContentfulClient, '__init__')
     def test__get_tokens(self, mk_client_init):
         mk_client_init.return_value = None
@@ -73,7 +73,7 @@ class TestGithubClient(unittest.TestCase):
             }
         )
 
-    @patch.object(github.requests, 'put')
+    @patch.object(github.http, 'put')
     def test__put(self, mk_put):
         cli = github.GithubClient(
             user='username',
@@ -83,7 +83,7 @@ class TestGithubClient(unittest.TestCase):
         mk_put().text = {'test': 'response'}
         self.assertEqual(cli._put(url='test', json={}), {'test': 'response'})
 
-    @patch.object(github.requests, 'get')
+    @patch.object(github.http, 'get')
     def test__get(self, mk_get):
         cli = github.GithubClient(
             user='username',
@@ -92,7 +92,7 @@ class TestGithubClient(unittest.TestCase):
         mk_get().text = {'test': 'response'}
         self.assertEqual(cli._query(url='test'), {'test': 'response'})
 
-    @patch.object(github.requests, 'post')
+    @patch.object(github.http, 'post')
     def test__post(self, mk_post):
         cli = github.GithubClient(
             user='username',
@@ -101,7 +101,7 @@ class TestGithubClient(unittest.TestCase):
         mk_post().text = {'test': 'response'}
         self.assertEqual(cli._post(url='test'), {'test': 'response'})
 
-    @patch.object(github.requests, 'delete')
+    @patch.object(github.http, 'delete')
     def test__delete(self, mk_del):
         cli = github.GithubClient(
             user='username',
@@ -113,7 +113,7 @@ class TestGithubClient(unittest.TestCase):
             cli._delete(url='test'), {'status': 200, 'text': 'woot'}
         )
 
-    @patch.object(github.requests, 'get')
+    @patch.object(github.http, 'get')
     def test__list_repo_variables(self, mk_get):
         cli = github.GithubClient(
             user='username',
@@ -151,9 +151,9 @@ class TestGithubClient(unittest.TestCase):
             ]
         )
 
-    @patch.object(github.requests, 'get')
-    @patch.object(github.requests, 'post')
-    @patch.object(github.requests, 'delete')
+    @patch.object(github.http, 'get')
+    @patch.object(github.http, 'post')
+    @patch.object(github.http, 'delete')
     def test__authfail(self, mk_del, mk_post, mk_get):
         cli = github.GithubClient(
             user='username',
@@ -175,7 +175,27 @@ class TestGithubClient(unittest.TestCase):
         with self.assertRaises(Exception):
             cli._post(url='test')
 
-    @patch.object(github.requests, 'get')
+    @patch.object(github, 'CONFIG_CACHE')
+    @patch.object(github.http, 'get')
+    def test__fetch_file_from_repository_not_modified(self, mk_get, mk_cache):
+        cli = github.GithubClient(
+            user='username',
+            passwd='secret'
+        )
+        mk_cache.get.return_value.validator = '"etag"'
+        mk_cache.get.return_value.content = 'cached'
+        mk_get.return_value.status_code = 304
+
+        self.assertEqual(
+            cli.fetch_file_from_repository(org='org', repo='repo', path='p'),
+            'cached'
+        )
+        self.assertEqual(
+            mk_get.call_args.kwargs['headers']['If-None-Match'], '"etag"'
+        )
+        mk_cache.put.assert_not_called()
+
+    @patch.object(github.http, 'get')
     def test__fetch_file_from_repository(self, mk_get):
         cli = github.GithubClient(
             user='username',
@@ -2,6 +2,7 @@ import unittest
 from collections import namedtuple
 from unittest.mock import MagicMock, patch
 
+from keydra.clients import http
 from keydra.clients.gitlab import GitlabClient
 
 RepoVar = namedtuple('RepoVar', ['key', 'value'])
@@ -20,6 +21,15 @@ class TestGitlabClient(unittest.TestCase):
         self.glc.gpc = MagicMock()
         self.glc.PROJECT_CACHE = {}
 
+    @patch('keydra.clients.gitlab.GitlabPythonClient')
+    def test__should_send_requests_through_sdk_session(self, mock_gpc):
+        GitlabClient('token')
+
+        args, kwargs = mock_gpc.call_args
+
+        assert args == ('https://gitlab.com/', 'token')
+        assert kwargs['session'] is not http.session()
+
     def test__should_set_cache_when_creating_projectmanager(self):
         project_manager = MagicMock()
         project_manager.get.return_value = 'the project manager'
@@ -95,3 +105,16 @@ class TestGitlabClient(unittest.TestCase):
         self.glc.fetch_file_from_repository(A_FILE_PATH, A_REPO_NAME)
 
         mock_fm.files.get.assert_called_once_with(file_path=A_FILE_PATH, ref='main')
+
+    @patch('keydra.clients.gitlab.CONFIG_CACHE')
+    @patch.object(GitlabClient, '_get_project_manager')
+    def test__should_not_fetch_unchanged_file_from_repo(self, mock_gpm, mock_cache):
+        mock_cache.get.return_value.validator = 'blob-sha'
+        mock_cache.get.return_value.content = b'cached'
+        mock_gpm.return_value.files.head.return_value = {'X-Gitlab-Blob-Id': 'blob-sha'}
+
+        result = self.glc.fetch_file_from_repository(A_FILE_PATH, A_REPO_NAME, A_BRANCH_NAME)
+
+        assert result == b'cached'
+        mock_gpm.return_value.files.head.assert_called_once_with(file_path=A_FILE_PATH, ref=A_BRANCH_NAME)
+        mock_gpm.return_value.files.get.assert_not_called()
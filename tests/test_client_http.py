@@ -0,0 +1,158 @@
+import unittest
+
+from unittest.mock import MagicMock, patch
+
+import requests
+
+from keydra import deadline
+from keydra import limiter
+from keydra import telemetry
+from keydra.clients import http
+from keydra.deadline import Deadline
+from keydra.exceptions import DeadlineExceeded
+from keydra.limiter import AdaptiveLimits
+
+
+def _ok(request, **kwargs):
+    response = requests.Response()
+    response.status_code = 200
+    response.url = request.url
+
+    return response
+
+
+class TestHttp(unittest.TestCase):
+    def setUp(self):
+        http.clear()
+
+    def tearDown(self):
+        http.clear()
+
+    def test__session_shared(self):
+        self.assertIs(http.session(), http.session())
+
+    def test__session_pools(self):
+        adapter = http.session().get_adapter('https://api.github.com')
+
+        self.assertEqual(adapter._pool_connections, http.DEFAULT_HOSTS)
+        self.assertEqual(adapter._pool_maxsize, http.DEFAULT_POOL_SIZE)
+
+    def test__session_keeps_no_cookies(self):
+        cookies = http.session().cookies
+        request = MagicMock()
+        request.get_full_url.return_value = 'https://api.github.com/user'
+
+        self.assertFalse(
+            cookies._policy.set_ok_domain(
+                MagicMock(domain='api.github.com'), request
+            )
+        )
+
+    def test__calls_traced(self):
+        with patch('requests.adapters.HTTPAdapter.send', side_effect=_ok), \
+                telemetry.record_calls() as calls:
+            http.get('https://api.github.com/repos/1')
+            http.sdk_session().get('https://login.salesforce.com/services')
+
+        self.assertEqual(
+            calls.report()['by_host'],
+            {'api.github.com': 1, 'login.salesforce.com': 1}
+        )
+
+    def test__request_default_timeout(self):
+        with patch.object(http.session(), 'request') as mk_req:
+            http.get('https://api.github.com/user', headers={'a': 'b'})
+
+            mk_req.assert_called_once_with(
+                'GET', 'https://api.github.com/user',
+                headers={'a': 'b'}, timeout=http.DEFAULT_TIMEOUT
+            )
+
+    def test__request_timeout_kept(self):
+        with patch.object(http.session(), 'request') as mk_req:
+            http.delete('https://api.github.com/keys/1', timeout=3)
+
+            mk_req.assert_called_once_with(
+                'DELETE', 'https://api.github.com/keys/1', timeout=3
+            )
+
+    def test__request_timeout_within_deadline(self):
+        with patch.object(http.session(), 'request') as mk_req, \
+                deadline.scope(Deadline(10000, floor=7)):
+            http.get('https://api.github.com/user')
+
+            timeout = mk_req.call_args[1]['timeout']
+
+        self.assertAlmostEqual(timeout[0], 3, delta=0.5)
+        self.assertAlmostEqual(timeout[1], 3, delta=0.5)
+
+    def test__request_deadline_exceeded(self):
+        with patch.object(http.session(), 'request') as mk_req, \
+                deadline.scope(Deadline(1000, floor=5)):
+            with self.assertRaises(DeadlineExceeded):
+                http.get('https://api.github.com/user')
+
+        mk_req.assert_not_called()
+
+    def test__request_throttled_cuts_host_limit(self):
+        hosts = AdaptiveLimits(8)
+
+        with patch.object(http.session(), 'request') as mk_req, \
+                patch.object(limiter, 'HOSTS', hosts):
+            mk_req.return_value = MagicMock(status_code=429)
+            http.get('https://api.github.com/user')
+
+            mk_req.return_value = MagicMock(status_code=200)
+            http.get('https://api.bitbucket.org/2.0/user')
+
+        self.assertEqual(hosts.get('api.github.com').limit, 4)
+        self.assertEqual(hosts.get('api.bitbucket.org').limit, 8)
+
+    def test__sdk_session_default_timeout(self):
+        with patch('requests.adapters.HTTPAdapter.send', side_effect=_ok) as mk_send:
+            sdk = http.sdk_session()
+            sdk.get('https://gitlab.com/api/v4/user')
+            sdk.get('https://gitlab.com/api/v4/user', timeout=3)
+
+        self.assertIsNot(sdk, http.session())
+        self.assertEqual(
+            mk_send.call_args_list[0][1]['timeout'], http.DEFAULT_TIMEOUT
+        )
+        self.assertEqual(mk_send.call_args_list[1][1]['timeout'], 3)
+
+    def test__sdk_session_timeout_within_deadline(self):
+        with patch('requests.adapters.HTTPAdapter.send', side_effect=_ok) as mk_send:
+            sdk = http.sdk_session()
+
+            with deadline.scope(Deadline(10000, floor=7)):
+                sdk.get('https://gitlab.com/api/v4/user')
+
+            with deadline.scope(Deadline(1000, floor=5)):
+                with self.assertRaises(DeadlineExceeded):
+                    sdk.get('https://gitlab.com/api/v4/user')
+
+        timeout = mk_send.call_args[1]['timeout']
+
+        self.assertEqual(mk_send.call_count, 1)
+        self.assertAlmostEqual(timeout[1], 3, delta=0.5)
+
+    def test__configure_grows_pools(self):
+        session = http.session()
+
+        http.configure(pool_size=http.DEFAULT_POOL_SIZE * 4)
+
+        self.assertIsNot(http.session(), session)
+        self.assertEqual(
+            http.session().get_adapter('https://x')._pool_maxsize,
+            http.DEFAULT_POOL_SIZE * 4
+        )
+
+    def test__configure_never_shrinks(self):
+        http.configure(pool_size=50)
+        session = http.session()
+
+        http.configure(pool_size=2)
+        http.configure(pool_size=None)
+
+        self.assertIs(http.session(), session)
+        self.assertEqual(session.get_adapter('https://x')._pool_maxsize, 50)
@@ -47,7 +47,7 @@ XML_RESP_EXPIRED = b'''<?xml version="1.0" encoding="UTF-8" ?>
 
 
 class TestQualysClient(unittest.TestCase):
-    @patch.object(qualys.requests, 'request')
+    @patch.object(qualys.http, 'request')
     def test__init(self,  mk_req):
         resp = Response()
         resp.status_code = 200
@@ -71,7 +71,7 @@ class TestQualysClient(unittest.TestCase):
             params=None
         )
 
-    @patch.object(qualys.requests, 'request')
+    @patch.object(qualys.http, 'request')
     def test__init_fail(self,  mk_req):
         resp = Response()
         resp.status_code = 200
@@ -88,7 +88,7 @@ class TestQualysClient(unittest.TestCase):
                 password=CREDS['password']
             )
 
-    @patch.object(qualys.requests, 'request')
+    @patch.object(qualys.http, 'request')
     def test__change_pass(self, mk_req):
         resp = Response()
         resp.status_code = 200
@@ -108,7 +108,7 @@ class TestQualysClient(unittest.TestCase):
 
         self.assertEqual(c_result, 'Password123')
 
-    @patch.object(qualys.requests, 'request')
+    @patch.object(qualys.http, 'request')
     def test__change_pass_fail(self, mk_req):
         resp = Response()
         resp.status_code = 200
@@ -1,8 +1,12 @@
 import unittest
 
+from unittest.mock import ANY
 from unittest.mock import MagicMock
 from unittest.mock import patch
 
+import requests
+
+from keydra.clients import http
 from keydra.clients.salesforce import SalesforceClient
 from keydra.clients.salesforce import ValidationException
 
@@ -18,6 +22,20 @@ SF_CREDS = {
 
 
 class TestSalesforceClient(unittest.TestCase):
+    @patch('keydra.clients.salesforce.Salesforce')
+    def test__init_sdk_session(self, mk_salesforce):
+        SalesforceClient(
+            username=SF_CREDS['key'],
+            password=SF_CREDS['secret'],
+            token=SF_CREDS['token'],
+            domain=SF_CREDS['domain']
+        )
+
+        session = mk_salesforce.call_args[1]['session']
+
+        self.assertIsInstance(session, requests.Session)
+        self.assertIsNot(session, http.session())
+
     @patch.object(SalesforceClient, '__init__')
     def test__userid_except(self, mk_client_init):
         mk_client_init.return_value = None
@@ -123,7 +141,8 @@ class TestSalesforceClient(unittest.TestCase):
             domain=None,
             password='test',
             security_token='token',
-            username='test@test.com'
+            username='test@test.com',
+            session=ANY
         )
 
     @patch('keydra.clients.salesforce.Salesforce')
@@ -139,5 +158,6 @@ class TestSalesforceClient(unittest.TestCase):
             domain='test',
             password='test',
             security_token='token',
-            username='test@test.com'
+            username='test@test.com',
+            session=ANY
         )
@@ -42,6 +42,25 @@ class TestSalesforceMarketingClient(unittest.TestCase):
             'SOAPAction': 'Update', 'Content-Type': 'text/xml'
         })
 
+    @patch('keydra.clients.salesforce_marketing_cloud.Client')
+    @patch('keydra.clients.salesforce_marketing_cloud.Transport')
+    def test__init_transport_without_timeout(self, mk_transport, mk_zeep_client):
+        SalesforceMarketingCloudClient(
+            username=TEST_DATA['username'],
+            password=TEST_DATA['password'],
+            subdomain=TEST_DATA['subdomain'],
+            mid=TEST_DATA['mid'],
+            businessUnit=TEST_DATA['businessunit'],
+        )
+
+        kwargs = mk_transport.call_args[1]
+
+        self.assertIsNone(kwargs['timeout'])
+        self.assertEqual(kwargs['session'].headers['SOAPAction'], 'Update')
+        self.assertIs(
+            mk_zeep_client.call_args[1]['transport'], mk_transport.return_value
+        )
+
     def test__sfmc_get_status(self):
         self.sfmc_client._client = MagicMock()
         self.sfmc_client._client.service.GetSystemStatus.return_value = {'OverallStatus': 'OK'}
@@ -7,8 +7,10 @@ from unittest.mock import patch
 import splunklib.client as splunkclient
 from splunklib.binding import HTTPError
 
+from keydra import deadline
 from keydra.clients.splunk import SplunkClient
 from keydra.clients.splunk import AppNotInstalledException
+from keydra.deadline import Deadline
 
 SPLUNK_CREDS = {
     "provider": "splunk",
@@ -45,6 +47,29 @@ class TestSplunkClient(unittest.TestCase):
 
         sp_client._service.login.assert_called_once_with()
 
+    @patch('keydra.clients.splunk.splunkbinding.handler')
+    @patch.object(splunkclient, 'Service')
+    def test__splunk_requests_within_deadline(self, mk_splunk, mk_handler):
+        SplunkClient(
+            username=SPLUNK_CREDS['key'],
+            password=SPLUNK_CREDS['secret'],
+            host='127.0.0.1',
+            verify=False
+        )
+
+        request = mk_splunk.call_args[1]['handler']
+
+        with deadline.scope(Deadline(10000, floor=7)):
+            request('https://127.0.0.1:8089/services', {'method': 'GET'})
+
+        mk_handler.return_value.assert_called_once_with(
+            'https://127.0.0.1:8089/services', {'method': 'GET'}
+        )
+        self.assertAlmostEqual(
+            mk_handler.call_args[1]['timeout'], 3, delta=0.5
+        )
+        self.assertFalse(mk_handler.call_args[1]['verify'])
+
     @patch.object(splunkclient, 'Service')
     def test__update_app_not_installed(self, mk_splunk):
         sp_client = SplunkClient(
@@ -1,4 +1,5 @@
 import copy
+import tempfile
 import unittest
 
 from keydra.config import KeydraConfig
@@ -167,6 +168,17 @@ class TestConfig(unittest.TestCase):
             secrets["aws_deployments"]["distribute"][0]["envs"] = ["notanenv"]
             self.client._validate_spec(ENVS, secrets)
 
+    def test__validate_spec_scoped_env(self):
+        secrets = {"aws_deployments": copy.deepcopy(SECRETS["aws_deployments"])}
+
+        with self.assertRaises(ConfigException):
+            self.client._validate_spec(ENVS, secrets)
+
+        self.client._validate_spec(ENVS, secrets, scoped_env="prod")
+
+        with self.assertRaises(ConfigException):
+            self.client._validate_spec(ENVS, {}, scoped_env="prod")
+
     def test__validate_spec_secrets(self):
         envs = copy.deepcopy(ENVS)
         secrets = copy.deepcopy(SECRETS)
@@ -261,7 +273,7 @@ class TestConfig(unittest.TestCase):
 
     @patch("keydra.loader.build_client")
     def test_load_secret_specs(self, mk_bc):
-        with patch.object(self.client, "_filter") as mk_fba:
+        with patch.object(self.client, "_select") as mk_fba:
             with patch.object(self.client, "_validate_spec") as mk_vc:
                 self.client.load_secrets()
 
@@ -269,6 +281,95 @@ class TestConfig(unittest.TestCase):
                 mk_fba.assert_called()
                 mk_vc.assert_called()
 
+    @patch("keydra.loader.build_client")
+    def test_load_secret_specs_validates_unchanged_config_once(self, mk_bc):
+        config = ({}, {})
+        mk_bc.return_value.load_config.side_effect = [
+            config, (config[0], config[1]), ({}, {})
+        ]
+
+        with patch.object(self.client, "_select"):
+            with patch.object(self.client, "_validate_spec") as mk_vc:
+                self.client.load_secrets()
+                self.client.load_secrets()
+
+                mk_vc.assert_called_once_with(*config)
+
+                self.client.load_secrets()
+
+                self.assertEqual(mk_vc.call_count, 2)
+
+    @patch("keydra.loader.build_client")
+    def test_load_secret_specs_env_scoped(self, mk_bc):
+        client = KeydraConfig(
+            config=dict(ENV_CONFIG, scope='environment'),
+            sts_client=MagicMock()
+        )
+        secrets = {'s': {'provider': 'iam', 'key': 's'}}
+
+        def load_config(config, env_scope):
+            self.assertEqual(env_scope(ENVS), frozenset(ENVS['prod']['secrets']))
+
+            return ENVS, secrets
+
+        mk_bc.return_value.load_config.side_effect = load_config
+
+        with patch.object(client, "_guess_current_environment") as mk_gce:
+            mk_gce.return_value = "prod"
+
+            with patch.object(client, "_select"):
+                with patch.object(client, "_validate_spec") as mk_vc:
+                    client.load_secrets()
+
+                    mk_vc.assert_called_once_with(
+                        ENVS, secrets, scoped_env='prod'
+                    )
+
+    def test__select_matches_filter(self):
+        plandir = tempfile.TemporaryDirectory()
+        self.addCleanup(plandir.cleanup)
+
+        for account, env in [("001122", "dev"), (667788, "prod")]:
+            client = KeydraConfig(
+                config=dict(ENV_CONFIG, plandir=plandir.name),
+                sts_client=MagicMock()
+            )
+            client._sts.get_caller_identity.return_value = {"Account": account}
+
+            for kwargs in [
+                {"rotate": "nightly"},
+                {"rotate": "canaries"},
+                {"rotate": "adhoc"},
+                {"rotate": "adhoc", "requested_secrets": ["splunk", "okta_canary"]},
+                {"rotate": "nightly", "number_of_batches": 3, "batch_number": 0},
+                {"rotate": "monthly", "number_of_batches": 3, "batch_number": 1},
+            ]:
+                with self.subTest(env=env, **kwargs):
+                    self.assertEqual(
+                        client._select(ENVS, SECRETS, **kwargs),
+                        client._filter(ENVS, SECRETS, **kwargs)
+                    )
+
+        # Compiled schedules are saved, and loaded by the next invocations
+        client = KeydraConfig(
+            config=dict(ENV_CONFIG, plandir=plandir.name),
+            sts_client=MagicMock()
+        )
+        client._sts.get_caller_identity.return_value = {"Account": "001122"}
+        expected = client._filter(ENVS, SECRETS, rotate="nightly")
+
+        with patch.object(client, "_shortlist_secret") as mk_ss:
+            plan = client._plan(copy.deepcopy(ENVS), copy.deepcopy(SECRETS))
+
+            self.assertTrue(plan.compiled("nightly"))
+            self.assertFalse(plan.compiled("weekly"))
+            self.assertEqual(
+                client._select(copy.deepcopy(ENVS), copy.deepcopy(SECRETS), rotate="nightly"),
+                expected
+            )
+            self.assertEqual(client.sid_for(SECRETS["splunk"]), "splunk")
+            mk_ss.assert_not_called()
+
     def test__filter_no_batch_size(self):
         all_secrets = {}
         envs = {"dev": {"secrets": []}}
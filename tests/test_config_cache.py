@@ -0,0 +1,63 @@
+import json
+import tempfile
+import unittest
+
+from keydra.config_cache import ConfigCache
+
+from unittest.mock import MagicMock
+
+
+class TestConfigCache(unittest.TestCase):
+    def setUp(self):
+        self._dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self._dir.cleanup)
+
+    def test_put_and_get(self):
+        cache = ConfigCache(directory=self._dir.name)
+
+        self.assertIsNone(cache.get('url'))
+
+        cache.put('url', '"etag"', 'content')
+
+        self.assertEqual(cache.get('url').validator, '"etag"')
+        self.assertEqual(cache.get('url').content, 'content')
+
+    def test_kept_on_disk(self):
+        ConfigCache(directory=self._dir.name).put('url', 'sha', b'content')
+
+        cached = ConfigCache(directory=self._dir.name).get('url')
+
+        self.assertEqual(cached.validator, 'sha')
+        self.assertEqual(cached.content, 'content')
+
+    def test_not_cached_without_validator(self):
+        cache = ConfigCache(directory=self._dir.name)
+
+        cache.put('url', None, 'content')
+
+        self.assertIsNone(cache.get('url'))
+
+    def test_unwritable_content_kept_in_memory(self):
+        cache = ConfigCache(directory=self._dir.name)
+
+        cache.put('url', MagicMock(), 'content')
+
+        self.assertEqual(cache.get('url').content, 'content')
+        self.assertIsNone(ConfigCache(directory=self._dir.name).get('url'))
+
+    def test_parse_once(self):
+        cache = ConfigCache(directory=self._dir.name, max_parsed=1)
+        parser = MagicMock(side_effect=json.loads)
+
+        first = cache.parse('{"a": 1}', 'json', parser)
+        second = cache.parse('{"a": 1}', 'JSON', parser)
+
+        self.assertIs(first, second)
+        self.assertEqual(parser.call_count, 1)
+
+        cache.parse('{"b": 2}', 'json', parser)
+        third = cache.parse('{"a": 1}', 'json', parser)
+
+        self.assertEqual(third, first)
+        self.assertIsNot(third, first)
+        self.assertEqual(parser.call_count, 3)
@@ -0,0 +1,46 @@
+import unittest
+
+from keydra.config_index import ConfigIndex
+
+
+ENVS = {
+    'dev': {'type': 'aws', 'id': '001', 'secrets': ['a', 'b']},
+    'prod': {'type': 'aws', 'id': '002', 'secrets': ['b']},
+}
+
+T_DEV = {'provider': 'bitbucket', 'key': 'K1', 'envs': ['dev']}
+T_ALL = {'provider': 'github', 'key': 'K2', 'envs': ['*']}
+T_PROD = {'provider': 'gitlab', 'key': 'K3', 'envs': ['prod']}
+
+SECRETS = {
+    'a': {'provider': 'IAM', 'key': 'a'},
+    'b': {
+        'provider': 'cloudflare',
+        'key': 'b',
+        'distribute': [T_DEV, T_ALL, T_PROD]
+    },
+    'c': {'provider': 'iam', 'key': 'c'},
+}
+
+
+class TestConfigIndex(unittest.TestCase):
+    def test_env_secrets(self):
+        index = ConfigIndex(ENVS, SECRETS)
+
+        self.assertEqual(index.env_names, {'dev', 'prod'})
+        self.assertEqual(index.env_secrets('dev'), {'a', 'b'})
+        self.assertEqual(index.env_secrets('prod'), {'b'})
+
+    def test_targets(self):
+        index = ConfigIndex(ENVS, SECRETS)
+
+        self.assertEqual(index.targets('b', 'dev'), [T_DEV, T_ALL])
+        self.assertEqual(index.targets('b', 'prod'), [T_ALL, T_PROD])
+        self.assertEqual(index.targets('a', 'dev'), [])
+        self.assertEqual(index.targets('nope', 'dev'), [])
+
+    def test_for_config_reused_while_unchanged(self):
+        index = ConfigIndex.for_config(ENVS, SECRETS)
+
+        self.assertIs(ConfigIndex.for_config(ENVS, SECRETS), index)
+        self.assertIsNot(ConfigIndex.for_config(dict(ENVS), SECRETS), index)
@@ -0,0 +1,71 @@
+import json
+import unittest
+
+import yaml
+
+from keydra import config_parser
+from keydra.exceptions import ConfigException
+
+from unittest.mock import patch
+
+
+SECRETS_YAML = '''
+defaults: &defaults
+  provider: IAM
+  rotate: nightly
+aws_key:
+  <<: *defaults
+  key: aws_key
+  distribute:
+    - {provider: github, key: KEY, source: key, envs: ['*']}
+cf_key:
+  provider: cloudflare
+  key: cf_key
+  tags: &tags [a, b]
+okta_key:
+  provider: okta
+  key: okta_key
+  tags: *tags
+'''
+
+LOADERS = [yaml.SafeLoader]
+
+if hasattr(yaml, 'CSafeLoader'):
+    LOADERS.append(yaml.CSafeLoader)
+
+
+class TestConfigParser(unittest.TestCase):
+    def test_parser(self):
+        self.assertEqual(config_parser.parser('JSON')('{"a": 1}'), {'a': 1})
+        self.assertEqual(config_parser.parser('yml')('a: 1'), {'a': 1})
+        self.assertEqual(
+            config_parser.parser('json', only={'b'})('{"a": 1, "b": 2}'),
+            {'b': 2}
+        )
+
+        with self.assertRaises(ConfigException):
+            config_parser.parser('sql')
+
+    def test_safe_load_keys(self):
+        full = yaml.safe_load(SECRETS_YAML)
+
+        for loader in LOADERS:
+            with patch.object(config_parser, 'SafeLoader', loader):
+                for keys in [
+                    {'aws_key'}, {'okta_key'}, {'cf_key', 'nope'}, set(), full
+                ]:
+                    with self.subTest(loader=loader.__name__, keys=keys):
+                        self.assertEqual(
+                            config_parser.safe_load_keys(
+                                SECRETS_YAML, frozenset(keys)
+                            ),
+                            {k: v for k, v in full.items() if k in keys}
+                        )
+
+    def test_safe_load_keys_not_a_mapping(self):
+        self.assertEqual(config_parser.safe_load_keys('', {'a'}), {})
+        self.assertEqual(config_parser.safe_load_keys('[a, b]', {'a'}), {})
+        self.assertEqual(
+            config_parser.parser('yaml', only={'a'})(json.dumps({'a': [1]})),
+            {'a': [1]}
+        )
@@ -0,0 +1,49 @@
+import unittest
+
+from unittest.mock import patch
+
+from keydra.credentials import CredentialCache
+
+
+class TestCredentialCache(unittest.TestCase):
+    def test_only_used_within_a_scope(self):
+        cache = CredentialCache()
+
+        cache.put('keydra/bitbucket', 'ignored')
+        self.assertIsNone(cache.get('keydra/bitbucket'))
+
+        with cache.scope():
+            cache.put('keydra/bitbucket', 'creds', version_id='v1')
+            self.assertEqual(cache.get('keydra/bitbucket'), 'creds')
+
+        self.assertIsNone(cache.get('keydra/bitbucket'))
+
+        # Entries survive until the next run (i.e. warm invocation)
+        with cache.scope():
+            self.assertEqual(cache.get('keydra/bitbucket'), 'creds')
+            self.assertEqual(cache.version('keydra/bitbucket'), 'v1')
+
+    @patch('keydra.credentials.time.monotonic')
+    def test_entries_expire(self, mk_time):
+        cache = CredentialCache(ttl=60)
+
+        with cache.scope():
+            mk_time.return_value = 100
+            cache.put('keydra/github', 'creds')
+
+            mk_time.return_value = 160
+            self.assertTrue(cache.fresh('keydra/github'))
+
+            mk_time.return_value = 161
+            self.assertFalse(cache.fresh('keydra/github'))
+
+    def test_invalidate(self):
+        cache = CredentialCache()
+
+        with cache.scope():
+            cache.put('keydra/github', 'creds')
+            cache.put('keydra/bitbucket', 'creds')
+            cache.invalidate('keydra/github', 'not/cached')
+
+            self.assertIsNone(cache.get('keydra/github'))
+            self.assertEqual(cache.get('keydra/bitbucket'), 'creds')
@@ -0,0 +1,84 @@
+import unittest
+
+from unittest.mock import MagicMock
+
+import boto3
+
+from keydra import deadline
+from keydra.deadline import Deadline
+from keydra.exceptions import DeadlineExceeded
+
+
+class TestDeadline(unittest.TestCase):
+    def test_from_context(self):
+        context = MagicMock()
+        context.get_remaining_time_in_millis.return_value = 120000
+
+        deadline = Deadline.from_context(context, reserve=30)
+
+        self.assertAlmostEqual(deadline.remaining(), 120, delta=1)
+        self.assertAlmostEqual(deadline.time_left(), 115, delta=1)
+        self.assertTrue(deadline.admits())
+
+    def test_no_context_no_deadline(self):
+        self.assertIsNone(Deadline.from_context(None))
+
+    def test_admits_until_reserve(self):
+        self.assertFalse(Deadline(30000, reserve=60).admits())
+        self.assertTrue(Deadline(90000, reserve=60).admits())
+
+    def test_call_timeout_ceilings(self):
+        d = Deadline(600000, ceilings={'Bitbucket': 20})
+
+        self.assertEqual(d.call_timeout('bitbucket'), 20)
+        self.assertEqual(
+            d.call_timeout('qualys'), deadline.CALL_CEILINGS['qualys']
+        )
+        self.assertEqual(d.call_timeout(), deadline.DEFAULT_CALL_CEILING)
+
+    def test_call_timeout_time_left(self):
+        self.assertAlmostEqual(
+            Deadline(15000, floor=5).call_timeout('github'), 10, delta=1
+        )
+
+        with self.assertRaises(DeadlineExceeded):
+            Deadline(4000, floor=5).call_timeout('github')
+
+    def test_scope(self):
+        self.assertIsNone(deadline.current())
+        self.assertEqual(deadline.call_timeout(default=7), 7)
+
+        d = Deadline(600000, ceilings={'github': 15})
+
+        with deadline.scope(d):
+            self.assertIs(deadline.current(), d)
+            self.assertEqual(deadline.call_timeout(), 60)
+
+            with deadline.calling('github'):
+                self.assertEqual(deadline.call_timeout(), 15)
+
+        self.assertIsNone(deadline.current())
+
+    def test_guard(self):
+        calls = []
+        guarded = deadline.guard(calls.append)
+
+        guarded(1)
+
+        with deadline.scope(Deadline(1000, floor=5)):
+            with self.assertRaises(DeadlineExceeded):
+                guarded(2)
+
+        self.assertEqual(calls, [1])
+
+    def test_guard_client(self):
+        client = deadline.guard_client(
+            boto3.session.Session(
+                aws_access_key_id='a', aws_secret_access_key='b',
+                region_name='ap-southeast-2'
+            ).client('iam')
+        )
+
+        with deadline.scope(Deadline(1000, floor=5)):
+            with self.assertRaises(DeadlineExceeded):
+                client.list_users()
@@ -0,0 +1,99 @@
+import unittest
+
+from unittest.mock import MagicMock, patch
+
+from keydra.dependencies import credentials_read
+from keydra.dependencies import dependency_graph
+from keydra.dependencies import reads
+from keydra.dependencies import writes
+
+
+ADMIN = {
+    'provider': 'IAM',
+    'key': 'keydra_admin',
+    'distribute': [
+        {'provider': 'secretsmanager', 'key': 'keydra/bitbucket'},
+    ]
+}
+
+SPLUNK = {
+    'provider': 'splunk',
+    'key': 'splunk_user',
+    'config': {
+        'rotatewith': {'provider': 'secretsmanager', 'key': 'splunk/admin'}
+    }
+}
+
+SPLUNK_ADMIN = {
+    'provider': 'secretsmanager',
+    'key': 'splunk_admin_source',
+    'distribute': [{'provider': 'secretsmanager', 'key': 'splunk/admin'}]
+}
+
+REPO_SECRET = {
+    'provider': 'IAM',
+    'key': 'deploy_user',
+    'distribute': [
+        {'provider': 'bitbucket', 'key': 'AWS_KEY', 'source': 'key'}
+    ]
+}
+
+
+class TestDependencies(unittest.TestCase):
+    def test_reads(self):
+        self.assertEqual(
+            reads(SPLUNK),
+            {
+                ('secretsmanager', 'keydra/splunk/splunk_user'),
+                ('secretsmanager', 'splunk/admin')
+            }
+        )
+        self.assertIn(
+            ('secretsmanager', 'keydra/bitbucket'), reads(REPO_SECRET)
+        )
+
+    @patch('keydra.loader.load_provider_client')
+    def test_credentials_read(self, mk_lpc):
+        mk_lpc.side_effect = lambda provider: MagicMock(
+            has_creds=MagicMock(return_value=provider != 'iam')
+        )
+
+        self.assertEqual(
+            credentials_read([REPO_SECRET, ADMIN, SPLUNK]),
+            {
+                'keydra/bitbucket', 'keydra/secretsmanager',
+                'keydra/splunk/splunk_user'
+            }
+        )
+        self.assertEqual(
+            sorted(c.args[0] for c in mk_lpc.call_args_list),
+            ['bitbucket', 'iam', 'secretsmanager', 'splunk']
+        )
+
+    def test_writes(self):
+        self.assertEqual(
+            writes(ADMIN),
+            {('iam', 'keydra_admin'), ('secretsmanager', 'keydra/bitbucket')}
+        )
+
+    def test_graph(self):
+        self.assertEqual(
+            dependency_graph([REPO_SECRET, SPLUNK, ADMIN, SPLUNK_ADMIN]),
+            {0: {2}, 1: {3}, 2: set(), 3: set()}
+        )
+
+    def test_cycles_are_broken(self):
+        first = {
+            'provider': 'secretsmanager',
+            'key': 'a',
+            'config': {'rotatewith': {'provider': 'secretsmanager', 'key': 'b'}}
+        }
+        second = {
+            'provider': 'secretsmanager',
+            'key': 'b',
+            'config': {'rotatewith': {'provider': 'secretsmanager', 'key': 'a'}}
+        }
+
+        self.assertEqual(
+            dependency_graph([first, second]), {0: set(), 1: {0}}
+        )
@@ -0,0 +1,246 @@
+import threading
+import time
+import unittest
+
+import requests
+
+from keydra import retry
+from keydra.executor import Executor
+from keydra.executor import committing
+from keydra.executor import ProviderLimits
+from keydra.retry import RetryLater
+
+
+class TestProviderLimits(unittest.TestCase):
+    def test_unlimited_provider_is_not_capped(self):
+        limits = ProviderLimits()
+
+        with limits.limit('bitbucket'):
+            with limits.limit('bitbucket'):
+                pass
+
+    def test_single_limit_applies_to_all_providers(self):
+        limits = ProviderLimits(1)
+
+        with limits.limit('bitbucket'):
+            self.assertIsNone(limits.adaptive_limit('bitbucket').acquire(timeout=0))
+            self.assertIsNotNone(limits.adaptive_limit('github').acquire(timeout=0))
+
+    def test_limits_per_provider_are_case_insensitive(self):
+        limits = ProviderLimits({'Bitbucket': 2, '*': 5})
+
+        self.assertEqual(limits.adaptive_limit('BITBUCKET').maximum, 2)
+        self.assertEqual(limits.adaptive_limit('github').maximum, 5)
+
+    def test_limit_is_honoured_across_threads(self):
+        limits = ProviderLimits({'bitbucket': 2})
+        in_flight = []
+        peak = []
+        lock = threading.Lock()
+
+        def call(_):
+            with limits.limit('bitbucket'):
+                with lock:
+                    in_flight.append(1)
+                    peak.append(len(in_flight))
+
+                time.sleep(0.01)
+
+                with lock:
+                    in_flight.pop()
+
+        Executor(max_workers=8).map(call, range(16))
+
+        self.assertLessEqual(max(peak), 2)
+
+    def test_ceiling_caps_providers_without_a_limit(self):
+        limits = ProviderLimits({'bitbucket': 2}, ceiling=8)
+
+        self.assertEqual(limits.adaptive_limit('github').maximum, 8)
+        self.assertIsNone(ProviderLimits().adaptive_limit('github'))
+
+    def test_limit_cut_when_throttled(self):
+        limits = ProviderLimits({'bitbucket': 8})
+
+        response = requests.Response()
+        response.status_code = 429
+
+        with self.assertRaises(RetryLater):
+            with limits.limit('bitbucket'):
+                raise RetryLater(1, 1) from requests.HTTPError(
+                    response=response
+                )
+
+        with limits.limit('bitbucket'):
+            pass
+
+        self.assertEqual(
+            limits.snapshot(),
+            {
+                'bitbucket': {
+                    'limit': 4, 'maximum': 8, 'in_flight': 0, 'throttles': 1
+                }
+            }
+        )
+
+
+class TestExecutor(unittest.TestCase):
+    def test_serial_runs_inline(self):
+        threads = Executor().map(
+            lambda _: threading.current_thread(), range(3)
+        )
+
+        self.assertEqual(
+            set(threads), {threading.current_thread()}
+        )
+
+    def test_results_keep_input_order(self):
+        def slow_for_small(item):
+            time.sleep((5 - item) * 0.005)
+            return item * 10
+
+        self.assertEqual(
+            Executor(max_workers=5).map(slow_for_small, range(5)),
+            [0, 10, 20, 30, 40]
+        )
+
+    def test_invalid_worker_count_falls_back_to_serial(self):
+        self.assertEqual(Executor(max_workers=0).max_workers, 1)
+        self.assertEqual(Executor(max_workers=None).max_workers, 1)
+
+    def test_run_waits_for_dependencies(self):
+        finished = []
+        lock = threading.Lock()
+
+        def work(item):
+            # The item everyone depends on is also the slowest
+            time.sleep(0.02 if item == 2 else 0)
+
+            with lock:
+                finished.append(item)
+
+            return item * 10
+
+        for workers in (1, 4):
+            finished.clear()
+
+            result = Executor(max_workers=workers).run(
+                work, range(4), dependencies={0: {2}, 1: {2}, 3: {0}}
+            )
+
+            self.assertEqual(result, [0, 10, 20, 30])
+            self.assertEqual(finished[0], 2)
+            self.assertLess(finished.index(0), finished.index(3))
+
+    def test_run_gives_up_when_out_of_time(self):
+        release = threading.Event()
+
+        def work(item):
+            if item == 1:
+                release.wait(1)
+
+            return item
+
+        result = Executor(max_workers=2).run(
+            work, range(4),
+            dependencies={3: {1}},
+            time_left=lambda: 0.05,
+            on_timeout=lambda item, started, error: (item, started, error)
+        )
+        release.set()
+
+        self.assertEqual(result[0], 0)
+        self.assertEqual(result[1], (1, True, None))
+        self.assertEqual(result[2], 2)
+        self.assertEqual(result[3], (3, False, None))
+
+    def test_items_given_up_on_cannot_commit(self):
+        release = threading.Event()
+        committed = {}
+        done = threading.Event()
+
+        def work(item):
+            if item == 1:
+                release.wait(1)
+
+            with committing() as ok:
+                committed[item] = ok
+
+            if item == 1:
+                done.set()
+
+            return item
+
+        with committing() as ok:
+            self.assertTrue(ok)
+
+        result = Executor(max_workers=2).run(
+            work, range(2),
+            time_left=lambda: 0.05,
+            on_timeout=lambda item, started, error: (item, started, error)
+        )
+        release.set()
+        done.wait(1)
+
+        self.assertEqual(result, [0, (1, True, None)])
+        self.assertEqual(committed, {0: True, 1: False})
+
+    def test_run_inline_gives_up_when_out_of_time(self):
+        out_of_time_at = time.monotonic() + 0.05
+
+        def work(item):
+            time.sleep(0.03)
+
+            return item
+
+        result = Executor(max_workers=1).run(
+            work, range(4),
+            time_left=lambda: out_of_time_at - time.monotonic(),
+            on_timeout=lambda item, started, error: (item, started, error)
+        )
+
+        self.assertEqual(
+            result, [0, 1, (2, False, None), (3, False, None)]
+        )
+
+    def test_requeued_items_let_other_work_run(self):
+        for workers in (1, 2):
+            finished = []
+            attempts = []
+
+            def work(item):
+                if item == 0:
+                    attempts.append(retry._ATTEMPT.get())
+
+                    if len(attempts) < 3:
+                        raise RetryLater(0.02, len(attempts))
+
+                finished.append(item)
+
+                return item * 10
+
+            result = Executor(max_workers=workers).map(work, range(3))
+
+            self.assertEqual(result, [0, 10, 20])
+            self.assertEqual(attempts, [0, 1, 2])
+            self.assertEqual(finished, [1, 2, 0])
+
+    def test_requeued_items_given_up_when_out_of_time(self):
+        error = requests.HTTPError('503 Error')
+
+        for workers in (1, 2):
+            out_of_time_at = time.monotonic() + 0.05
+
+            def work(item):
+                if item == 1:
+                    raise RetryLater(0.01, 1, error)
+
+                return item
+
+            result = Executor(max_workers=workers).run(
+                work, range(3),
+                time_left=lambda: out_of_time_at - time.monotonic(),
+                on_timeout=lambda item, started, error: (item, started, error)
+            )
+
+            self.assertEqual(result, [0, (1, True, error), 2])
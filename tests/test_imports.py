@@ -0,0 +1,35 @@
+import sys
+import unittest
+
+from keydra.imports import ImportTimer
+from keydra.imports import lazy_import
+
+
+class TestImports(unittest.TestCase):
+    def test_lazy_import_on_first_use(self):
+        sys.modules.pop('colorsys', None)
+
+        colorsys = lazy_import('colorsys')
+        rgb_to_hsv = lazy_import('colorsys', 'rgb_to_hsv')
+
+        self.assertNotIn('colorsys', sys.modules)
+        self.assertEqual(rgb_to_hsv(1, 0, 0), (0.0, 1.0, 1))
+        self.assertIn('colorsys', sys.modules)
+        self.assertIs(colorsys.rgb_to_hsv, sys.modules['colorsys'].rgb_to_hsv)
+
+    def test_import_timer(self):
+        sys.modules.pop('sched', None)
+        timer = ImportTimer()
+        timer.install()
+
+        try:
+            __import__('sched')
+        finally:
+            timer.uninstall()
+
+        report = timer.report()
+
+        self.assertIn('sched', [m['module'] for m in report['slowest']])
+        self.assertNotEqual(
+            type(sys.modules['sched'].__loader__).__name__, '_TimedLoader'
+        )
@@ -1,11 +1,21 @@
+from keydra import deadline as km_deadline
+from keydra import limiter
+from keydra import retry
 from keydra.clients.aws.cloudwatch import CloudwatchClient
+from keydra.deadline import Deadline
 from keydra.keydra import Keydra
+from keydra.limiter import AdaptiveLimits
+from keydra.model import RotationResult
+import threading
+import time
 import unittest
 
 from unittest.mock import Mock, call
 from unittest.mock import MagicMock
 from unittest.mock import patch
 
+from tests.helpers import http_error
+
 
 CONFIG = [
     {
@@ -174,9 +184,402 @@ class TestKeydra(unittest.TestCase):
 
         self.assertEqual(result[0]['rotate_secret']['status'], 'success')
         self.assertEqual(result[0]['distribute_secret']['status'], 'success')
+        self.assertLessEqual(
+            {'client_build', 'rotate', 'redact', 'distribute'},
+            {t['phase'] for t in result[0]['timings']}
+        )
         self._cfg.load_secrets.assert_called_once_with(
             secrets=CONFIG, rotate='nightly', batch_number=None, number_of_batches=None)
 
+    def test__rotate_and_distribute_concurrently_keeps_order(self):
+        specs = [
+            {'provider': 'iam', 'key': 'user_{}'.format(i)} for i in range(6)
+        ]
+        threads = set()
+
+        def rotate(secret):
+            threads.add(threading.current_thread())
+            time.sleep(0.01 * (6 - int(secret['key'][-1])))
+
+            return {
+                'status': 'success',
+                'action': 'rotate_secret',
+                'value': {'key': secret['key']}
+            }
+
+        kdra = Keydra(
+            cfg=self._cfg, cw=MagicMock(), concurrency=3,
+            provider_concurrency={'iam': 3}
+        )
+        self._cfg.load_secrets.return_value = specs
+
+        with patch.object(kdra, '_rotate_secret', side_effect=rotate), \
+                patch.object(kdra, '_redact_secrets', side_effect=lambda r, s: r):
+            result = kdra.rotate_and_distribute(
+                run_for_secrets=None, rotate='nightly'
+            )
+
+        self.assertEqual(
+            [r['key'] for r in result], [s['key'] for s in specs]
+        )
+        self.assertEqual(
+            [r['rotate_secret']['value']['key'] for r in result],
+            [s['key'] for s in specs]
+        )
+        self.assertGreater(len(threads), 1)
+
+    def test__rotate_and_distribute_waits_for_rotatewith(self):
+        specs = [
+            {
+                'provider': 'splunk',
+                'key': 'splunk_user',
+                'config': {
+                    'rotatewith': {'provider': 'secretsmanager', 'key': 'splunk/admin'}
+                }
+            },
+            {
+                'provider': 'secretsmanager',
+                'key': 'splunk_admin_source',
+                'distribute': [{'provider': 'secretsmanager', 'key': 'splunk/admin'}]
+            }
+        ]
+        finished = []
+
+        def rotate(secret):
+            if secret['provider'] == 'secretsmanager':
+                time.sleep(0.02)
+
+            finished.append(secret['key'])
+
+            return {'status': 'fail', 'action': 'rotate_secret', 'msg': ''}
+
+        kdra = Keydra(cfg=self._cfg, cw=MagicMock(), concurrency=2)
+        self._cfg.load_secrets.return_value = specs
+
+        with patch.object(kdra, '_rotate_secret', side_effect=rotate):
+            result = kdra.rotate_and_distribute(
+                run_for_secrets=None, rotate='adhoc'
+            )
+
+        self.assertEqual(finished, ['splunk_admin_source', 'splunk_user'])
+        self.assertEqual(
+            [r['key'] for r in result], ['splunk_user', 'splunk_admin_source']
+        )
+
+    def test__rotate_and_distribute_out_of_time(self):
+        deadline = MagicMock()
+        deadline.admits.side_effect = [True, False]
+        deadline.time_left.return_value = 60
+        self._cfg.load_secrets.return_value = [
+            {'provider': 'iam', 'key': 'first'},
+            {'provider': 'iam', 'key': 'second'}
+        ]
+        self._cfg.sid_for.return_value = 'second_sid'
+
+        kdra = Keydra(cfg=self._cfg, cw=MagicMock(), deadline=deadline)
+
+        with patch.object(
+            kdra, '_rotate_secret',
+            return_value={'status': 'fail', 'action': 'rotate_secret', 'msg': ''}
+        ) as rotate:
+            result = kdra.rotate_and_distribute(
+                run_for_secrets=None, rotate='adhoc'
+            )
+
+        rotate.assert_called_once()
+        self.assertEqual(result[0]['rotate_secret']['status'], 'fail')
+        self.assertEqual(result[1]['rotate_secret']['status'], 'not_started')
+        self.assertEqual(result[1]['sid'], 'second_sid')
+        self.assertEqual(result[1]['secret_id'], 'iam::second')
+
+    @patch('keydra.loader.checkout_client')
+    def test__rotate_and_distribute_deadline_exceeded(self, mk_checkout):
+        timeouts = []
+
+        def rotate(secret):
+            timeouts.append(km_deadline.call_timeout())
+
+        km = MagicMock()
+        km.validate_spec.return_value = (True, '')
+        km.rotate.side_effect = rotate
+        mk_checkout.return_value = (km, None)
+        self._cfg.load_secrets.return_value = [
+            {'provider': 'qualys', 'key': 'first'}
+        ]
+
+        kdra = Keydra(
+            cfg=self._cfg, cw=MagicMock(),
+            deadline=Deadline(30000, reserve=0, ceilings={'qualys': 10})
+        )
+        kdra.rotate_and_distribute(run_for_secrets=None, rotate='adhoc')
+
+        self.assertEqual(timeouts, [10])
+
+        # Admitted, but out of time by the time of the call
+        km.validate_spec.side_effect = lambda spec: time.sleep(0.1) or (True, '')
+        kdra = Keydra(
+            cfg=self._cfg, cw=MagicMock(),
+            deadline=Deadline(5050, reserve=0, floor=5)
+        )
+        result = kdra.rotate_and_distribute(
+            run_for_secrets=None, rotate='adhoc'
+        )
+
+        self.assertEqual(result[0]['rotate_secret']['status'], 'fail')
+        self.assertIn(
+            'Run deadline exceeded', result[0]['rotate_secret']['msg']
+        )
+
+    def test__rotate_and_distribute_skips_secrets_in_ledger(self):
+        ledger = MagicMock()
+        ledger.run_key = 'nightly-2021-01-03'
+        ledger.done.side_effect = lambda secret: secret['key'] == 'done'
+        self._cfg.load_secrets.return_value = [
+            {'provider': 'iam', 'key': 'done'},
+            {'provider': 'iam', 'key': 'todo'}
+        ]
+
+        kdra = Keydra(cfg=self._cfg, cw=MagicMock(), ledger=ledger)
+
+        with patch.object(
+            kdra, '_rotate_secret',
+            return_value={'status': 'fail', 'action': 'rotate_secret', 'msg': ''}
+        ) as rotate:
+            result = kdra.rotate_and_distribute(
+                run_for_secrets=None, rotate='adhoc'
+            )
+
+        rotate.assert_called_once_with({'provider': 'iam', 'key': 'todo'})
+        self.assertEqual(result[0]['rotate_secret']['status'], 'skipped')
+        self.assertEqual(result[1]['rotate_secret']['status'], 'fail')
+        ledger.record.assert_called_once_with(
+            {'provider': 'iam', 'key': 'todo'}, result[1]
+        )
+
+    @patch('keydra.loader.invalidate_credentials')
+    def test__rotate_and_distribute_abandoned_secrets_not_recorded(self, mk_invalidate):
+        ledger = MagicMock()
+        ledger.done.return_value = False
+        deadline = MagicMock()
+        deadline.admits.return_value = True
+        deadline.time_left.return_value = 0.05
+        self._cfg.load_secrets.return_value = [
+            {'provider': 'iam', 'key': 'fast'},
+            {'provider': 'iam', 'key': 'slow'}
+        ]
+        release = threading.Event()
+        finished = threading.Event()
+
+        def rotate(secret):
+            if secret['key'] == 'slow':
+                release.wait(1)
+
+            return {'status': 'fail', 'action': 'rotate_secret', 'msg': ''}
+
+        kdra = Keydra(
+            cfg=self._cfg, cw=MagicMock(), concurrency=2, deadline=deadline,
+            ledger=ledger
+        )
+        finish = kdra._finished
+
+        def finished_slow(secret, progress):
+            try:
+                return finish(secret, progress)
+            finally:
+                if secret['key'] == 'slow':
+                    finished.set()
+
+        with patch.object(kdra, '_rotate_secret', side_effect=rotate), \
+                patch.object(kdra, '_finished', side_effect=finished_slow):
+            result = kdra.rotate_and_distribute(
+                run_for_secrets=None, rotate='adhoc'
+            )
+            release.set()
+            self.assertTrue(finished.wait(1))
+
+        self.assertEqual(result[1]['rotate_secret']['status'], 'in_progress')
+        ledger.record.assert_called_once_with(
+            {'provider': 'iam', 'key': 'fast'}, result[0]
+        )
+        self.assertEqual(mk_invalidate.call_count, 1)
+
+    def test__distribute_secret_in_parallel(self):
+        targets = [
+            {'provider': 'bitbucket', 'key': 'VAR_{}'.format(i)}
+            for i in range(8)
+        ]
+        threads = set()
+
+        def distribute(target, secret):
+            threads.add(threading.current_thread())
+            time.sleep(0.01)
+
+            if target['key'] == 'VAR_3':
+                return self._kdra._fail('Boom')
+
+            return self._kdra._success(target)
+
+        kdra = Keydra(
+            cfg=self._cfg, cw=MagicMock(), distribution_concurrency=4
+        )
+
+        with patch.object(
+            kdra, '_distribute_single_secret', side_effect=distribute
+        ):
+            result = kdra._distribute_secret(
+                {'provider': 'iam', 'key': 'user', 'distribute': targets},
+                {'key': 'a', 'secret': 'b'}
+            )
+
+        self.assertEqual(result['status'], 'partial_success')
+        self.assertEqual(
+            [r.get('value', {}).get('key') for r in result['value']],
+            [t['key'] if t['key'] != 'VAR_3' else None for t in targets]
+        )
+        self.assertGreater(len(threads), 1)
+
+    @patch('keydra.loader.checkout_client')
+    @patch('keydra.loader.load_provider_client')
+    def test__distribute_secret_requeues_retries(self, mk_load, mk_checkout):
+        failures = [http_error(503)]
+        calls = []
+
+        class Provider(object):
+            load_config = None
+
+            @retry.retrying(retries=2, base=0.01, cap=0.01)
+            def distribute(self, secret, target):
+                calls.append(target['key'])
+
+                if target['key'] == 'A' and failures:
+                    raise failures.pop()
+
+                return target['key']
+
+        mk_load.return_value.validate_spec.return_value = (True, '')
+        mk_checkout.return_value = (Provider(), None)
+
+        spec = {
+            'provider': 'iam',
+            'key': 'user',
+            'distribute': [
+                {'provider': 'bitbucket', 'key': 'A'},
+                {'provider': 'bitbucket', 'key': 'B'}
+            ]
+        }
+        progress = {}
+
+        with patch('keydra.loader.release_client'):
+            # A is left to the executor of the run to retry
+            with self.assertRaises(retry.RetryLater) as ctx:
+                self._kdra._distribute_secret(
+                    spec, {'key': 'a', 'secret': 'b'}, progress
+                )
+
+            self.assertEqual(ctx.exception.attempt, 1)
+            self.assertEqual(list(progress['targets']), [1])
+
+            time.sleep(ctx.exception.delay)
+
+            result = self._kdra._distribute_secret(
+                spec, {'key': 'a', 'secret': 'b'}, progress
+            )
+
+        self.assertEqual(result['status'], 'success')
+        self.assertEqual([r['value'] for r in result['value']], ['A', 'B'])
+
+        # B went ahead while A was waiting to be retried
+        self.assertEqual(calls, ['A', 'B', 'A'])
+
+    def _distribution_retried(self, kdra, retries):
+        rotated = []
+        distributed = []
+
+        def rotate(secret):
+            rotated.append(secret['key'])
+
+            return {'status': 'success', 'action': 'rotate_secret', 'value': 'v'}
+
+        def distribute(target, secret):
+            distributed.append(target['key'])
+
+            if target['key'] == 'A' and len(distributed) <= retries:
+                raise retry.RetryLater(
+                    0.02, retry._ATTEMPT.get() + 1, http_error(503)
+                )
+
+            return kdra._success(target['key'])
+
+        self._cfg.load_secrets.return_value = [
+            {
+                'provider': 'iam', 'key': 'first',
+                'distribute': [{'provider': 'bitbucket', 'key': 'A'}]
+            },
+            {'provider': 'iam', 'key': 'second'}
+        ]
+
+        with patch.object(kdra, '_rotate_secret', side_effect=rotate), \
+                patch.object(kdra, '_redact_secrets', side_effect=lambda r, s: r), \
+                patch.object(
+                    kdra, '_distribute_single_secret', side_effect=distribute
+                ):
+            result = kdra.rotate_and_distribute(
+                run_for_secrets=None, rotate='adhoc'
+            )
+
+        return result, rotated, distributed
+
+    def test__rotate_and_distribute_requeues_distributions(self):
+        kdra = Keydra(cfg=self._cfg, cw=MagicMock())
+
+        result, rotated, distributed = self._distribution_retried(kdra, 2)
+
+        # Rotated once, the second secret going ahead in the meantime
+        self.assertEqual(rotated, ['first', 'second'])
+        self.assertEqual(distributed, ['A', 'A', 'A'])
+        self.assertEqual(result[0]['distribute_secret']['status'], 'success')
+        self.assertEqual(kdra._progress, {})
+
+    def test__rotate_and_distribute_distribution_given_up(self):
+        deadline = MagicMock()
+        deadline.admits.return_value = True
+        out_of_time_at = time.monotonic() + 0.1
+        deadline.time_left.side_effect = lambda: out_of_time_at - time.monotonic()
+
+        kdra = Keydra(cfg=self._cfg, cw=MagicMock(), deadline=deadline)
+
+        result, rotated, _ = self._distribution_retried(kdra, 10)
+
+        self.assertEqual(rotated, ['first', 'second'])
+        self.assertEqual(result[0]['rotate_secret']['status'], 'success')
+        self.assertEqual(result[0]['distribute_secret']['status'], 'fail')
+        self.assertIn(
+            '503 Error', result[0]['distribute_secret']['value'][0]['msg']
+        )
+        self.assertEqual(kdra._progress, {})
+
+    def test__rotate_and_distribute_retry_given_up(self):
+        deadline = MagicMock()
+        deadline.admits.return_value = True
+        out_of_time_at = time.monotonic() + 0.05
+        deadline.time_left.side_effect = lambda: out_of_time_at - time.monotonic()
+        self._cfg.load_secrets.return_value = [
+            {'provider': 'iam', 'key': 'first'}
+        ]
+
+        kdra = Keydra(cfg=self._cfg, cw=MagicMock(), deadline=deadline)
+
+        with patch.object(
+            kdra, '_rotate_secret',
+            side_effect=retry.RetryLater(10, 1, http_error(503))
+        ):
+            result = kdra.rotate_and_distribute(
+                run_for_secrets=None, rotate='adhoc'
+            )
+
+        self.assertEqual(result[0]['rotate_secret']['status'], 'fail')
+        self.assertIn('503 Error', result[0]['rotate_secret']['msg'])
+
     def test__distribute_secret_failure(self):
         result = self._kdra._distribute_secret({
             'provider': 'IAM',
@@ -194,25 +597,25 @@ class TestKeydra(unittest.TestCase):
                       result['value'][0]['msg'])
 
     def test__default_response(self):
-        self.assertTrue(isinstance(self._kdra._default_response('s'), dict))
+        self.assertTrue(isinstance(self._kdra._default_response('s'), RotationResult))
         self.assertIn('status', self._kdra._default_response('s'))
         self.assertIn('msg', self._kdra._default_response('s', msg='m'))
         self.assertIn('action', self._kdra._default_response('s', action='a'))
         self.assertIn('value', self._kdra._default_response('s', value='v'))
 
     def test__success(self):
-        self.assertTrue(isinstance(self._kdra._success('m'), dict))
+        self.assertTrue(isinstance(self._kdra._success('m'), RotationResult))
         self.assertEqual(self._kdra._success('m')['status'], 'success')
 
     def test__partial_success(self):
         self.assertTrue(isinstance(
-            self._kdra._partial_success('v', 'm'), dict))
+            self._kdra._partial_success('v', 'm'), RotationResult))
         self.assertEqual(
             self._kdra._partial_success('v', 'm')['status'], 'partial_success'
         )
 
     def test__fail(self):
-        self.assertTrue(isinstance(self._kdra._fail('m'), dict))
+        self.assertTrue(isinstance(self._kdra._fail('m'), RotationResult))
         self.assertEqual(self._kdra._fail('m')['status'], 'fail')
 
     def test__emit_spec_metrics(self):
@@ -402,3 +805,23 @@ class TestKeydra(unittest.TestCase):
                 )
             ]
         )
+
+    def test__emit_limit_metrics(self):
+        kdra = Keydra(
+            cfg=self._cfg, cw=MagicMock(), provider_concurrency={'github': 4}
+        )
+
+        with kdra._provider_limits.limit('github'):
+            pass
+
+        with patch.object(limiter, 'HOSTS', AdaptiveLimits(8)) as hosts:
+            hosts.get('api.github.com')
+
+            kdra._emit_result_metrics(SUCCESS)
+
+        kdra._cw.put_concurrency_limit.assert_has_calls(
+            [
+                call('provider', 'github', 4),
+                call('host', 'api.github.com', 8)
+            ]
+        )
@@ -1,8 +1,11 @@
 import app
+import sys
 import unittest
 
 from unittest.mock import MagicMock, patch
 
+from keydra.imports import ImportTimer
+
 
 class TestLambda(unittest.TestCase):
     def setUp(self):
@@ -19,6 +22,20 @@ class TestLambda(unittest.TestCase):
 
         self.assertEqual(result, rotation_result)
 
+    @patch('keydra.async_keydra.AsyncKeydra.rotate_and_distribute')
+    @patch('app._load_keydra_config')
+    def test_lambda_handler_asyncio(self, lkc, rad: MagicMock):
+        rotation_result = [
+            {'rotate_secret': 'success', 'distribute_secret': 'success'}]
+        rad.return_value = rotation_result
+
+        result = app.lambda_handler(
+            event={'trigger': 'adhoc', 'asyncio': True}, context=None
+        )
+
+        self.assertEqual(result, rotation_result)
+        rad.assert_called_once()
+
     @patch('keydra.keydra.Keydra.rotate_and_distribute')
     @patch('app._load_keydra_config')
     def test_lambda_handler_failure(self, lkc, rad):
@@ -28,3 +45,156 @@ class TestLambda(unittest.TestCase):
 
         with self.assertRaises(Exception):
             app.lambda_handler(event={'trigger': 'adhoc'}, context=None)
+
+    @patch('app.CW')
+    @patch('keydra.keydra.Keydra.rotate_and_distribute')
+    @patch('app._load_keydra_config')
+    def test_lambda_handler_flushes_metrics(self, lkc, rad, cw):
+        rad.side_effect = Exception('Boom')
+
+        with self.assertRaises(Exception):
+            app.lambda_handler(event={'trigger': 'adhoc'}, context=None)
+
+        cw.flush.assert_called_once_with()
+
+    @patch('app.LOGGER')
+    @patch('keydra.keydra.Keydra.rotate_and_distribute')
+    @patch('app._load_keydra_config')
+    def test_lambda_handler_profile(self, lkc, rad, logger):
+        rad.return_value = []
+
+        app.lambda_handler(
+            event={'trigger': 'adhoc', 'profile': 'cprofile', 'profile_top': 2},
+            context=None
+        )
+
+        profile = [
+            c[0][0]['data'] for c in logger.info.call_args_list
+            if isinstance(c[0][0], dict) and c[0][0]['message'] == 'Profile of the run'
+        ][0]
+        self.assertEqual(profile['mode'], 'cprofile')
+        self.assertEqual(len(profile['hot_functions']), 2)
+
+    @patch('app.LOGGER')
+    @patch('keydra.keydra.Keydra.rotate_and_distribute')
+    @patch('app._load_keydra_config')
+    def test_lambda_handler_import_report(self, lkc, rad, logger):
+        def run(**kwargs):
+            sys.modules.pop('sched', None)
+            __import__('sched')
+
+            return []
+
+        rad.side_effect = run
+
+        app.lambda_handler(
+            event={'trigger': 'adhoc', 'import_report': True}, context=None
+        )
+
+        report = [
+            c[0][0]['data'] for c in logger.info.call_args_list
+            if isinstance(c[0][0], dict) and c[0][0]['message'] == 'Imports of the run'
+        ][0]
+        self.assertIn('sched', [m['module'] for m in report['slowest']])
+        self.assertFalse(
+            any(isinstance(f, ImportTimer) for f in sys.meta_path)
+        )
+
+    @patch('keydra.keydra.Keydra.rotate_and_distribute')
+    @patch('app._load_keydra_config')
+    def test_lambda_handler_no_import_report(self, lkc, rad):
+        hooked = []
+
+        def run(**kwargs):
+            hooked.extend(isinstance(f, ImportTimer) for f in sys.meta_path)
+
+            return []
+
+        rad.side_effect = run
+
+        app.lambda_handler(event={'trigger': 'adhoc'}, context=None)
+
+        self.assertFalse(any(hooked))
+
+    @patch('keydra.keydra.Keydra.rotate_and_distribute')
+    @patch('app._load_keydra_config')
+    def test_lambda_handler_failed_distribution(self, lkc, rad):
+        rad.return_value = [
+            {
+                'rotate_secret': {'status': 'success'},
+                'distribute_secret': {'status': 'fail'}
+            }
+        ]
+
+        with self.assertRaises(Exception):
+            app.lambda_handler(
+                event={'trigger': 'nightly', 'ledger': True}, context=None
+            )
+
+    @patch('app.LOGGER')
+    @patch('keydra.keydra.Keydra.rotate_and_distribute')
+    @patch('app._load_keydra_config')
+    def test_lambda_handler_out_of_time(self, lkc, rad, logger):
+        rotation_result = [
+            {'sid': 'done', 'rotate_secret': {'status': 'success'}},
+            {'sid': 'todo', 'rotate_secret': {'status': 'not_started'}}
+        ]
+        rad.return_value = rotation_result
+        context = MagicMock()
+        context.get_remaining_time_in_millis.return_value = 900000
+
+        result = app.lambda_handler(event={'trigger': 'nightly'}, context=context)
+
+        self.assertEqual(result, rotation_result)
+        self.assertEqual(
+            logger.warning.call_args[0][0]['data']['follow_up'],
+            {'trigger': 'adhoc', 'secrets': ['todo']}
+        )
+
+    @patch('app.Keydra')
+    @patch('app._load_keydra_config')
+    def test_lambda_handler_ledger_opt_in(self, lkc, kdra):
+        kdra.return_value.rotate_and_distribute.return_value = []
+
+        app.lambda_handler(event={'trigger': 'nightly'}, context=None)
+
+        self.assertIsNone(kdra.call_args[1]['ledger'])
+
+        app.lambda_handler(
+            event={'trigger': 'nightly', 'ledger': True}, context=None
+        )
+
+        self.assertEqual(kdra.call_args[1]['ledger'].run_key[:8], 'nightly-')
+
+    @patch('app.LOGGER')
+    @patch('app.Keydra')
+    @patch('app._load_keydra_config')
+    def test_lambda_handler_failure_warns_of_retries(self, lkc, kdra, logger):
+        kdra.return_value.rotate_and_distribute.return_value = [
+            {'rotate_secret': {'status': 'fail'}}
+        ]
+
+        # Retried by Lambda, redoing the secrets rotated if landing on
+        # another execution environment than the ledger's
+        with self.assertRaises(Exception):
+            app.lambda_handler(
+                event={'trigger': 'nightly', 'ledger': True}, context=None
+            )
+
+        logger.warning.assert_called_once()
+
+    @patch('app.LOGGER')
+    @patch('app.Keydra')
+    @patch('app._load_keydra_config')
+    def test_lambda_handler_failure_without_ledger(self, lkc, kdra, logger):
+        response = [
+            {'secret_id': 'iam::a', 'rotate_secret': {'status': 'success'}},
+            {'secret_id': 'iam::b', 'rotate_secret': {'status': 'fail'}}
+        ]
+        kdra.return_value.rotate_and_distribute.return_value = response
+
+        # Not retried by Lambda, which would rotate every secret again
+        result = app.lambda_handler(event={'trigger': 'nightly'}, context=None)
+
+        self.assertEqual(result, response)
+        self.assertEqual(logger.error.call_args[0][0]['data'], ['iam::b'])
@@ -0,0 +1,93 @@
+import datetime
+import os
+import tempfile
+import unittest
+
+from keydra.ledger import LocalFileLedgerStore
+from keydra.ledger import RunLedger
+
+
+SECRET = {'provider': 'IAM', 'key': 'deploy_user'}
+
+NOW = datetime.datetime(2021, 1, 3, 12, tzinfo=datetime.timezone.utc)
+
+
+class TestRunLedger(unittest.TestCase):
+    def setUp(self):
+        self._dir = tempfile.TemporaryDirectory()
+        self._store = LocalFileLedgerStore(directory=self._dir.name)
+
+    def tearDown(self):
+        self._dir.cleanup()
+
+    def test_local_file_ledgers_are_not_durable(self):
+        ledger = RunLedger(self._store, 'nightly-2021-01-03')
+        ledger.record(SECRET, {'rotate_secret': {'status': 'success'}})
+
+        self.assertFalse(ledger.durable)
+
+        # A retry on another execution environment starts from an empty
+        # ledger, rotating the secret again
+        with tempfile.TemporaryDirectory() as other_dir:
+            retried = RunLedger(
+                LocalFileLedgerStore(directory=other_dir), 'nightly-2021-01-03'
+            )
+
+            self.assertFalse(retried.done(SECRET))
+
+    def test_windows(self):
+        self.assertEqual(
+            RunLedger.for_trigger('nightly', self._store, NOW).run_key,
+            'nightly-2021-01-03'
+        )
+        self.assertEqual(
+            RunLedger.for_trigger('weekly', self._store, NOW).run_key,
+            'weekly-2020-W53'
+        )
+        self.assertEqual(
+            RunLedger.for_trigger('monthly', self._store, NOW).run_key,
+            'monthly-2021-01'
+        )
+        self.assertIsNone(RunLedger.for_trigger('adhoc', self._store, NOW))
+
+    def test_only_complete_successes_are_recorded(self):
+        ledger = RunLedger(self._store, 'nightly-2021-01-03')
+
+        ledger.record(SECRET, {'rotate_secret': {'status': 'fail'}})
+        self.assertFalse(ledger.done(SECRET))
+
+        ledger.record(
+            SECRET,
+            {
+                'rotate_secret': {'status': 'success'},
+                'distribute_secret': {'status': 'partial_success'}
+            }
+        )
+        self.assertFalse(ledger.done(SECRET))
+
+        ledger.record(
+            SECRET,
+            {
+                'rotate_secret': {'status': 'success'},
+                'distribute_secret': {'status': 'success'}
+            }
+        )
+        self.assertTrue(ledger.done(SECRET))
+
+    def test_retried_run_picks_up_ledger(self):
+        RunLedger(self._store, 'nightly-2021-01-03').record(
+            SECRET, {'rotate_secret': {'status': 'success'}}
+        )
+
+        self.assertTrue(
+            RunLedger(self._store, 'nightly-2021-01-03').done(SECRET)
+        )
+        self.assertFalse(
+            RunLedger(self._store, 'nightly-2021-01-04').done(SECRET)
+        )
+
+    def test_corrupt_ledger_starts_afresh(self):
+        with open(os.path.join(self._dir.name, 'nightly-x.json'), 'w') as f:
+            f.write('{not json')
+
+        self.assertFalse(RunLedger(self._store, 'nightly-x').done(SECRET))
@@ -0,0 +1,247 @@
+import asyncio
+import unittest
+
+from unittest.mock import MagicMock
+
+import boto3
+import requests
+
+from botocore.awsrequest import AWSResponse
+from botocore.config import Config
+
+from keydra import deadline
+from keydra import limiter
+from keydra.deadline import Deadline
+from keydra.exceptions import DeadlineExceeded
+from keydra.limiter import AdaptiveLimit, AdaptiveLimits, AsyncAdaptiveLimit
+
+from tests.helpers import http_error
+
+
+class TestAdaptiveLimit(unittest.TestCase):
+    def test_grows_about_a_slot_per_round_of_successes(self):
+        limit = AdaptiveLimit(10)
+        limit._limit = 4
+
+        for _ in range(5):
+            limit.release(limit.acquire())
+
+        self.assertEqual(limit.limit, 5)
+
+    def test_never_grows_past_maximum(self):
+        limit = AdaptiveLimit(2)
+
+        for _ in range(10):
+            limit.release(limit.acquire())
+
+        self.assertEqual(limit.limit, 2)
+
+    def test_throttle_halves_once_per_burst(self):
+        limit = AdaptiveLimit(16)
+        tokens = [limit.acquire() for _ in range(8)]
+
+        for token in tokens:
+            limit.release(token, limiter.THROTTLED)
+
+        self.assertEqual(limit.limit, 8)
+        self.assertEqual(limit.throttles, 8)
+
+        limit.release(limit.acquire(), limiter.THROTTLED)
+
+        self.assertEqual(limit.limit, 4)
+
+    def test_never_cut_below_minimum(self):
+        limit = AdaptiveLimit(4, minimum=2)
+
+        for _ in range(5):
+            limit.release(limit.acquire(), limiter.THROTTLED)
+
+        self.assertEqual(limit.limit, 2)
+
+    def test_failures_leave_limit_alone(self):
+        limit = AdaptiveLimit(4)
+        limit._limit = 2
+
+        limit.release(limit.acquire(), limiter.FAILED)
+
+        self.assertEqual(limit._limit, 2)
+
+    def test_acquire_waits_for_a_slot(self):
+        limit = AdaptiveLimit(1)
+        token = limit.acquire()
+
+        self.assertIsNone(limit.acquire(timeout=0.01))
+
+        limit.release(token)
+
+        self.assertIsNotNone(limit.acquire(timeout=0.01))
+
+    def test_slot_classifies_errors(self):
+        limit = AdaptiveLimit(8)
+
+        with self.assertRaises(requests.HTTPError):
+            with limit.slot('api.github.com'):
+                raise http_error(429)
+
+        self.assertEqual(limit.limit, 4)
+
+        with self.assertRaises(requests.HTTPError):
+            with limit.slot('api.github.com'):
+                raise http_error(404)
+
+        self.assertEqual(limit.limit, 4)
+        self.assertEqual(limit.snapshot()['in_flight'], 0)
+
+    def test_slot_marked_throttled(self):
+        limit = AdaptiveLimit(8)
+
+        with limit.slot('api.github.com') as slot:
+            slot.throttled()
+
+        self.assertEqual(limit.limit, 4)
+
+    def test_slot_within_deadline(self):
+        limit = AdaptiveLimit(1)
+        token = limit.acquire()
+
+        with deadline.scope(Deadline(1000, floor=5)):
+            with self.assertRaises(DeadlineExceeded):
+                with limit.slot('api.github.com'):
+                    pass
+
+        limit.release(token)
+
+
+class TestAsyncAdaptiveLimit(unittest.TestCase):
+    def test_slots_awaited(self):
+        peak = []
+        limit = AdaptiveLimit(2)
+
+        async def call(slots):
+            async with slots.slot('bitbucket'):
+                peak.append(limit.snapshot()['in_flight'])
+                await asyncio.sleep(0.01)
+
+        async def run():
+            slots = AsyncAdaptiveLimit(limit)
+            await asyncio.gather(*[call(slots) for _ in range(6)])
+
+        asyncio.run(run())
+
+        self.assertEqual(max(peak), 2)
+        self.assertEqual(len(peak), 6)
+        self.assertEqual(limit.snapshot()['in_flight'], 0)
+
+    def test_slot_classifies_errors(self):
+        limit = AdaptiveLimit(8)
+
+        async def run():
+            with self.assertRaises(requests.HTTPError):
+                async with AsyncAdaptiveLimit(limit).slot('bitbucket'):
+                    raise http_error(429)
+
+        asyncio.run(run())
+
+        self.assertEqual(limit.limit, 4)
+        self.assertEqual(limit.snapshot()['in_flight'], 0)
+
+    def test_slot_within_deadline(self):
+        limit = AdaptiveLimit(1)
+        token = limit.acquire()
+
+        async def run():
+            with deadline.scope(Deadline(5050, floor=5)):
+                with self.assertRaises(DeadlineExceeded):
+                    async with AsyncAdaptiveLimit(limit).slot('bitbucket'):
+                        pass
+
+        asyncio.run(run())
+        limit.release(token)
+
+        self.assertEqual(limit.snapshot()['in_flight'], 0)
+
+
+class TestAdaptiveLimits(unittest.TestCase):
+    def test_limits_by_key(self):
+        limits = AdaptiveLimits(10, maximums={'api.bitbucket.org': 2})
+
+        self.assertIs(limits.get('api.github.com'), limits.get('api.github.com'))
+        self.assertEqual(limits.get('api.github.com').limit, 10)
+        self.assertEqual(limits.get('api.bitbucket.org').limit, 2)
+
+        self.assertEqual(
+            limits.snapshot(),
+            {
+                'api.bitbucket.org': {
+                    'limit': 2, 'maximum': 2, 'in_flight': 0, 'throttles': 0
+                },
+                'api.github.com': {
+                    'limit': 10, 'maximum': 10, 'in_flight': 0, 'throttles': 0
+                }
+            }
+        )
+
+    def test_host_of(self):
+        self.assertEqual(
+            limiter.host_of('https://api.github.com/user/keys'),
+            'api.github.com'
+        )
+
+
+class TestLimitClient(unittest.TestCase):
+    def setUp(self):
+        self.hosts = AdaptiveLimits(8)
+        self._hosts, limiter.HOSTS = limiter.HOSTS, self.hosts
+
+        self.client = limiter.limit_client(
+            boto3.session.Session(
+                aws_access_key_id='a', aws_secret_access_key='b',
+                region_name='ap-southeast-2'
+            ).client('iam', config=Config(retries={'total_max_attempts': 1}))
+        )
+
+    def tearDown(self):
+        limiter.HOSTS = self._hosts
+
+    def _respond(self, status, body):
+        raw = MagicMock()
+        raw.stream.return_value = [body]
+
+        self.client.meta.events.register(
+            'before-send',
+            lambda **kwargs: AWSResponse(
+                self.client.meta.endpoint_url, status, {}, raw
+            )
+        )
+
+    def test_calls_held_to_host_limit(self):
+        self._respond(
+            200,
+            b'<ListUsersResponse><ListUsersResult><Users/></ListUsersResult>'
+            b'</ListUsersResponse>'
+        )
+
+        self.client.list_users()
+
+        limit = self.hosts.snapshot()['iam.amazonaws.com']
+
+        self.assertEqual(limit['in_flight'], 0)
+        self.assertEqual(limit['throttles'], 0)
+
+    def test_throttling_cuts_host_limit(self):
+        self._respond(
+            400,
+            b'<ErrorResponse><Error><Code>Throttling</Code>'
+            b'<Message>Rate exceeded</Message></Error></ErrorResponse>'
+        )
+
+        with self.assertRaises(self.client.exceptions.ClientError):
+            self.client.list_users()
+
+        limit = self.hosts.snapshot()['iam.amazonaws.com']
+
+        self.assertEqual(limit['limit'], 4)
+        self.assertEqual(limit['in_flight'], 0)
+
+    def test_after_call_without_slot(self):
+        limiter._after_call(MagicMock(status_code=200), {}, {})
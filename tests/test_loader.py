@@ -55,6 +55,131 @@ class TestLoader(unittest.TestCase):
 
         mk_sm.assert_called_once_with(key_id)
 
+    @patch('keydra.loader.SECRETS_MANAGER.get_secret_value')
+    def test_fetch_provider_creds_cached_within_run(self, mk_sm):
+        mk_sm.return_value = json.dumps({'a': 'b'})
+        loader.CREDENTIALS.clear()
+
+        with loader.CREDENTIALS.scope():
+            first = loader.fetch_provider_creds('bitbucket', None)
+            first['a'] = 'changed'
+            second = loader.fetch_provider_creds('bitbucket', None)
+
+        loader.CREDENTIALS.clear()
+
+        mk_sm.assert_called_once_with('keydra/bitbucket')
+        self.assertEqual(second, {'a': 'b'})
+
+    @patch('keydra.loader.SECRETS_MANAGER.get_secret_value')
+    @patch('keydra.loader.SECRETS_MANAGER._client')
+    def test_prefetch_provider_creds_batch(self, mk_client, mk_sm):
+        mk_client.batch_get_secret_value.side_effect = [
+            {
+                'SecretValues': [
+                    {'Name': 'keydra/github', 'SecretString': '{}', 'VersionId': 'v1'}
+                ],
+                'NextToken': 'next'
+            },
+            {
+                'SecretValues': [
+                    {'Name': 'keydra/bitbucket', 'SecretString': '{}', 'VersionId': 'v2'}
+                ]
+            }
+        ]
+        loader.CREDENTIALS.clear()
+
+        with loader.CREDENTIALS.scope():
+            loader.prefetch_provider_creds({'keydra/github', 'keydra/bitbucket'})
+            loader.fetch_provider_creds('github', None)
+            loader.fetch_provider_creds('bitbucket', None)
+
+            self.assertEqual(loader.CREDENTIALS.version('keydra/bitbucket'), 'v2')
+
+        loader.CREDENTIALS.clear()
+
+        mk_client.batch_get_secret_value.assert_called_with(
+            SecretIdList=['keydra/bitbucket', 'keydra/github'], NextToken='next'
+        )
+        mk_sm.assert_not_called()
+
+    @patch('keydra.loader.SECRETS_MANAGER.get_secret_value')
+    @patch('keydra.loader.SECRETS_MANAGER.batch_get_secret_values')
+    def test_prefetch_provider_creds_fallback(self, mk_batch, mk_sm):
+        mk_batch.side_effect = AttributeError('batch_get_secret_value')
+        mk_sm.side_effect = lambda secret_id: {
+            'keydra/github': '{}'
+        }.get(secret_id) or self._raise(ClientError({}, 'getsecret'))
+        loader.CREDENTIALS.clear()
+
+        with loader.CREDENTIALS.scope():
+            loader.prefetch_provider_creds({'keydra/github', 'keydra/missing'})
+
+            self.assertTrue(loader.CREDENTIALS.fresh('keydra/github'))
+            self.assertFalse(loader.CREDENTIALS.fresh('keydra/missing'))
+
+        loader.CREDENTIALS.clear()
+
+    @patch('keydra.loader.SECRETS_MANAGER.current_version')
+    @patch('keydra.loader.SECRETS_MANAGER.batch_get_secret_values')
+    def test_prefetch_provider_creds_drops_stale(self, mk_batch, mk_version):
+        mk_version.side_effect = lambda secret_id: {
+            'keydra/github': 'v1', 'keydra/gitlab': 'v3'
+        }[secret_id]
+        mk_batch.return_value = {'keydra/gitlab': ('{"new": 1}', 'v3')}
+        loader.CREDENTIALS.clear()
+
+        with loader.CREDENTIALS.scope():
+            loader.CREDENTIALS.put('keydra/github', '{}', version_id='v1')
+            loader.CREDENTIALS.put('keydra/gitlab', '{}', version_id='v2')
+            loader.CREDENTIALS.put('keydra/bitbucket', '{}')
+
+            loader.prefetch_provider_creds(
+                {'keydra/github', 'keydra/gitlab', 'keydra/bitbucket'}
+            )
+
+            self.assertEqual(loader.CREDENTIALS.version('keydra/github'), 'v1')
+            self.assertEqual(
+                loader.fetch_provider_creds('gitlab', None), {'new': 1}
+            )
+            # Cached without a version, so couldn't be checked (and re-read)
+            self.assertFalse(loader.CREDENTIALS.fresh('keydra/bitbucket'))
+
+        loader.CREDENTIALS.clear()
+
+        mk_batch.assert_called_once_with(['keydra/bitbucket', 'keydra/gitlab'])
+        self.assertEqual(
+            sorted(c.args[0] for c in mk_version.call_args_list),
+            ['keydra/github', 'keydra/gitlab']
+        )
+
+    @patch('keydra.loader.load_provider_client')
+    @patch('keydra.loader.SECRETS_MANAGER.get_secret_value')
+    def test_checkout_client_reuses_clients(self, mk_sm, mk_lpc):
+        mk_sm.return_value = '{}'
+        mk_lpc.return_value.has_creds.return_value = True
+        mk_lpc.return_value.side_effect = lambda **kwargs: MagicMock()
+
+        with loader.run_scope():
+            first, lease = loader.checkout_client('github', None)
+            loader.release_client(first, lease)
+
+            second, lease = loader.checkout_client('github', None)
+            loader.release_client(second, lease)
+
+            loader.invalidate_credentials({'keydra/github'})
+            third, _ = loader.checkout_client('github', None)
+
+        loader.CREDENTIALS.clear()
+        loader.CLIENT_POOL.clear()
+
+        self.assertIs(first, second)
+        self.assertIsNot(second, third)
+        self.assertEqual(mk_sm.call_count, 2)
+
+    @staticmethod
+    def _raise(e):
+        raise e
+
     def test_load_provider_client_exists(self):
         c = loader.load_provider_client('iam')
 
@@ -0,0 +1,98 @@
+import io
+import json
+import unittest
+
+from keydra.metrics import CloudwatchBackend
+from keydra.metrics import EmfBackend
+from keydra.metrics import MetricsBuffer
+
+from unittest.mock import MagicMock
+
+
+class TestMetrics(unittest.TestCase):
+    def test_cloudwatch_backend_batches_calls(self):
+        client = MagicMock()
+
+        CloudwatchBackend(client).publish(
+            'Keydra', [{'MetricName': str(i), 'Value': i} for i in range(2500)]
+        )
+
+        self.assertEqual(
+            [len(c[1]['MetricData']) for c in client.put_metric_data.call_args_list],
+            [1000, 1000, 500]
+        )
+
+    def test_buffer_aggregates_values(self):
+        backend = MagicMock()
+        buffer = MetricsBuffer(backend)
+
+        for value in [1, 1, 3]:
+            buffer.record('Time', value, {'Action': 'a'}, unit='Seconds')
+
+        buffer.record('Time', 5, {'Action': 'b'}, unit='Seconds')
+        buffer.flush()
+        buffer.flush()
+
+        backend.publish.assert_called_once()
+        namespace, data = backend.publish.call_args[0]
+
+        self.assertEqual(namespace, 'Keydra')
+        self.assertEqual(
+            [(d['Dimensions'][0]['Value'], d['Values'], d['Counts']) for d in data],
+            [('a', [1, 3], [2, 1]), ('b', [5], [1])]
+        )
+
+    def test_buffer_splits_values_and_flushes_when_full(self):
+        backend = MagicMock()
+        buffer = MetricsBuffer(backend, max_datums=3)
+
+        for value in range(200):
+            buffer.record('Time', value)
+
+        backend.publish.assert_not_called()
+
+        buffer.record('Other', 1)
+
+        backend.publish.assert_called_once()
+        data = backend.publish.call_args[0][1]
+
+        self.assertEqual([len(d['Values']) for d in data], [150, 50, 1])
+
+    def test_buffer_never_raises(self):
+        backend = MagicMock()
+        backend.publish.side_effect = Exception('Boom')
+        buffer = MetricsBuffer(backend)
+
+        buffer.record('Time', 1)
+        buffer.flush()
+
+    def test_emf_backend(self):
+        stream = io.StringIO()
+
+        EmfBackend(stream).publish(
+            'Keydra',
+            [
+                {
+                    'MetricName': 'ExecutionTime',
+                    'Dimensions': [{'Name': 'Action', 'Value': 'rotation'}],
+                    'Unit': 'Seconds',
+                    'Values': [1, 2],
+                    'Counts': [2, 1]
+                },
+                {'MetricName': 'NumberOfFailedRotations', 'Value': 0}
+            ]
+        )
+
+        records = [json.loads(line) for line in stream.getvalue().splitlines()]
+
+        self.assertEqual(records[0]['ExecutionTime'], [1, 1, 2])
+        self.assertEqual(records[0]['Action'], 'rotation')
+        self.assertEqual(
+            records[0]['_aws']['CloudWatchMetrics'][0],
+            {
+                'Namespace': 'Keydra',
+                'Dimensions': [['Action']],
+                'Metrics': [{'Name': 'ExecutionTime', 'Unit': 'Seconds'}]
+            }
+        )
+        self.assertEqual(records[1]['NumberOfFailedRotations'], 0)
@@ -0,0 +1,99 @@
+import unittest
+
+from keydra.model import DistributionTarget, RotationResult, SecretSpec
+from keydra.model import as_dict, override
+from keydra.providers import github
+
+
+SPEC = {
+    'provider': 'IAM',
+    'key': 'km_user',
+    'rotate': 'nightly',
+    'custom': {'a': 1},
+    'distribute': [
+        {
+            'provider': 'github',
+            'key': 'KEY_{ENV}',
+            'source': 'key',
+            'envs': ['dev'],
+            'config': {
+                'scope': 'repository',
+                'repository': ['r1', 'r2'],
+                'account_username': 'org'
+            }
+        }
+    ]
+}
+
+
+class TestModel(unittest.TestCase):
+    def test_override(self):
+        changed = override(SPEC, key='other')
+
+        self.assertEqual(changed['key'], 'other')
+        self.assertEqual(SPEC['key'], 'km_user')
+        self.assertIs(changed['distribute'], SPEC['distribute'])
+
+    def test_expanded_targets_copy_on_write(self):
+        target = SPEC['distribute'][0]
+
+        specs = github.Client.pre_process_spec(
+            target, context={'environment': {'dev': {}}}
+        )
+
+        self.assertEqual(
+            [s['config']['repository'] for s in specs], ['r1', 'r2']
+        )
+        self.assertEqual(specs[0]['key'], 'KEY_DEV')
+        self.assertEqual(target['key'], 'KEY_{ENV}')
+        self.assertEqual(target['config']['repository'], ['r1', 'r2'])
+        self.assertIs(specs[0]['envs'], target['envs'])
+
+    def test_spec_record(self):
+        spec = SecretSpec.from_dict(SPEC)
+
+        self.assertEqual(spec.secret_id, 'IAM::km_user')
+        self.assertIsInstance(spec.distribute[0], DistributionTarget)
+        self.assertEqual(spec['custom'], {'a': 1})
+        self.assertEqual(spec['distribute'][0]['config']['scope'], 'repository')
+        self.assertEqual(spec, SPEC)
+        self.assertEqual(as_dict(spec), SPEC)
+
+    def test_record_read_only(self):
+        spec = SecretSpec.from_dict(SPEC)
+
+        with self.assertRaises(AttributeError):
+            spec.key = 'other'
+
+        changed = override(spec, key='other', custom=None)
+
+        self.assertIsInstance(changed, SecretSpec)
+        self.assertEqual(changed['key'], 'other')
+        self.assertIsNone(changed['custom'])
+        self.assertEqual(spec['key'], 'km_user')
+        self.assertIs(changed.distribute, spec.distribute)
+
+    def test_result_unset_fields(self):
+        result = RotationResult(status='success', msg='m')
+
+        self.assertEqual(dict(result), {'status': 'success', 'msg': 'm'})
+        self.assertIsNone(result.value)
+        self.assertNotIn('value', result)
+
+        with self.assertRaises(KeyError):
+            result['value']
+
+        with self.assertRaises(TypeError):
+            RotationResult(outcome='success')
+
+    def test_expanded_record_targets(self):
+        target = SecretSpec.from_dict(SPEC).distribute[0]
+
+        specs = github.Client.pre_process_spec(
+            target, context={'environment': {'dev': {}}}
+        )
+
+        self.assertEqual(
+            [s['config']['repository'] for s in specs], ['r1', 'r2']
+        )
+        self.assertEqual(target['config']['repository'], ['r1', 'r2'])
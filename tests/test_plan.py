@@ -0,0 +1,156 @@
+import datetime
+import os
+import tempfile
+import unittest
+
+import yaml
+
+from keydra import plan as kplan
+from keydra.plan import LocalFilePlanStore
+from keydra.plan import RotationPlan
+
+from unittest.mock import patch
+
+
+ENTRIES = [
+    [0, 'a', {'key': 'a'}],
+    [2, 'c', {'key': 'c'}],
+    [3, 'd', {'key': 'd'}],
+]
+
+
+class TestPlan(unittest.TestCase):
+    def setUp(self):
+        self.plandir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.plandir.cleanup)
+
+    def test_config_hash(self):
+        self.assertEqual(
+            kplan.config_hash({'dev': {'id': 1}}, {'a': {'x': 1, 'y': 2}}),
+            kplan.config_hash({'dev': {'id': 1}}, {'a': {'y': 2, 'x': 1}})
+        )
+        self.assertNotEqual(
+            kplan.config_hash({'dev': {'id': 1}}, {'a': {}}),
+            kplan.config_hash({'dev': {'id': 2}}, {'a': {}})
+        )
+
+    def test_code_version(self):
+        with open(os.path.join(self.plandir.name, 'module.py'), 'w') as f:
+            f.write('A = 1')
+
+        with patch.object(kplan, 'CODE_PACKAGE', self.plandir.name), \
+                patch.object(kplan, '_CODE_VERSION', None):
+            version = kplan.code_version()
+
+            # Worked out once
+            with open(os.path.join(self.plandir.name, 'module.py'), 'w') as f:
+                f.write('A = 2')
+
+            self.assertEqual(kplan.code_version(), version)
+
+            kplan._CODE_VERSION = None
+
+            self.assertNotEqual(kplan.code_version(), version)
+
+        self.assertEqual(len(kplan.code_version()), 64)
+
+    def test_batch_bounds(self):
+        self.assertIsNone(kplan.batch_bounds(10, None, None))
+        self.assertEqual(kplan.batch_bounds(10, 3, 0), (0, 4))
+        self.assertEqual(kplan.batch_bounds(10, 3, 2), (8, 12))
+
+        with self.assertRaises(Exception):
+            kplan.batch_bounds(10, 3, 3)
+
+    def test_select(self):
+        plan = RotationPlan('k', 'dev', 4)
+        plan.add('nightly', ENTRIES)
+
+        self.assertTrue(plan.compiled('nightly'))
+        self.assertFalse(plan.compiled('weekly'))
+        self.assertEqual(
+            [sid for sid, _ in plan.select('nightly')], ['a', 'c', 'd']
+        )
+        self.assertEqual(
+            plan.select('nightly', requested_secrets=['c']),
+            [('c', {'key': 'c'})]
+        )
+        self.assertEqual(
+            [sid for sid, _ in plan.select('nightly', None, 2, 1)],
+            ['c', 'd']
+        )
+
+    def test_store_round_trip(self):
+        store = LocalFilePlanStore(self.plandir.name)
+        plan = RotationPlan('k', 'dev', 4)
+        plan.add('nightly', ENTRIES)
+
+        self.assertIsNone(store.load('k'))
+
+        store.save(plan)
+        loaded = store.load('k')
+
+        self.assertEqual(loaded.to_dict(), plan.to_dict())
+        self.assertEqual(os.listdir(self.plandir.name), ['k.json.gz'])
+
+    def test_store_unserializable(self):
+        store = LocalFilePlanStore(self.plandir.name)
+        plan = RotationPlan('k', 'dev', 1)
+        plan.add('nightly', [[0, 'a', {'expires': datetime.date.today()}]])
+
+        with patch.object(kplan, 'LOGGER') as mk_logger:
+            store.save(plan)
+
+            mk_logger.warning.assert_called_once()
+
+        self.assertEqual(os.listdir(self.plandir.name), [])
+
+    def test_store_corrupt(self):
+        store = LocalFilePlanStore(self.plandir.name)
+
+        with open(os.path.join(self.plandir.name, 'k.json.gz'), 'wb') as f:
+            f.write(b'not gzip')
+
+        self.assertIsNone(store.load('k'))
+
+    def test_main(self):
+        envs = os.path.join(self.plandir.name, 'environments.yaml')
+        secrets = os.path.join(self.plandir.name, 'secrets.yaml')
+
+        with open(envs, 'w') as f:
+            yaml.safe_dump(
+                {
+                    'dev': {
+                        'description': 'Dev', 'type': 'aws', 'access': 'dev',
+                        'id': '001122', 'secrets': ['a']
+                    }
+                },
+                f
+            )
+
+        with open(secrets, 'w') as f:
+            yaml.safe_dump(
+                {'a': {'key': 'a', 'provider': 'IAM', 'rotate': 'nightly'}}, f
+            )
+
+        kplan.main(
+            [
+                envs, secrets, '--account', '001122',
+                '--directory', self.plandir.name
+            ]
+        )
+
+        saved = [
+            name for name in os.listdir(self.plandir.name)
+            if name.endswith('.json.gz')
+        ]
+        self.assertEqual(len(saved), 1)
+
+        plan = LocalFilePlanStore(self.plandir.name).load(saved[0][:-8])
+
+        self.assertEqual(plan.env, 'dev')
+        self.assertEqual(
+            plan.select('nightly'),
+            [('a', {'key': 'a', 'provider': 'IAM', 'rotate': 'nightly'})]
+        )
+        self.assertEqual(plan.select('weekly'), [])
@@ -0,0 +1,51 @@
+import unittest
+
+from unittest.mock import patch
+
+from keydra.pool import ClientPool
+
+
+class TestClientPool(unittest.TestCase):
+    def test_reuses_clients_within_a_scope(self):
+        pool = ClientPool()
+        client = object()
+
+        pool.release(('github', None), 'v1', client)
+
+        with pool.scope():
+            self.assertIsNone(pool.checkout(('github', None), 'v1'))
+
+            pool.release(('github', None), 'v1', client)
+
+            # Checked out exclusively
+            self.assertIs(pool.checkout(('github', None), 'v1'), client)
+            self.assertIsNone(pool.checkout(('github', None), 'v1'))
+
+    def test_credentials_version_must_match(self):
+        pool = ClientPool()
+
+        with pool.scope():
+            pool.release(('github', None), 'v1', object())
+
+            self.assertIsNone(pool.checkout(('github', None), 'v2'))
+            self.assertIsNone(pool.checkout(('github', None), None))
+
+    @patch('keydra.pool.time.monotonic')
+    def test_idle_clients_expire(self, mk_time):
+        pool = ClientPool(max_idle=60)
+
+        with pool.scope():
+            mk_time.return_value = 100
+            pool.release(('github', None), 'v1', object())
+
+            mk_time.return_value = 161
+            self.assertIsNone(pool.checkout(('github', None), 'v1'))
+
+    def test_invalidate(self):
+        pool = ClientPool()
+
+        with pool.scope():
+            pool.release(('github', None), 'v1', object())
+            pool.invalidate(('github', None))
+
+            self.assertIsNone(pool.checkout(('github', None), 'v1'))
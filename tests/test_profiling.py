@@ -0,0 +1,59 @@
+import os
+import tempfile
+import time
+import unittest
+
+from keydra.executor import Executor
+from keydra.profiling import Profiler
+
+
+def busy(seconds):
+    end = time.perf_counter() + seconds
+
+    while time.perf_counter() < end:
+        pass
+
+    return bytearray(1024 * 1024)
+
+
+class TestProfiling(unittest.TestCase):
+    def setUp(self):
+        self.stacks_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.stacks_dir.cleanup)
+
+    def test_sampling(self):
+        with Profiler(top=5, stacks_dir=self.stacks_dir.name) as profiler:
+            kept = Executor(max_workers=2).map(busy, [0.1, 0.1])
+
+        summary = profiler.summary()
+
+        self.assertEqual(summary['mode'], 'sampling')
+        self.assertLessEqual(len(summary['hot_functions']), 5)
+        self.assertIn(
+            'test_profiling.py:busy',
+            [f['function'] for f in summary['hot_functions']]
+        )
+        self.assertGreaterEqual(summary['peak_memory_kb'], 2048)
+        self.assertTrue(summary['allocations'])
+
+        with open(summary['stacks_file']) as stacks:
+            lines = stacks.read().splitlines()
+
+        self.assertTrue(
+            any(';test_profiling.py:busy ' in line for line in lines)
+        )
+        self.assertEqual(len(kept), 2)
+
+    def test_cprofile(self):
+        with Profiler(mode='cprofile', top=3) as profiler:
+            busy(0.01)
+
+        summary = profiler.summary()
+
+        self.assertEqual(len(summary['hot_functions']), 3)
+        self.assertIsNone(summary['stacks_file'])
+        self.assertEqual(os.listdir(self.stacks_dir.name), [])
+
+    def test_unknown_mode(self):
+        with self.assertRaises(ValueError):
+            Profiler(mode='nope')
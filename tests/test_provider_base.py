@@ -1,3 +1,5 @@
+import asyncio
+import threading
 import unittest
 
 from datetime import datetime
@@ -26,7 +28,27 @@ class Dummy(object):
         return True
 
 
+class SyncProvider(BaseProvider):
+    def rotate(self, key):
+        return threading.current_thread()
+
+    def distribute(self, secret, key):
+        return secret, key, threading.current_thread()
+
+
 class TestBaseProvider(unittest.TestCase):
+    def test_async_adapters_run_sync_provider_in_executor(self):
+        provider = SyncProvider()
+
+        rotated_on = asyncio.run(provider.rotate_async({'key': 'a'}))
+        secret, key, distributed_on = asyncio.run(
+            provider.distribute_async('secret', {'key': 'a'})
+        )
+
+        self.assertNotEqual(rotated_on, threading.current_thread())
+        self.assertNotEqual(distributed_on, threading.current_thread())
+        self.assertEqual((secret, key), ('secret', {'key': 'a'}))
+
     def test_exponential_backoff_retry_successful_call(self):
         self.assertEqual(_passing_function(), True)
 
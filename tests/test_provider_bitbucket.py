@@ -422,6 +422,22 @@ class TestProviderBitbucket(unittest.TestCase):
                 filetype='something'
             )
 
+    @patch('keydra.providers.bitbucket.Client._load_remote_file')
+    def test_load_config_env_scope(self, lrf):
+        cli = bitbucket.Client(credentials=BB_CREDS)
+        lrf.side_effect = [{'dev': {}}, {}]
+
+        cli.load_config(
+            {
+                'accountusername': 'acct_user',
+                'secrets': {'repository': 'repo', 'path': 'secrets_path'},
+                'environments': {'repository': 'repo', 'path': 'env_path'}
+            },
+            env_scope=lambda envs: frozenset(envs)
+        )
+
+        self.assertEqual(lrf.call_args.kwargs['only'], frozenset({'dev'}))
+
     @patch('keydra.providers.bitbucket.Client._load_remote_file')
     def test_load_config(self, lrf):
         cli = bitbucket.Client(credentials=BB_CREDS)
@@ -466,7 +482,8 @@ class TestProviderBitbucket(unittest.TestCase):
                     repo='secrets_repo',
                     path='secrets_path',
                     username='acct_user',
-                    filetype='yaml'
+                    filetype='yaml',
+                    only=None
                 ),
             ]
         )
@@ -317,7 +317,8 @@ class TestProviderGithub(unittest.TestCase):
                     repo='secrets_repo',
                     path='secrets_path',
                     username='acct_user',
-                    filetype='yaml'
+                    filetype='yaml',
+                    only=None
                 ),
             ]
         )
@@ -144,7 +144,7 @@ class TestProviderGitlab(unittest.TestCase):
             call(file_path=ANOTHER_FILE_PATH, filetype=ANOTHER_FILE_TYPE,
                  repo_branch=ANOTHER_BRANCH_NAME, repo_name=ANOTHER_REPO_NAME),
             call(file_path=A_FILE_PATH, filetype=A_FILE_TYPE,
-                 repo_branch=A_BRANCH_NAME, repo_name=A_REPO_NAME)
+                 repo_branch=A_BRANCH_NAME, repo_name=A_REPO_NAME, only=None)
         ])
 
         assert result == ('first', 'second')
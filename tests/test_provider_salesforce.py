@@ -314,11 +314,14 @@ class TestProviderSalesforce(unittest.TestCase):
         )
 
     @patch.object(salesforce, 'SalesforceClient')
-    @patch('keydra.providers.salesforce.boto3')
-    def test__boto_none(self, mk_boto, mk_sf_client):
+    @patch.object(salesforce, 'SecretsManagerClient')
+    def test__boto_none(self, mk_sm_client, mk_sf_client):
         salesforce.Client(
             credentials=SF_CREDS,
             session=None,
             region_name='ap-southeast-2'
         )
-        mk_boto.session.Session.assert_called_once_with()
+        mk_sm_client.assert_called_once_with(
+            session=salesforce.aws_session.SESSION,
+            region_name='ap-southeast-2'
+        )
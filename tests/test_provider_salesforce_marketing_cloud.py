@@ -257,11 +257,14 @@ class TestProviderSalesforce(unittest.TestCase):
         self.assertEqual(32, len(pw_result))
         self.assertEqual(pw_result, 'Bj*7QEb2RoWUqYM!@92o87g5LdP#$Cy*')
 
-    @patch('keydra.providers.salesforce_marketing_cloud.boto3')
-    def test__boto_none(self, mk_boto):
+    @patch.object(salesforce_marketing_cloud, 'SecretsManagerClient')
+    def test__boto_none(self, mk_sm_client):
         salesforce_marketing_cloud.Client(
             credentials=SFMC_CREDS,
             session=None,
             region_name='ap-southeast-2'
         )
-        mk_boto.session.Session.assert_called_once_with()
+        mk_sm_client.assert_called_once_with(
+            session=salesforce_marketing_cloud.aws_session.SESSION,
+            region_name='ap-southeast-2'
+        )
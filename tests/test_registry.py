@@ -0,0 +1,50 @@
+import unittest
+
+from importlib import import_module
+from unittest.mock import MagicMock
+from unittest.mock import patch
+
+from keydra import loader
+from keydra.registry import Registry
+
+
+class Dummy(object):
+    pass
+
+
+class TestRegistry(unittest.TestCase):
+    def setUp(self):
+        self._registry = Registry(
+            'Client', 'keydra.clients', loader._client_classes,
+            aliases=loader.LOCAL_CLIENTS, entry_point_group='keydra.clients'
+        )
+
+    def test_resolves_once(self):
+        with patch('keydra.registry.import_module', wraps=import_module) as mk_im:
+            first = self._registry.get('secretsmanager')
+            second = self._registry.get('SecretsManager')
+
+        self.assertIs(first, second)
+        self.assertEqual(first.__name__, 'SecretsManagerClient')
+        mk_im.assert_called_once_with('keydra.clients.aws.secretsmanager')
+
+    def test_registered_class_takes_precedence(self):
+        self._registry.register('SecretsManager', Dummy)
+
+        self.assertIs(self._registry.get('secretsmanager'), Dummy)
+
+    @patch('keydra.registry._entry_points')
+    def test_entry_points(self, mk_eps):
+        entry_point = MagicMock()
+        entry_point.name = 'ThirdParty'
+        entry_point.load.return_value = Dummy
+        mk_eps.return_value = [entry_point]
+
+        self.assertIs(self._registry.get('thirdparty'), Dummy)
+        mk_eps.assert_called_once_with('keydra.clients')
+
+        with self.assertRaises(ModuleNotFoundError):
+            self._registry.get('not_a_client')
+
+        # Discovered once
+        mk_eps.assert_called_once()
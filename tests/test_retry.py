@@ -0,0 +1,219 @@
+import unittest
+
+from unittest.mock import MagicMock, patch
+
+import requests
+
+from botocore.exceptions import ClientError, EndpointConnectionError
+
+from keydra import deadline
+from keydra import retry
+from keydra.deadline import Deadline
+from keydra.exceptions import DeadlineExceeded, DistributionException
+
+from tests.helpers import http_error
+
+
+def _client_error(code, status, headers=None):
+    return ClientError(
+        {
+            'Error': {'Code': code, 'Message': 'Boom'},
+            'ResponseMetadata': {
+                'HTTPStatusCode': status, 'HTTPHeaders': headers or {}
+            }
+        },
+        'UpdateSecret'
+    )
+
+
+def _failing(*errors, result='done'):
+    calls = MagicMock(side_effect=list(errors) + [result])
+    calls.__qualname__ = 'failing'
+
+    return calls
+
+
+@patch.object(retry.time, 'sleep')
+class TestRetry(unittest.TestCase):
+    def test_classify(self, mk_sleep):
+        self.assertEqual(
+            retry.classify(_client_error('ThrottlingException', 400)),
+            (True, None)
+        )
+        self.assertEqual(
+            retry.classify(_client_error('AccessDenied', 403)), (False, None)
+        )
+        self.assertEqual(
+            retry.classify(_client_error('InternalFailure', 500)), (True, None)
+        )
+        self.assertEqual(retry.classify(http_error(404)), (False, None))
+        self.assertEqual(retry.classify(http_error(501)), (False, None))
+        self.assertEqual(
+            retry.classify(http_error(429, {'Retry-After': '7'})), (True, 7)
+        )
+        self.assertEqual(
+            retry.classify(EndpointConnectionError(endpoint_url='x')),
+            (True, None)
+        )
+        self.assertEqual(
+            retry.classify(requests.ConnectionError()), (True, None)
+        )
+        self.assertEqual(retry.classify(DeadlineExceeded()), (False, None))
+        self.assertEqual(retry.classify(Exception('Boom')), (False, None))
+
+    def test_classify_wrapped_errors(self, mk_sleep):
+        try:
+            try:
+                raise http_error(422)
+            except Exception as e:
+                raise DistributionException('Failed: {}'.format(e))
+        except DistributionException as e:
+            wrapped = e
+
+        self.assertEqual(retry.classify(wrapped), (False, None))
+
+    def test_retry_after_date(self, mk_sleep):
+        _, retry_after = retry.classify(
+            http_error(503, {'Retry-After': 'Wed, 21 Oct 2015 07:28:00 GMT'})
+        )
+
+        self.assertEqual(retry_after, 0)
+
+    @patch('keydra.retry.random.uniform')
+    def test_backoff_capped_full_jitter(self, mk_uniform, mk_sleep):
+        mk_uniform.side_effect = lambda low, high: (low, high)
+        policy = retry.RetryPolicy(base=1, cap=5)
+
+        self.assertEqual(
+            [policy.backoff(attempt) for attempt in range(4)],
+            [(0, 2), (0, 4), (0, 5), (0, 5)]
+        )
+
+        policy = retry.RetryPolicy(base=1, cap=5, floor=3)
+
+        self.assertEqual(policy.backoff(0), (3, 3))
+        self.assertEqual(policy.backoff(1), (3, 4))
+
+    def test_retries_then_succeeds(self, mk_sleep):
+        f = _failing(http_error(503), http_error(503))
+
+        self.assertEqual(retry.RetryPolicy(retries=3).call(f), 'done')
+        self.assertEqual(f.call_count, 3)
+        self.assertEqual(mk_sleep.call_count, 2)
+
+    def test_gives_up(self, mk_sleep):
+        f = _failing(*[http_error(503) for _ in range(5)])
+
+        with self.assertRaises(requests.HTTPError):
+            retry.RetryPolicy(retries=2).call(f)
+
+        self.assertEqual(f.call_count, 3)
+        self.assertEqual(mk_sleep.call_count, 2)
+
+    def test_fatal_not_retried(self, mk_sleep):
+        f = _failing(http_error(400))
+
+        with self.assertRaises(requests.HTTPError):
+            retry.RetryPolicy(retries=3).call(f)
+
+        f.assert_called_once_with()
+        mk_sleep.assert_not_called()
+
+    def test_retry_after_honoured(self, mk_sleep):
+        f = _failing(http_error(429, {'Retry-After': '12'}))
+
+        retry.RetryPolicy(retries=1, cap=5).call(f)
+
+        mk_sleep.assert_called_once_with(12)
+
+        f = _failing(http_error(429, {'Retry-After': '3600'}))
+
+        with self.assertRaises(requests.HTTPError):
+            retry.RetryPolicy(retries=1).call(f)
+
+    def test_retry_on(self, mk_sleep):
+        f = _failing(KeyError('a'), http_error(503))
+        policy = retry.RetryPolicy(retries=3, retry_on=KeyError)
+
+        with self.assertRaises(requests.HTTPError):
+            policy.call(f)
+
+        self.assertEqual(f.call_count, 2)
+
+    def test_budget(self, mk_sleep):
+        f = _failing(*[http_error(503) for _ in range(10)])
+
+        with retry.budget(3) as run_budget:
+            with self.assertRaises(requests.HTTPError):
+                retry.RetryPolicy(retries=2).call(f)
+
+            with self.assertRaises(requests.HTTPError):
+                retry.RetryPolicy(retries=2).call(f)
+
+        self.assertEqual(run_budget.spent, 3)
+        self.assertEqual(mk_sleep.call_count, 3)
+        self.assertEqual(f.call_count, 5)
+
+    def test_deadline(self, mk_sleep):
+        f = _failing(http_error(503))
+
+        with deadline.scope(Deadline(6000, floor=5)):
+            with self.assertRaises(requests.HTTPError):
+                retry.RetryPolicy(retries=3, base=2).call(f)
+
+        mk_sleep.assert_not_called()
+
+    def test_nested_retries_collapse(self, mk_sleep):
+        inner_calls = _failing(*[http_error(503) for _ in range(20)])
+
+        @retry.retrying(retries=2)
+        def inner():
+            return inner_calls()
+
+        @retry.retrying(retries=3)
+        def outer():
+            try:
+                return inner()
+            except Exception as e:
+                raise DistributionException(str(e))
+
+        with self.assertRaises(DistributionException):
+            outer()
+
+        self.assertEqual(inner_calls.call_count, 3)
+
+    def test_requeueing(self, mk_sleep):
+        inner_calls = _failing(http_error(503), 'done', 'done')
+        outer_calls = _failing(*[http_error(503) for _ in range(5)])
+
+        @retry.retrying(retries=2)
+        def inner():
+            return inner_calls()
+
+        @retry.retrying(retries=2)
+        def outer():
+            inner()
+            return outer_calls()
+
+        with retry.requeueing(outer):
+            with self.assertRaises(retry.RetryLater) as ctx:
+                outer()
+
+        self.assertEqual(ctx.exception.attempt, 1)
+        self.assertIsInstance(ctx.exception.error, requests.HTTPError)
+
+        # Only the inner call waited to be retried
+        mk_sleep.assert_called_once()
+
+        with retry.requeueing(outer), retry.attempt(1):
+            with self.assertRaises(retry.RetryLater) as ctx:
+                outer()
+
+        self.assertEqual(ctx.exception.attempt, 2)
+
+        # Out of retries
+        with retry.requeueing(outer), retry.attempt(2):
+            with self.assertRaises(requests.HTTPError):
+                outer()
+
+        self.assertEqual(outer_calls.call_count, 3)
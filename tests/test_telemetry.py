@@ -0,0 +1,141 @@
+import unittest
+
+import boto3
+import requests
+
+from botocore.awsrequest import AWSResponse
+from requests.adapters import BaseAdapter
+
+from keydra import telemetry
+from keydra.executor import Executor
+
+
+STS_RESPONSE = (
+    b'<GetCallerIdentityResponse><GetCallerIdentityResult>'
+    b'<Account>0123456789</Account>'
+    b'</GetCallerIdentityResult></GetCallerIdentityResponse>'
+)
+
+STS_ERROR = (
+    b'<ErrorResponse><Error><Code>AccessDenied</Code>'
+    b'<Message>Nope</Message></Error></ErrorResponse>'
+)
+
+
+class FakeRaw(object):
+    def __init__(self, body):
+        self._body = body
+
+    def stream(self, **kwargs):
+        yield self._body
+
+
+class FakeAdapter(BaseAdapter):
+    def send(self, request, **kwargs):
+        response = requests.Response()
+        response.status_code = 404 if request.url.endswith('/nope') else 200
+        response._content = b'{"ok": true}'
+        response.url = request.url
+        response.request = request
+
+        return response
+
+    def close(self):
+        pass
+
+
+class TestTelemetry(unittest.TestCase):
+    def setUp(self):
+        adapter = FakeAdapter()
+        adapter.send = telemetry.traced(adapter.send)
+
+        self.session = requests.Session()
+        self.session.mount('https://', adapter)
+
+    def test_operation(self):
+        self.assertEqual(
+            telemetry._operation(
+                'GET',
+                'https://api.bitbucket.org/2.0/teams/t/pipelines_config/variables/'
+                '{2b8cab0b-e2f3-4d3a-9d6c-a9cb0d5a4a6e}?page=2'
+            ),
+            'GET /2.0/teams/t/pipelines_config/variables/*'
+        )
+        self.assertEqual(
+            telemetry._operation('DELETE', 'https://x.com/users/1234/keys/ab'),
+            'DELETE /users/*/keys/ab'
+        )
+
+    def test_requests_calls_recorded(self):
+        self.session.get('https://api.github.com/repos/1')
+
+        with telemetry.record_calls() as calls:
+            Executor(max_workers=3).map(
+                lambda i: self.session.get('https://api.github.com/repos/{}'.format(i)),
+                range(3)
+            )
+            self.session.post('https://api.github.com/nope', data='abc')
+
+        self.session.get('https://api.github.com/repos/2')
+
+        report = calls.report()
+
+        self.assertEqual(report['calls'], 4)
+        self.assertEqual(report['by_host'], {'api.github.com': 4})
+
+        top = report['top_operations'][0]
+
+        self.assertEqual(top['operation'], 'GET /repos/*')
+        self.assertEqual(top['calls'], 3)
+        self.assertEqual(top['statuses'], {'200': 3})
+        self.assertEqual(top['bytes_received'], 36)
+
+        post = report['top_operations'][1]
+
+        self.assertEqual(post['statuses'], {'404': 1})
+        self.assertEqual(post['bytes_sent'], 3)
+
+    def test_other_sessions_not_traced(self):
+        session = requests.Session()
+        session.mount('https://', FakeAdapter())
+
+        with telemetry.record_calls() as calls:
+            session.get('https://api.github.com/repos/1')
+
+        self.assertEqual(calls.report()['calls'], 0)
+
+    def test_boto_calls_recorded(self):
+        client = telemetry.instrument_client(
+            boto3.session.Session(
+                aws_access_key_id='a', aws_secret_access_key='b'
+            ).client('sts', region_name='ap-southeast-2')
+        )
+        statuses = [200, 403]
+
+        def send(request, **kwargs):
+            status = statuses.pop(0)
+            body = STS_ERROR if status == 403 else STS_RESPONSE
+
+            return AWSResponse(
+                request.url, status, {'content-length': str(len(body))},
+                FakeRaw(body)
+            )
+
+        client.meta.events.register('before-send', send)
+
+        with telemetry.record_calls() as calls:
+            client.get_caller_identity()
+
+            with self.assertRaises(Exception):
+                client.get_caller_identity()
+
+        top = calls.report()['top_operations']
+
+        self.assertEqual(len(top), 1)
+        self.assertEqual(top[0]['host'], 'sts.ap-southeast-2.amazonaws.com')
+        self.assertEqual(top[0]['operation'], 'sts.GetCallerIdentity')
+        self.assertEqual(top[0]['calls'], 2)
+        self.assertEqual(top[0]['statuses'], {'200': 1, '403': 1})
+        self.assertEqual(
+            top[0]['bytes_received'], len(STS_RESPONSE) + len(STS_ERROR)
+        )
@@ -0,0 +1,67 @@
+import unittest
+
+from keydra import timing
+from keydra.executor import Executor
+
+from unittest.mock import patch
+
+
+class TestTiming(unittest.TestCase):
+    def test_span_outside_collect(self):
+        with timing.span('rotate', provider='IAM'):
+            pass
+
+    def test_collect(self):
+        with patch('time.perf_counter', side_effect=[1, 1.5, 2, 4]):
+            with timing.collect() as spans:
+                with timing.span('rotate', provider='IAM'):
+                    pass
+
+                with timing.span('validate'):
+                    pass
+
+        self.assertEqual(
+            spans.to_list(),
+            [
+                {'phase': 'rotate', 'seconds': 0.5, 'provider': 'iam'},
+                {'phase': 'validate', 'seconds': 2}
+            ]
+        )
+
+    def test_collect_across_threads(self):
+        def distribute(target):
+            with timing.span('distribute', provider=target):
+                return target
+
+        with timing.collect() as spans:
+            Executor(max_workers=3).map(distribute, ['a', 'b', 'c'])
+
+            with timing.collect() as inner:
+                Executor(max_workers=2).map(distribute, ['d', 'e'])
+
+        self.assertEqual(
+            sorted(s['provider'] for s in spans.to_list()), ['a', 'b', 'c']
+        )
+        self.assertEqual(
+            sorted(s['provider'] for s in inner.to_list()), ['d', 'e']
+        )
+
+    def test_latency_report(self):
+        results = [
+            {
+                'timings': [
+                    {'phase': 'rotate', 'provider': 'iam', 'seconds': s},
+                    {'phase': 'redact', 'seconds': 0.001}
+                ]
+            }
+            for s in range(1, 101)
+        ]
+        results.append({'status': 'success'})
+
+        report = timing.latency_report(results)
+
+        self.assertEqual(
+            report['iam']['rotate'],
+            {'count': 100, 'p50': 50, 'p95': 95, 'p99': 99}
+        )
+        self.assertEqual(report['-']['redact']['count'], 100)